@@ -1,13 +1,16 @@
 # Human friendly input/output in Python.
 #
 # Author: Peter Odding <peter@peterodding.com>
-# Last Change: July 19, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 # Semi-standard module versioning.
 __version__ = '1.32'
 
 # Standard library modules.
+import array
+import datetime
+import fractions
 import multiprocessing
 import numbers
 import os
@@ -16,6 +19,11 @@ import re
 import sys
 import time
 
+# Modules included in our package.
+from humanfriendly.caching import memoized
+from humanfriendly.instrumentation import instrumented
+from humanfriendly.units import Quantity, UnitRegistry, UnitSystem  # NOQA
+
 # In humanfriendly 1.23 the format_table() function was added to render a table
 # using characters like dashes and vertical bars to emulate borders. Since then
 # support for other tables has been added and the name of format_table() has
@@ -24,10 +32,12 @@ from humanfriendly.tables import format_pretty_table as format_table  # NOQA
 
 # In humanfriendly 1.30 the following text manipulation functions were moved
 # out into a separate module to enable their usage in other modules of the
-# humanfriendly package (without causing circular imports).
+# humanfriendly package (without causing circular imports). The same was done
+# for round_number() when the humanfriendly.units module was added.
 from humanfriendly.text import (  # NOQA
-    compact, concatenate, dedent, format, is_empty_line,
-    pluralize, tokenize, trim_empty_lines,
+    compact, concatenate, dedent, format, is_empty_line, is_finite, is_numpy_object,
+    pluralize, pluralize_decimal, pluralize_many, round_number,
+    round_numbers, tokenize, trim_empty_lines,
 )
 
 # Compatibility with Python 2 and 3.
@@ -51,13 +61,37 @@ erase_line_code = '\r\x1b[K'
 hide_cursor_code = '\x1b[?25l'
 show_cursor_code = '\x1b[?25h'
 
-# Common disk size units, used for formatting and parsing.
+# Common disk size units, used for formatting and parsing. These units are
+# powers of 1024 labelled with the traditional (JEDEC) symbols KB, MB, etc.
 disk_size_units = (dict(prefix='b', divider=1, singular='byte', plural='bytes'),
-                   dict(prefix='k', divider=1024**1, singular='KB', plural='KB'),
-                   dict(prefix='m', divider=1024**2, singular='MB', plural='MB'),
-                   dict(prefix='g', divider=1024**3, singular='GB', plural='GB'),
-                   dict(prefix='t', divider=1024**4, singular='TB', plural='TB'),
-                   dict(prefix='p', divider=1024**5, singular='PB', plural='PB'))
+                   dict(prefix='k', divider=1024**1, singular='KB', plural='KB', name='kilobyte'),
+                   dict(prefix='m', divider=1024**2, singular='MB', plural='MB', name='megabyte'),
+                   dict(prefix='g', divider=1024**3, singular='GB', plural='GB', name='gigabyte'),
+                   dict(prefix='t', divider=1024**4, singular='TB', plural='TB', name='terabyte'),
+                   dict(prefix='p', divider=1024**5, singular='PB', plural='PB', name='petabyte'))
+
+# Decimal disk size units (powers of 1000) using SI prefixes.
+decimal_size_units = (dict(prefix='b', divider=1, singular='byte', plural='bytes'),
+                      dict(prefix='k', divider=1000**1, singular='kB', plural='kB', name='kilobyte'),
+                      dict(prefix='m', divider=1000**2, singular='MB', plural='MB', name='megabyte'),
+                      dict(prefix='g', divider=1000**3, singular='GB', plural='GB', name='gigabyte'),
+                      dict(prefix='t', divider=1000**4, singular='TB', plural='TB', name='terabyte'),
+                      dict(prefix='p', divider=1000**5, singular='PB', plural='PB', name='petabyte'),
+                      dict(prefix='e', divider=1000**6, singular='EB', plural='EB', name='exabyte'))
+
+# Binary disk size units (powers of 1024) using IEC prefixes.
+binary_size_units = (dict(prefix='b', divider=1, singular='byte', plural='bytes'),
+                     dict(prefix='ki', divider=1024**1, singular='KiB', plural='KiB', name='kibibyte'),
+                     dict(prefix='mi', divider=1024**2, singular='MiB', plural='MiB', name='mebibyte'),
+                     dict(prefix='gi', divider=1024**3, singular='GiB', plural='GiB', name='gibibyte'),
+                     dict(prefix='ti', divider=1024**4, singular='TiB', plural='TiB', name='tebibyte'),
+                     dict(prefix='pi', divider=1024**5, singular='PiB', plural='PiB', name='pebibyte'),
+                     dict(prefix='ei', divider=1024**6, singular='EiB', plural='EiB', name='exbibyte'))
+
+# Mapping of the values of the `binary' argument of format_size() to the names
+# of the unit systems in the disk size registry (defined near the end of this
+# module).
+format_size_systems = {None: 'jedec', True: 'iec', False: 'si'}
 
 # Common length size units, used for formatting and parsing.
 length_size_units = (dict(prefix='nm', divider=1e-09, singular='nm', plural='nm'),
@@ -66,14 +100,86 @@ length_size_units = (dict(prefix='nm', divider=1e-09, singular='nm', plural='nm'
                      dict(prefix='m', divider=1, singular='metre', plural='metres'),
                      dict(prefix='km', divider=1000, singular='km', plural='km'))
 
-# Common time units, used for formatting of time spans.
-time_units = (dict(divider=1, singular='second', plural='seconds'),
-              dict(divider=60, singular='minute', plural='minutes'),
-              dict(divider=60*60, singular='hour', plural='hours'),
-              dict(divider=60*60*24, singular='day', plural='days'),
-              dict(divider=60*60*24*7, singular='week', plural='weeks'),
-              dict(divider=60*60*24*7*52, singular='year', plural='years'))
-
+# Common time units, used for formatting and parsing of time spans. The
+# sub-second units don't have a prefix because abbreviations like 'n', 'us' and
+# 'ms' are also the first letters of unrelated words (like 'nights'), so they
+# are only matched by their exact names.
+time_units = (dict(prefix=None, divider=fractions.Fraction(1, 1000**3), singular='nanosecond', plural='nanoseconds',
+                   name='nanosecond', aliases=('ns', 'nsec', 'nsecs')),
+              dict(prefix=None, divider=fractions.Fraction(1, 1000**2), singular='microsecond', plural='microseconds',
+                   name='microsecond', aliases=('us', u'\u00b5s', u'\u03bcs', 'usec', 'usecs')),
+              dict(prefix=None, divider=fractions.Fraction(1, 1000), singular='millisecond', plural='milliseconds',
+                   name='millisecond', aliases=('ms', 'msec', 'msecs')),
+              dict(prefix='s', divider=1, singular='second', plural='seconds'),
+              dict(prefix='m', divider=60, singular='minute', plural='minutes'),
+              dict(prefix='h', divider=60*60, singular='hour', plural='hours'),
+              dict(prefix='d', divider=60*60*24, singular='day', plural='days'),
+              dict(prefix='w', divider=60*60*24*7, singular='week', plural='weeks'),
+              dict(prefix='y', divider=60*60*24*7*52, singular='year', plural='years'))
+
+# Units of information in bits (using decimal SI prefixes, which is the
+# convention for network bandwidth). Used by format_rate() and parse_rate().
+bit_units = (dict(prefix='b', divider=1, singular='bit', plural='bits'),
+             dict(prefix='k', divider=1000**1, singular='kbit', plural='kbit', name='kilobit'),
+             dict(prefix='m', divider=1000**2, singular='Mbit', plural='Mbit', name='megabit'),
+             dict(prefix='g', divider=1000**3, singular='Gbit', plural='Gbit', name='gigabit'),
+             dict(prefix='t', divider=1000**4, singular='Tbit', plural='Tbit', name='terabit'))
+
+# The intervals supported by format_rate() and parse_rate(). The singular
+# labels are used as the denominators of the formatted rates.
+rate_interval_units = (dict(prefix='s', divider=1, singular='s', plural='s', name='second'),
+                       dict(prefix='m', divider=60, singular='min', plural='min', name='minute'),
+                       dict(prefix='h', divider=60*60, singular='h', plural='h', name='hour'))
+
+# Timespans shorter than this number of seconds are formatted using sub-second
+# units by format_timespan() (shorter timespans would lose precision when
+# rounded to two decimal places).
+subsecond_threshold = 0.1
+
+# The maximum number of entries in the cache used by parse_timespan().
+TIMESPAN_CACHE_SIZE = 1000
+
+# The cache used by parse_timespan(cached=True).
+timespan_cache = {}
+
+# The maximum number of entries in the cache used by format_age() and friends.
+AGE_CACHE_SIZE = 1000
+
+# The cache used by format_age() and friends when a granularity is given.
+age_cache = {}
+
+# Compiled regular expression used by parse_date() and parse_dates() to
+# recognize the canonical 'YYYY-MM-DD HH:MM:SS' layout (the fast path).
+CANONICAL_DATE_PATTERN = re.compile(r'(\d{4})-(\d\d)-(\d\d)[ T](\d\d):(\d\d):(\d\d)\Z')
+
+# Compiled regular expression used by parse_date() to parse ISO 8601 dates
+# and times (calendar dates, ordinal dates and week dates in the basic and
+# extended formats, fractional seconds and time zone offsets).
+ISO_8601_PATTERN = re.compile(r'''
+    ^ \s* (?P<year> \d{4} )
+    (?: -? (?: W (?P<week> \d{2} ) -? (?P<weekday> [1-7] )
+             | (?P<ordinal> \d{3} )
+             | (?P<month> \d{1,2} ) (?: -? (?P<day> \d{1,2} ) )? ) )?
+    (?: (?: T | \s+ ) (?P<hour> \d{1,2} )
+        (?: :? (?P<minute> \d{1,2} )
+            (?: :? (?P<second> \d{1,2} ) (?: [.,] (?P<fraction> \d+ ) )? )? )?
+        \s* (?P<offset> Z | UTC | [+-] \d{2} (?: :? \d{2} )? )? )?
+    \s* $
+''', re.VERBOSE)
+
+# Frequencies in hertz.
+frequency_units = (dict(prefix='h', divider=1, singular='Hz', plural='Hz', name='hertz'),
+                   dict(prefix='k', divider=1000**1, singular='kHz', plural='kHz', name='kilohertz'),
+                   dict(prefix='m', divider=1000**2, singular='MHz', plural='MHz', name='megahertz'),
+                   dict(prefix='g', divider=1000**3, singular='GHz', plural='GHz', name='gigahertz'),
+                   dict(prefix='t', divider=1000**4, singular='THz', plural='THz', name='terahertz'))
+
+# Input/output operations per second.
+iops_units = (dict(prefix='i', divider=1, singular='IOPS', plural='IOPS'),
+              dict(prefix='k', divider=1000**1, singular='kIOPS', plural='kIOPS'),
+              dict(prefix='m', divider=1000**2, singular='MIOPS', plural='MIOPS'))
+
+@instrumented
 def coerce_boolean(value):
     """
     Coerce any value to a boolean.
@@ -101,14 +207,24 @@ def coerce_boolean(value):
     else:
         return bool(value)
 
-def format_size(num_bytes, keep_width=False):
+@instrumented
+@memoized
+def format_size(num_bytes, keep_width=False, binary=None):
     """
     Format a byte count as a human readable file size (supports ranges from
-    kilobytes to terabytes).
+    kilobytes to petabytes).
 
     :param num_bytes: The size to format in bytes (an integer).
     :param keep_width: ``True`` if trailing zeros should not be stripped,
                        ``False`` if they can be stripped.
+    :param binary: Selects the units used to format the size:
+
+                   - ``None`` (the default) uses multiples of 1024 with the
+                     traditional labels KB, MB, etc. (:data:`disk_size_units`).
+                   - ``True`` uses multiples of 1024 with IEC labels KiB, MiB,
+                     etc. (:data:`binary_size_units`).
+                   - ``False`` uses multiples of 1000 with SI labels kB, MB,
+                     etc. (:data:`decimal_size_units`).
     :returns: The corresponding human readable file size (a string).
 
     Some examples:
@@ -124,18 +240,23 @@ def format_size(num_bytes, keep_width=False):
     '1 MB'
     >>> format_size(1024 ** 3 * 4)
     '4 GB'
+    >>> format_size(1024 ** 3 * 4, binary=True)
+    '4 GiB'
+    >>> format_size(1000 ** 3 * 4, binary=False)
+    '4 GB'
     """
-    for unit in reversed(disk_size_units):
-        if num_bytes >= unit['divider']:
-            number = round_number(float(num_bytes) / unit['divider'], keep_width=keep_width)
-            return pluralize(number, unit['singular'], unit['plural'])
-    return pluralize(num_bytes, 'byte')
+    return disk_size_registry[format_size_systems[binary]].format(num_bytes, keep_width=keep_width)
 
-def parse_size(size):
+@instrumented
+def parse_size(size, binary=None):
     """
     Parse a human readable data size and return the number of bytes.
 
     :param size: The human readable file size to parse (a string).
+    :param binary: ``False`` to interpret units like KB and MB as multiples of
+                   1000, ``True`` or ``None`` (the default) to interpret them
+                   as multiples of 1024. IEC units like KiB and MiB are always
+                   interpreted as multiples of 1024.
     :returns: The corresponding size in bytes (an integer).
     :raises: :exc:`InvalidSize` when the input can't be parsed.
 
@@ -150,23 +271,22 @@ def parse_size(size):
     5120
     >>> parse_size('1.5 GB')
     1610612736
+    >>> parse_size('1e12')
+    1000000000000
+    >>> parse_size('1 KB', binary=False)
+    1000
+    >>> parse_size('1 KiB', binary=False)
+    1024
+
+    Numbers with a decimal fraction or exponent are tokenized using
+    :func:`~humanfriendly.text.tokenize()` in `exact` mode, so the number of
+    bytes is computed using integer arithmetic (no floating point rounding
+    errors, even at petabyte scale).
     """
-    tokens = tokenize(size)
-    if tokens and isinstance(tokens[0], numbers.Number):
-        # If the input contains only a number, it's assumed to be the number of bytes.
-        if len(tokens) == 1:
-            return int(tokens[0])
-        # Otherwise we expect to find two tokens: A number and a unit.
-        if len(tokens) == 2 and isinstance(tokens[1], string_types):
-            normalized_unit = tokens[1].lower()
-            # Try to match the first letter of the unit.
-            for unit in disk_size_units:
-                if normalized_unit.startswith(unit['prefix']):
-                    return int(tokens[0] * unit['divider'])
-    # We failed to parse the size specification.
-    msg = "Failed to parse size! (input %r was tokenized as %r)"
-    raise InvalidSize(msg % (size, tokens))
+    return int(disk_size_registry['si' if binary is False else 'jedec'].parse(size))
 
+@instrumented
+@memoized
 def format_length(num_metres, keep_width=False):
     """
     Format a metre count as a human readable length (supports ranges from
@@ -191,18 +311,15 @@ def format_length(num_metres, keep_width=False):
     >>> format_length(0.004)
     '4 mm'
     """
-    for unit in reversed(length_size_units):
-        if num_metres >= unit['divider']:
-            number = round_number(float(num_metres) / unit['divider'], keep_width=keep_width)
-            return pluralize(number, unit['singular'], unit['plural'])
-    return pluralize(num_metres, 'metre')
+    return length_quantity.format(num_metres, keep_width=keep_width)
 
+@instrumented
 def parse_length(length):
     """
     Parse a human readable length and return the number of metres.
 
     :param length: The human readable length to parse (a string).
-    :returns: The corresponding length in metres (a float).
+    :returns: The corresponding length in metres (a number).
     :raises: :exc:`InvalidLength` when the input can't be parsed.
 
     Some examples:
@@ -217,22 +334,10 @@ def parse_length(length):
     >>> parse_length('15.3cm')
     0.153
     """
-    tokens = tokenize(length)
-    if tokens and isinstance(tokens[0], numbers.Number):
-        # If the input contains only a number, it's assumed to be the number of metres.
-        if len(tokens) == 1:
-            return int(tokens[0])
-        # Otherwise we expect to find two tokens: A number and a unit.
-        if len(tokens) == 2 and isinstance(tokens[1], string_types):
-            normalized_unit = tokens[1].lower()
-            # Try to match the first letter of the unit.
-            for unit in length_size_units:
-                if normalized_unit.startswith(unit['prefix']):
-                    return tokens[0] * unit['divider']
-    # We failed to parse the length specification.
-    msg = "Failed to parse length! (input %r was tokenized as %r)"
-    raise InvalidLength(msg % (length, tokens))
+    return length_quantity.parse(length)
 
+@instrumented
+@memoized
 def format_number(number, num_decimals=2):
     """
     Format a number as a string including thousands separators to make it
@@ -267,48 +372,29 @@ def format_number(number, num_decimals=2):
         formatted_number += '.' + decimals_to_add
     return formatted_number
 
-def round_number(count, keep_width=False):
-    """
-    Helper for :py:func:`format_size()` and :py:func:`format_timespan()` to
-    round a floating point number to two decimal places in a human friendly
-    format. If no decimal places are required to represent the number, they
-    will be omitted.
-
-    :param count: The number to format.
-    :param keep_width: ``True`` if trailing zeros should not be stripped,
-                       ``False`` if they can be stripped.
-    :returns: The formatted number as a string.
-
-    An example:
-
-    >>> from humanfriendly import round_number
-    >>> round_number(1)
-    '1'
-    >>> round_number(math.pi)
-    '3.14'
-    >>> round_number(5.001)
-    '5'
-    """
-    text = '%.2f' % float(count)
-    if not keep_width:
-        text = re.sub('0+$', '', text)
-        text = re.sub('\.$', '', text)
-    return text
-
-def format_timespan(num_seconds):
+@instrumented
+@memoized
+def format_timespan(num_seconds, detailed=False, max_units=3):
     """
     Format a timespan in seconds as a human readable string.
 
     :param num_seconds: Number of seconds (integer or float).
+    :param detailed: :data:`True` to combine units all the way down to
+                     nanoseconds (e.g. ``1 second and 500 milliseconds``),
+                     :data:`False` (the default) to use fractional seconds
+                     for timespans shorter than a minute and to ignore the
+                     fractional part of longer timespans.
+    :param max_units: The maximum number of units to combine (an integer,
+                      defaults to 3).
     :returns: The formatted timespan as a string.
 
     Some examples:
 
     >>> from humanfriendly import format_timespan
     >>> format_timespan(0)
-    '0.00 seconds'
+    '0 seconds'
     >>> format_timespan(1)
-    '1.00 second'
+    '1 second'
     >>> format_timespan(math.pi)
     '3.14 seconds'
     >>> hour = 60 * 60
@@ -316,32 +402,141 @@ def format_timespan(num_seconds):
     >>> week = day * 7
     >>> format_timespan(week * 52 + day * 2 + hour * 3)
     '1 year, 2 days and 3 hours'
+
+    Timespans shorter than a tenth of a second (which would lose precision
+    when rounded to two decimal places) are formatted using milliseconds,
+    microseconds or nanoseconds, which makes the output of :class:`Timer`
+    useful for performance measurements:
+
+    >>> format_timespan(0.0042)
+    '4.2 milliseconds'
+    >>> format_timespan(0.000000123)
+    '123 nanoseconds'
+    >>> format_timespan(90.25, detailed=True)
+    '1 minute, 30 seconds and 250 milliseconds'
     """
-    if num_seconds < 60:
-        # Fast path.
-        return pluralize(round_number(num_seconds), 'second')
+    if detailed and num_seconds > 0:
+        # Round to whole nanoseconds so that floating point representation
+        # errors don't show up as "999 microseconds and 999 nanoseconds".
+        value = fractions.Fraction(int(round(num_seconds * 10**9)), 10**9)
+        return timespan_quantity.format_compound(value, max_units=max_units)
+    elif num_seconds < 60:
+        if num_seconds >= subsecond_threshold or num_seconds <= 0:
+            # Fast path.
+            return pluralize_decimal(round_number(num_seconds), 'second', 'seconds')
+        # Find the largest sub-second unit using the precomputed thresholds.
+        index = timespan_quantity.find_index(num_seconds)
+        # Round the value before settling on the unit, so that values that
+        # round up to the next unit (like 0.000999999 seconds) are formatted
+        # using that unit (1 millisecond instead of 1000 microseconds).
+        thresholds = timespan_quantity.thresholds
+        if round(float(num_seconds) / thresholds[index], 2) >= thresholds[index + 1] / thresholds[index]:
+            index += 1
+        return timespan_quantity.format_in_unit(num_seconds, index)
     else:
-        # Slow path.
-        result = []
-        for unit in reversed(time_units):
-            if num_seconds >= unit['divider']:
-                count = int(num_seconds / unit['divider'])
-                num_seconds %= unit['divider']
-                result.append(pluralize(count, unit['singular'], unit['plural']))
-        if len(result) == 1:
-            # A single count/unit combination.
-            return result[0]
-        else:
-            # Remove insignificant data from the formatted timespan and format
-            # it in a readable way.
-            return concatenate(result[:3])
+        # Slow path: Combine up to three units, leaving out insignificant data.
+        return timespan_quantity.format_compound(num_seconds, max_units=max_units, precision=1)
 
-def parse_timespan(timespan):
+@instrumented
+def format_timespans(values, max_units=3):
+    """
+    Format a sequence of timespans in seconds as human readable strings.
+
+    :param values: An iterable of numbers (the numbers of seconds).
+    :param max_units: The maximum number of units to combine (an integer).
+    :returns: A list of strings.
+
+    The output is identical to calling :func:`format_timespan()` for each value
+    (given the default `max_units`). Timespans shorter than a minute are
+    formatted directly, longer timespans are decomposed into counts of years,
+    weeks, days, hours, minutes and seconds one unit at a time for all of them
+    (using NumPy when it's installed) and the labels of the counts are reused
+    between values, which makes this a lot faster when formatting large
+    numbers of long timespans (for example the uptimes of a fleet of
+    servers).
+
+    >>> from humanfriendly import format_timespans
+    >>> format_timespans([0.5, 42, 90, 60 * 60 * 24 + 1])
+    ['0.5 seconds', '42 seconds', '1 minute and 30 seconds', '1 day and 1 second']
+    """
+    if is_numpy_object(values):
+        values = values.tolist()
+    elif not isinstance(values, (list, tuple)):
+        values = list(values)
+    # Timespans shorter than a minute don't need to be decomposed, they're
+    # formatted directly (which is the common case for latencies).
+    results = [format_timespan(value) if value < 60 else None for value in values]
+    indexes = [i for i, text in enumerate(results) if text is None]
+    if indexes:
+        long_values = [values[i] for i in indexes]
+        units = [u for u in reversed(timespan_quantity.units) if u['divider'] >= 1]
+        columns = decompose_values(long_values, [u['divider'] for u in units])
+        labels = [{} for u in units]
+        for index, value, counts in zip(indexes, long_values, zip(*columns)):
+            parts = []
+            for unit, unit_labels, count in zip(units, labels, counts):
+                if count:
+                    label = unit_labels.get(count)
+                    if label is None:
+                        label = pluralize(int(count), unit['singular'], unit['plural'])
+                        unit_labels[count] = label
+                    parts.append(label)
+            results[index] = concatenate(parts[:max_units]) if parts else timespan_quantity.format(value)
+    return results
+
+def decompose_values(values, dividers):
+    """
+    Decompose a sequence of values into counts of units.
+
+    :param values: A sequence of numbers.
+    :param dividers: The dividers of the units (a sequence of numbers, largest
+                     unit first).
+    :returns: A list with a sequence of counts (floats without a fractional
+              part) for each divider.
+
+    Each value is divided into integer counts of units in the same way as
+    :func:`~humanfriendly.units.Quantity.format_compound()` does it, but one
+    unit at a time for all values. When NumPy is installed the arithmetic is
+    done on NumPy arrays, otherwise :class:`array.array` objects are used.
+    """
+    # NumPy is an optional dependency that's imported here (instead of at
+    # module level) because importing it is slow compared to the rest of
+    # the package.
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    columns = []
+    if numpy is not None:
+        remainders = numpy.array(values, dtype=numpy.float64)
+        for divider in dividers:
+            mask = remainders >= divider
+            counts = numpy.where(mask, numpy.trunc(remainders / divider), 0.0)
+            remainders = numpy.where(mask, numpy.mod(remainders, divider), remainders)
+            columns.append(counts.tolist())
+    else:
+        remainders = array.array('d', values)
+        for divider in dividers:
+            counts = array.array('d', [0.0]) * len(remainders)
+            for index, remainder in enumerate(remainders):
+                if remainder >= divider:
+                    counts[index] = float(int(remainder / divider))
+                    remainders[index] = remainder % divider
+            columns.append(counts)
+    return columns
+
+@instrumented
+def parse_timespan(timespan, cached=False):
     """
     Parse a "human friendly" timespan into the number of seconds.
 
-    :param value: A string like ``5h`` (5 hours), ``10m`` (10 minutes) or
-                  ``42s`` (42 seconds).
+    :param value: A string like ``5h`` (5 hours), ``10m`` (10 minutes),
+                  ``42s`` (42 seconds), ``250ms`` (250 milliseconds) or a
+                  combination like ``1h30m`` or ``2d 4h``.
+    :param cached: :data:`True` to remember the results of previous calls in a
+                   bounded cache (useful when the same strings are parsed over
+                   and over again, for example schedule definitions),
+                   :data:`False` (the default) to parse every time.
     :returns: The number of seconds as a floating point number.
     :raises: :exc:`InvalidTimespan` when the input can't be parsed.
 
@@ -364,27 +559,319 @@ def parse_timespan(timespan):
     3600.0
     >>> parse_timespan('1d')
     86400.0
+    >>> parse_timespan('1h 30m 15s')
+    5415.0
+    >>> parse_timespan('1.5ms')
+    0.0015
     """
-    tokens = tokenize(timespan)
-    if tokens and isinstance(tokens[0], numbers.Number):
-        # If the input contains only a number, it's assumed to be the number of seconds.
+    if cached:
+        seconds = timespan_cache.get(timespan)
+        if seconds is None:
+            if len(timespan_cache) >= TIMESPAN_CACHE_SIZE:
+                # Keep the cache bounded by starting over when it's full.
+                timespan_cache.clear()
+            seconds = float(timespan_quantity.parse_compound(timespan))
+            timespan_cache[timespan] = seconds
+        return seconds
+    return float(timespan_quantity.parse_compound(timespan))
+
+@instrumented
+def format_rate(num_bytes, duration=1, bits=False, interval='second', binary=None, keep_width=False):
+    """
+    Format a data transfer rate as a human readable string.
+
+    :param num_bytes: The number of bytes transferred (a number).
+    :param duration: The number of seconds it took to transfer the data (a
+                     number or a :class:`Timer` object, defaults to one
+                     second).
+    :param bits: :data:`True` to format the rate in bits (using decimal
+                 units like kbit and Mbit), :data:`False` (the default) to
+                 format the rate in bytes (using the same units as
+                 :func:`format_size()`).
+    :param interval: The denominator of the rate: 'second' (the default),
+                     'minute' or 'hour' (abbreviations like 's' and 'min' are
+                     also accepted).
+    :param binary: Refer to :func:`format_size()` (ignored when `bits` is
+                   :data:`True`).
+    :param keep_width: Refer to :func:`format_size()`.
+    :returns: The formatted rate (a string).
+    :raises: :exc:`~exceptions.ValueError` when the interval isn't supported.
+
+    Some examples:
+
+    >>> from humanfriendly import format_rate
+    >>> format_rate(1024 ** 2 * 15, duration=10)
+    '1.5 MB/s'
+    >>> format_rate(1000 ** 2 * 15, duration=10, bits=True)
+    '12 Mbit/s'
+    >>> format_rate(1024, interval='minute')
+    '60 KB/min'
+
+    Because `duration` can be a :class:`Timer` object it's easy to report the
+    average transfer rate of an ongoing operation:
+
+    >>> from humanfriendly import Timer
+    >>> timer = Timer()
+    >>> num_bytes = download_some_data()
+    >>> print("Downloaded %s (%s)" % (format_size(num_bytes), format_rate(num_bytes, timer)))
+    Downloaded 95.37 MB (9.53 MB/s)
+    """
+    quantity, multiplier, suffix = select_rate_units(bits, interval, binary)
+    return quantity.format(num_bytes * multiplier / coerce_duration(duration), keep_width) + suffix
+
+@instrumented
+def format_rates(values, duration=1, bits=False, interval='second', binary=None, keep_width=False):
+    """
+    Format a series of data transfer rates (e.g. samples of a time series).
+
+    :param values: An iterable of numbers (the numbers of bytes transferred).
+    :param duration: The number of seconds it took to transfer each value (a
+                     number or a :class:`Timer` object, which applies to all
+                     values) or an iterable of numbers with one duration per
+                     value.
+    :param bits: Refer to :func:`format_rate()`.
+    :param interval: Refer to :func:`format_rate()`.
+    :param binary: Refer to :func:`format_rate()`.
+    :param keep_width: Refer to :func:`format_rate()`.
+    :returns: A list of strings.
+
+    The units are selected once for the whole series, so this is faster than
+    calling :func:`format_rate()` for each value:
+
+    >>> from humanfriendly import format_rates
+    >>> format_rates([512, 1024 ** 2, 1024 ** 3 * 3], duration=2)
+    ['256 bytes/s', '512 KB/s', '1.5 GB/s']
+    """
+    quantity, multiplier, suffix = select_rate_units(bits, interval, binary)
+    format = quantity.format
+    if isinstance(duration, (numbers.Number, Timer)):
+        factor = multiplier / coerce_duration(duration)
+        return [format(value * factor, keep_width) + suffix for value in values]
+    else:
+        return [format(value * multiplier / coerce_duration(seconds), keep_width) + suffix
+                for value, seconds in zip(values, duration)]
+
+@instrumented
+def parse_rate(rate, binary=None):
+    """
+    Parse a human readable data transfer rate and return the number of bytes per second.
+
+    :param rate: The human readable rate to parse (a string).
+    :param binary: Refer to :func:`parse_size()`.
+    :returns: The corresponding number of bytes per second (a float).
+    :raises: :exc:`InvalidRate` when the input can't be parsed.
+
+    The rate is expected to consist of a data size, a slash and an interval
+    (e.g. ``5 MB/s``, ``100 Mbit/s`` or ``2 GB/min``). Abbreviations like
+    ``Mbps`` and ``MBps`` are also accepted. When the interval is omitted the
+    rate is assumed to be per second. Following the common convention, unit
+    abbreviations ending in a lowercase "b" (like ``Mb``) and unit names
+    containing "bit" are interpreted as bits, other units are interpreted as
+    bytes (using :func:`parse_size()` semantics). Some examples:
+
+    >>> from humanfriendly import parse_rate
+    >>> parse_rate('5 MB/s')
+    5242880.0
+    >>> parse_rate('100 Mbps')
+    12500000.0
+    >>> parse_rate('60 KB/min')
+    1024.0
+    """
+    amount, _, interval = rate.partition('/')
+    if not interval:
+        # Support abbreviations like `Mbps' and `MBps'.
+        amount = amount.strip()
+        if amount.lower().endswith('ps'):
+            amount, interval = amount[:-2], 's'
+    interval_unit = rate_intervals.lookup(interval.strip() or 's')
+    tokens = tokenize(amount, exact=True)
+    if interval_unit and tokens and isinstance(tokens[0], numbers.Number):
         if len(tokens) == 1:
-            return float(tokens[0])
-        # Otherwise we expect to find two tokens: A number and a unit.
-        if len(tokens) == 2 and isinstance(tokens[1], string_types):
-            normalized_unit = tokens[1].lower()
-            # Try to match the first letter of the unit.
-            for unit in time_units:
-                # All of the first letters of the time units are unique, so
-                # although this check is not very strict I believe it to be
-                # sufficient.
-                if normalized_unit.startswith(unit['singular'][0]):
-                    return float(tokens[0]) * unit['divider']
-    # We failed to parse the timespan specification.
-    msg = "Failed to parse timespan! (input %r was tokenized as %r)"
-    raise InvalidTimespan(msg % (timespan, tokens))
-
-def parse_date(datestring):
+            if is_finite(tokens[0]):
+                return float(tokens[0]) / interval_unit['divider']
+        elif len(tokens) == 2 and isinstance(tokens[1], string_types):
+            unit_name = tokens[1]
+            if 'bit' in unit_name.lower() or unit_name.endswith('b'):
+                unit = bit_quantity.lookup(unit_name)
+                factor = 8
+            else:
+                unit = disk_size_registry['si' if binary is False else 'jedec'].lookup(unit_name)
+                factor = 1
+            if unit and is_finite(tokens[0] * unit['divider']):
+                return float(tokens[0] * unit['divider']) / (factor * interval_unit['divider'])
+    # We failed to parse the rate specification.
+    msg = "Failed to parse rate! (input %r was tokenized as %r)"
+    raise InvalidRate(msg % (rate, tokenize(rate)))
+
+def select_rate_units(bits, interval, binary):
+    """
+    Select the units used by :func:`format_rate()` and :func:`format_rates()`.
+
+    :param bits: Refer to :func:`format_rate()`.
+    :param interval: Refer to :func:`format_rate()`.
+    :param binary: Refer to :func:`format_rate()`.
+    :returns: A tuple with three values: A :class:`~humanfriendly.units.Quantity`
+              object, the number to multiply byte counts with (to convert them
+              to bits and/or to a larger interval) and the suffix of formatted
+              rates (a string).
+    :raises: :exc:`~exceptions.ValueError` when the interval isn't supported.
+    """
+    interval_unit = rate_intervals.lookup(interval)
+    if not interval_unit:
+        msg = "Unsupported interval! (expected 'second', 'minute' or 'hour' but got: %r)"
+        raise ValueError(msg % interval)
+    if bits:
+        quantity = bit_quantity
+        multiplier = 8 * interval_unit['divider']
+    else:
+        quantity = disk_size_registry[format_size_systems[binary]]
+        multiplier = interval_unit['divider']
+    return quantity, multiplier, '/' + interval_unit['singular']
+
+def coerce_duration(duration):
+    """
+    Get the number of seconds in a duration.
+
+    :param duration: A number or a :class:`Timer` object.
+    :returns: The number of seconds (a float).
+    """
+    if isinstance(duration, Timer):
+        duration = duration.elapsed_time
+    return float(duration)
+
+@instrumented
+def format_age(timestamp, now=None, granularity=None):
+    """
+    Format the age of a timestamp as a human readable string.
+
+    :param timestamp: The timestamp (a number like :func:`time.time()`
+                      returns or a :class:`datetime.datetime` object in
+                      local time).
+    :param now: The reference time (same types as `timestamp`, defaults to
+                the current time).
+    :param granularity: The number of seconds to round ages down to (a
+                        number, optional). When given, ages in the same
+                        bucket share a single string object from a cache
+                        (the bucket ``0 <= age < granularity`` is formatted
+                        as zero seconds).
+    :returns: The formatted age (a string, refer to :func:`format_timespan()`).
+
+    >>> from humanfriendly import format_age
+    >>> format_age(1371430062, now=1371430062 + 90)
+    '1 minute and 30 seconds'
+    >>> format_age(1371430062, now=1371430062 + 90, granularity=60)
+    '1 minute'
+    """
+    if now is None:
+        now = time.time()
+    return format_bucketed_age(coerce_timestamp(now) - coerce_timestamp(timestamp), granularity, False)
+
+@instrumented
+def format_ages(timestamps, now=None, granularity=None):
+    """
+    Format the ages of a sequence of timestamps.
+
+    :param timestamps: An iterable of timestamps (refer to :func:`format_age()`).
+    :param now: Refer to :func:`format_age()`.
+    :param granularity: Refer to :func:`format_age()`.
+    :returns: A list of strings.
+
+    The clock is read only once, so all ages are relative to the same moment.
+    """
+    if now is None:
+        now = time.time()
+    now = coerce_timestamp(now)
+    return [format_bucketed_age(now - coerce_timestamp(t), granularity, False) for t in timestamps]
+
+@instrumented
+def format_relative_time(timestamp, now=None, granularity=None):
+    """
+    Format a timestamp relative to the current (or a given) time.
+
+    :param timestamp: Refer to :func:`format_age()`.
+    :param now: Refer to :func:`format_age()`.
+    :param granularity: Refer to :func:`format_age()`.
+    :returns: A string like ``5 minutes ago`` (for timestamps in the past) or
+              ``in 5 minutes`` (for timestamps in the future).
+
+    >>> from humanfriendly import format_relative_time
+    >>> format_relative_time(1371430062, now=1371430062 + 300)
+    '5 minutes ago'
+    >>> format_relative_time(1371430062 + 7200, now=1371430062)
+    'in 2 hours'
+    """
+    if now is None:
+        now = time.time()
+    return format_bucketed_age(coerce_timestamp(now) - coerce_timestamp(timestamp), granularity, True)
+
+@instrumented
+def format_relative_times(timestamps, now=None, granularity=None):
+    """
+    Format a sequence of timestamps relative to the current (or a given) time.
+
+    :param timestamps: An iterable of timestamps (refer to :func:`format_age()`).
+    :param now: Refer to :func:`format_age()`.
+    :param granularity: Refer to :func:`format_age()`.
+    :returns: A list of strings (refer to :func:`format_relative_time()`).
+
+    The clock is read only once, so all timestamps are relative to the same
+    moment.
+    """
+    if now is None:
+        now = time.time()
+    now = coerce_timestamp(now)
+    return [format_bucketed_age(now - coerce_timestamp(t), granularity, True) for t in timestamps]
+
+def format_bucketed_age(age, granularity, relative):
+    """
+    Format an age, optionally rounded to a granularity and cached.
+
+    :param age: The age in seconds (a number, negative for future timestamps).
+    :param granularity: Refer to :func:`format_age()`.
+    :param relative: :data:`True` to format a relative time (refer to
+                     :func:`format_relative_time()`), :data:`False` to format
+                     an age (refer to :func:`format_age()`).
+    :returns: The formatted age (a string).
+    """
+    if not granularity:
+        return format_relative_age(age) if relative else format_timespan(age)
+    # Round towards zero so that past and future timestamps are bucketed symmetrically.
+    age = int(age / granularity) * granularity
+    key = (age, relative)
+    text = age_cache.get(key)
+    if text is None:
+        if len(age_cache) >= AGE_CACHE_SIZE:
+            # Keep the cache bounded by starting over when it's full.
+            age_cache.clear()
+        text = format_relative_age(age) if relative else format_timespan(age)
+        age_cache[key] = text
+    return text
+
+def format_relative_age(age):
+    """
+    Format an age as a relative time.
+
+    :param age: The age in seconds (a number, negative for future timestamps).
+    :returns: A string like ``5 minutes ago`` or ``in 5 minutes``.
+    """
+    if age < 0:
+        return 'in ' + format_timespan(-age)
+    return format_timespan(age) + ' ago'
+
+def coerce_timestamp(value):
+    """
+    Coerce a timestamp to a number.
+
+    :param value: A number (seconds since the Unix epoch) or a
+                  :class:`datetime.datetime` object (in local time).
+    :returns: A number.
+    """
+    if isinstance(value, datetime.datetime):
+        return time.mktime(value.timetuple()) + value.microsecond / 1000000.0
+    return value
+
+@instrumented
+def parse_date(datestring, microseconds=False):
     """
     Parse a date/time string in one of the formats listed below. Raises
     :py:class:`InvalidDate` when the date cannot be parsed. Supported date/time
@@ -392,10 +879,23 @@ def parse_date(datestring):
 
     - ``YYYY-MM-DD``
     - ``YYYY-MM-DD HH:MM:SS``
+    - ISO 8601 dates and times like ``2013-06-17T02:47:42.5+02:00``,
+      ``20130617T024742Z``, ``2013-168`` (ordinal dates) and ``2013-W25-1``
+      (week dates).
 
     :param datestring: The date/time string to parse.
+    :param microseconds: :data:`True` to include the fractional seconds,
+                         :data:`False` to ignore them (the default).
     :returns: A tuple with the numbers ``(year, month, day, hour, minute,
-              second)`` (all numbers are integers).
+              second)`` (all numbers are integers). If `microseconds` is
+              :data:`True` a seventh number is added: The number of
+              microseconds.
+
+    When the input includes a time zone offset the result is converted to
+    UTC. Dates and times that don't exist (like ``2013-02-30`` or ``25:00``)
+    are rejected. Parsing of the canonical ``YYYY-MM-DD HH:MM:SS`` layout takes a fast
+    path that slices the fields at fixed offsets. To parse many date/time
+    strings use :func:`parse_dates()`.
 
     Examples:
 
@@ -404,6 +904,8 @@ def parse_date(datestring):
     (2013, 6, 17, 0, 0, 0)
     >>> parse_date('2013-06-17 02:47:42')
     (2013, 6, 17, 2, 47, 42)
+    >>> parse_date('2013-06-17T02:47:42.5+02:00', microseconds=True)
+    (2013, 6, 17, 0, 47, 42, 500000)
 
     Here's how you convert the result to a number (`Unix time`_):
 
@@ -433,18 +935,108 @@ def parse_date(datestring):
     .. _Unix time: http://en.wikipedia.org/wiki/Unix_time
     """
     try:
-        tokens = list(map(str.strip, datestring.split()))
-        if len(tokens) >= 2:
-            date_parts = list(map(int, tokens[0].split('-'))) + [1, 1]
-            time_parts = list(map(int, tokens[1].split(':'))) + [0, 0, 0]
-            return tuple(date_parts[0:3] + time_parts[0:3])
+        match = CANONICAL_DATE_PATTERN.match(datestring)
+        if match:
+            # Fast path for the canonical layout.
+            year, month, day, hour, minute, second = match.groups()
+            fields = (int(year), int(month), int(day), int(hour), int(minute), int(second), 0)
         else:
-            year, month, day = (list(map(int, datestring.split('-'))) + [1, 1])[0:3]
-            return (year, month, day, 0, 0, 0)
+            fields = parse_iso_8601(datestring)
+        # Both paths reject out of range fields (raising ValueError).
+        datetime.datetime(*fields)
+        return fields if microseconds else fields[:6]
     except Exception:
-        msg = "Invalid date! (expected 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' but got: %r)"
-        raise InvalidDate(msg % datestring)
+        msg = "Invalid date! (expected 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS' or an ISO 8601 date/time but got: %r)"
+        raise InvalidDate(msg % (datestring,))
+
+@instrumented
+def parse_dates(datestrings, microseconds=False):
+    """
+    Parse a sequence of date/time strings (e.g. a column of a log file).
+
+    :param datestrings: An iterable of strings.
+    :param microseconds: Refer to :func:`parse_date()`.
+    :returns: A list of tuples (refer to :func:`parse_date()`).
+    :raises: :exc:`InvalidDate` when one of the strings can't be parsed.
+
+    Strings in the canonical ``YYYY-MM-DD HH:MM:SS`` layout are split into a
+    date part and a time part and both parts are cached (for the duration of
+    the call), so timestamps that share a date and a time of day with earlier
+    timestamps are assembled from two dictionary lookups. Other strings are
+    parsed using :func:`parse_date()`.
+
+    >>> from humanfriendly import parse_dates
+    >>> parse_dates(['2013-06-17 02:47:42', '2013-06-17 02:47:43'])
+    [(2013, 6, 17, 2, 47, 42), (2013, 6, 17, 2, 47, 43)]
+    """
+    results = []
+    append = results.append
+    # The caches are only populated with the date parts and time parts of
+    # strings in the canonical layout, so when both parts of a string are
+    # found in the caches the string is known to be in the canonical layout.
+    date_cache = {}
+    time_cache = {}
+    for datestring in datestrings:
+        date_part = date_cache.get(datestring[:10])
+        if date_part is not None:
+            time_part = time_cache.get(datestring[10:])
+            if time_part is not None:
+                append(date_part + time_part)
+                continue
+        fields = parse_date(datestring, microseconds=microseconds)
+        if CANONICAL_DATE_PATTERN.match(datestring):
+            date_cache[datestring[:10]] = fields[:3]
+            time_cache[datestring[10:]] = fields[3:]
+        append(fields)
+    return results
+
+def parse_iso_8601(datestring):
+    """
+    Parse an ISO 8601 date/time string (used by :func:`parse_date()`).
 
+    :param datestring: The date/time string to parse.
+    :returns: A tuple with seven integers: The year, month, day, hour, minute,
+              second and microsecond.
+    :raises: :exc:`~exceptions.ValueError` when the string can't be parsed.
+
+    Omitted components default to the start of the period (for example
+    ``2013-06`` is parsed as the first of June at midnight). When a time zone
+    offset is given the result is converted to UTC.
+    """
+    match = ISO_8601_PATTERN.match(datestring)
+    if not match:
+        raise ValueError("Not an ISO 8601 date/time!")
+    year = int(match.group('year'))
+    if match.group('week'):
+        # Week dates are relative to the Monday of the first week of the year
+        # (the week that contains January 4th).
+        january_4th = datetime.date(year, 1, 4)
+        date = january_4th + datetime.timedelta(days=((int(match.group('week')) - 1) * 7 +
+                                                      int(match.group('weekday')) - january_4th.isoweekday()))
+        year, month, day = date.year, date.month, date.day
+    elif match.group('ordinal'):
+        date = datetime.date(year, 1, 1) + datetime.timedelta(days=int(match.group('ordinal')) - 1)
+        year, month, day = date.year, date.month, date.day
+    else:
+        month = int(match.group('month') or 1)
+        day = int(match.group('day') or 1)
+    fields = (year, month, day,
+              int(match.group('hour') or 0),
+              int(match.group('minute') or 0),
+              int(match.group('second') or 0),
+              int((match.group('fraction') or '0').ljust(6, '0')[:6]))
+    offset = match.group('offset')
+    if offset and offset not in ('Z', 'UTC'):
+        digits = offset[1:].replace(':', '')
+        minutes = int(digits[:2]) * 60 + int(digits[2:] or 0)
+        if offset[0] == '-':
+            minutes = -minutes
+        value = datetime.datetime(*fields) - datetime.timedelta(minutes=minutes)
+        fields = (value.year, value.month, value.day, value.hour,
+                  value.minute, value.second, value.microsecond)
+    return fields
+
+@instrumented
 def format_path(pathname):
     """
     Given an absolute pathname, abbreviate the user's home directory to ``~/``
@@ -474,6 +1066,7 @@ def format_path(pathname):
             pathname = os.path.join('~', os.path.relpath(pathname, home))
     return pathname
 
+@instrumented
 def parse_path(pathname):
     """
     Convert a human friendly pathname to an absolute pathname.
@@ -601,7 +1194,9 @@ class Timer(object):
     def __str__(self):
         """
         When a :py:class:`Timer` is coerced to a string it will show the
-        elapsed time since the :py:class:`Timer` was created.
+        elapsed time since the :py:class:`Timer` was created (formatted
+        using :func:`format_timespan()`, so short timespans are shown in
+        milliseconds, microseconds or nanoseconds).
         """
         return format_timespan(self.elapsed_time)
 
@@ -780,7 +1375,7 @@ class InvalidDate(Exception):
     Traceback (most recent call last):
       File "humanfriendly.py", line 206, in parse_date
         raise InvalidDate, msg % datestring
-    humanfriendly.InvalidDate: Invalid date! (expected 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' but got: '2013-06-XY')
+    humanfriendly.InvalidDate: Invalid date! (expected 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS' or an ISO 8601 date/time but got: '2013-06-XY')
     """
 
 class InvalidSize(Exception):
@@ -808,6 +1403,19 @@ class InvalidLength(Exception):
     humanfriendly.InvalidLength: Failed to parse length! (input '5 Z' was tokenized as [5, 'Z'])
     """
 
+class InvalidRate(Exception):
+    """
+    Raised by :py:func:`parse_rate()` when a string cannot be parsed into a
+    data transfer rate:
+
+    >>> from humanfriendly import parse_rate
+    >>> parse_rate('5 MB/fortnight')
+    Traceback (most recent call last):
+      File "humanfriendly/__init__.py", line 525, in parse_rate
+        raise InvalidRate(msg % (rate, tokenize(rate)))
+    humanfriendly.InvalidRate: Failed to parse rate! (input '5 MB/fortnight' was tokenized as [5, 'MB/fortnight'])
+    """
+
 class InvalidTimespan(Exception):
     """
     Raised by :py:func:`parse_timespan()` when a string cannot be parsed into a
@@ -820,3 +1428,29 @@ class InvalidTimespan(Exception):
         raise InvalidTimespan(msg % (timespan, tokens))
     humanfriendly.InvalidTimespan: Failed to parse timespan! (input '1 age' was tokenized as [1, 'age'])
     """
+
+# The quantities below are compiled from the unit tables defined at the top of
+# this module. They're defined here because they refer to the exception classes
+# defined above.
+
+# The disk size units compiled for fast formatting and parsing. The IEC unit
+# names (KiB, MiB, etc.) are unambiguous so they're recognized by all systems.
+disk_size_registry = UnitRegistry(Quantity('iec', binary_size_units, description='size', exception=InvalidSize, exact=True))
+disk_size_registry.add(Quantity('si', decimal_size_units, extends=disk_size_registry['iec'],
+                                description='size', exception=InvalidSize, exact=True))
+disk_size_registry.add(Quantity('jedec', disk_size_units, extends=disk_size_registry['iec'],
+                                description='size', exception=InvalidSize, exact=True))
+
+# Quantities used by format_length(), parse_length(), format_timespan() and
+# parse_timespan().
+length_quantity = Quantity('length', length_size_units, exception=InvalidLength)
+timespan_quantity = Quantity('timespan', time_units, exception=InvalidTimespan, exact=True)
+
+# The intervals used by format_rate() and parse_rate().
+rate_intervals = UnitSystem('intervals', rate_interval_units)
+
+# Additional quantities that don't have dedicated functions (use the format(),
+# parse(), format_many() and parse_many() methods instead).
+frequency_quantity = Quantity('frequency', frequency_units)
+bit_quantity = Quantity('bits', bit_units)
+iops_quantity = Quantity('iops', iops_units, description='IOPS')
@@ -0,0 +1,246 @@
+# Human friendly input/output in Python.
+#
+# Author: Peter Odding <peter@peterodding.com>
+# Last Change: October 18, 2026
+# URL: https://humanfriendly.readthedocs.org
+
+"""
+The :mod:`~humanfriendly.caching` module implements optional memoization of
+the formatting functions of the `humanfriendly` package. Programs that format
+the same values over and over again (for example a dashboard that renders the
+same byte counts every few seconds) can enable it to avoid repeating the work.
+
+Each memoized function gets its own bounded cache that discards the least
+recently used entry when it's full. Memoization is disabled by default and can
+be controlled in two ways:
+
+- Globally by calling :func:`enable()` and :func:`disable()`.
+
+- Per call by passing the keyword argument ``cached=True`` or ``cached=False``
+  to a memoized function (this overrides the global setting).
+
+The caches are protected by locks so they can be used from multiple threads.
+Here's an example:
+
+>>> import humanfriendly
+>>> from humanfriendly import caching
+>>> caching.enable()
+>>> humanfriendly.format_size(4096)
+'4 KB'
+>>> humanfriendly.format_size(4096)
+'4 KB'
+>>> caching.cache_info()['humanfriendly.format_size']
+CacheInfo(hits=1, misses=1, maxsize=1024, currsize=1)
+"""
+
+# Standard library modules.
+import collections
+import functools
+import threading
+
+DEFAULT_CACHE_SIZE = 1024
+"""The default maximum number of entries in each cache (an integer)."""
+
+CacheInfo = collections.namedtuple('CacheInfo', 'hits misses maxsize currsize')
+"""The statistics of a cache (a named tuple returned by :func:`LRUCache.info()`)."""
+
+# Mapping of qualified function names to LRUCache objects.
+caches = {}
+
+# Memoization is disabled by default.
+enabled = False
+
+# Indices into the links of the doubly linked list used by LRUCache.
+PREVIOUS, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+# Marker used to separate positional from keyword arguments in cache keys.
+keyword_marker = object()
+
+
+class LRUCache(object):
+
+    """
+    A bounded, thread safe cache that discards the least recently used entry.
+
+    The entries are stored in a dictionary (for lookups) and a circular doubly
+    linked list (to keep track of the order in which they were used) so that
+    all operations take constant time.
+
+    >>> from humanfriendly.caching import LRUCache
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.put('a', 1)
+    >>> cache.put('b', 2)
+    >>> cache.get('a')
+    1
+    >>> cache.put('c', 3)
+    >>> cache.get('b', 'missing')
+    'missing'
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        Initialize a cache.
+
+        :param maxsize: The maximum number of entries (an integer, defaults to
+                        :data:`DEFAULT_CACHE_SIZE`).
+        """
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self.lock:
+            self.mapping = {}
+            # The root of the linked list is a sentinel link: root[NEXT] is
+            # the least recently used entry and root[PREVIOUS] the most
+            # recently used entry.
+            self.root = []
+            self.root[:] = [self.root, self.root, None, None]
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, key, default=None):
+        """
+        Get the value of an entry and mark it as the most recently used entry.
+
+        :param key: The key of the entry (a hashable value).
+        :param default: The value to return when the key isn't in the cache.
+        :returns: The cached value or `default`.
+        """
+        with self.lock:
+            link = self.mapping.get(key)
+            if link is None:
+                self.misses += 1
+                return default
+            # Move the link to the most recently used end of the list.
+            link[PREVIOUS][NEXT] = link[NEXT]
+            link[NEXT][PREVIOUS] = link[PREVIOUS]
+            last = self.root[PREVIOUS]
+            last[NEXT] = self.root[PREVIOUS] = link
+            link[PREVIOUS] = last
+            link[NEXT] = self.root
+            self.hits += 1
+            return link[VALUE]
+
+    def put(self, key, value):
+        """
+        Add an entry to the cache (discarding the least recently used entry if the cache is full).
+
+        :param key: The key of the entry (a hashable value).
+        :param value: The value of the entry.
+        """
+        with self.lock:
+            if key in self.mapping or self.maxsize <= 0:
+                return
+            if len(self.mapping) >= self.maxsize:
+                oldest = self.root[NEXT]
+                oldest[PREVIOUS][NEXT] = oldest[NEXT]
+                oldest[NEXT][PREVIOUS] = oldest[PREVIOUS]
+                del self.mapping[oldest[KEY]]
+            last = self.root[PREVIOUS]
+            link = [last, self.root, key, value]
+            last[NEXT] = self.root[PREVIOUS] = link
+            self.mapping[key] = link
+
+    def resize(self, maxsize):
+        """
+        Change the maximum number of entries (discarding the least recently used entries that no longer fit).
+
+        :param maxsize: The maximum number of entries (an integer).
+        """
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.mapping) > max(maxsize, 0):
+                oldest = self.root[NEXT]
+                oldest[PREVIOUS][NEXT] = oldest[NEXT]
+                oldest[NEXT][PREVIOUS] = oldest[PREVIOUS]
+                del self.mapping[oldest[KEY]]
+
+    def info(self):
+        """
+        Get the statistics of the cache.
+
+        :returns: A :data:`CacheInfo` named tuple.
+        """
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.mapping))
+
+
+def memoized(function):
+    """
+    Decorator to add optional memoization to a function.
+
+    :param function: The function to memoize (a callable).
+    :returns: A wrapper that accepts the additional keyword argument
+              ``cached`` (refer to the module documentation).
+
+    Calls with unhashable arguments are never cached.
+    """
+    name = '%s.%s' % (function.__module__, function.__name__)
+    cache = caches[name] = LRUCache()
+    missing = object()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kw):
+        if not (kw.pop('cached', enabled) if kw else enabled):
+            return function(*args, **kw)
+        key = args + (keyword_marker,) + tuple(sorted(kw.items())) if kw else args
+        try:
+            value = cache.get(key, missing)
+        except TypeError:
+            # Unhashable arguments.
+            return function(*args, **kw)
+        if value is missing:
+            value = function(*args, **kw)
+            cache.put(key, value)
+        return value
+
+    wrapper.cache = cache
+    return wrapper
+
+
+def enable(maxsize=None):
+    """
+    Enable memoization of the formatting functions of the `humanfriendly` package.
+
+    :param maxsize: The maximum number of entries per cache (an integer,
+                    optional). When given the caches are resized (see
+                    :func:`LRUCache.resize()`).
+    """
+    global enabled
+    enabled = True
+    if maxsize is not None:
+        for cache in caches.values():
+            cache.resize(maxsize)
+
+
+def disable():
+    """Disable memoization (unless requested per call, the caches are preserved)."""
+    global enabled
+    enabled = False
+
+
+def is_enabled():
+    """
+    Check whether memoization is enabled globally.
+
+    :returns: :data:`True` if memoization is enabled, :data:`False` otherwise.
+    """
+    return enabled
+
+
+def clear():
+    """Clear all caches (and their statistics)."""
+    for cache in caches.values():
+        cache.clear()
+
+
+def cache_info():
+    """
+    Get the statistics of all caches.
+
+    :returns: A dictionary that maps qualified function names (strings) to
+              :data:`CacheInfo` named tuples.
+    """
+    return dict((name, cache.info()) for name, cache in caches.items())
@@ -23,13 +23,19 @@ Supported options:
     Read tabular data from standard input (each line is a row and each
     whitespace separated field is a column), format the data as a table and
     print the resulting table to standard output. See also the --delimiter
-    option.
+    and --output-format options.
 
   -d, --delimiter=VALUE
 
     Change the delimiter used by --format-table to VALUE (a string). By default
     all whitespace is treated as a delimiter.
 
+  -o, --output-format=NAME
+
+    Change the output format used by --format-table to NAME, one of the
+    strings 'pretty' (the default), 'robust', 'markdown', 'csv', 'tsv' or
+    'jsonl'.
+
   -l, --format-length=LENGTH
 
     Convert a length count (given as the integer or float LENGTH) into a human
@@ -78,33 +84,40 @@ from humanfriendly import (
     format_length,
     format_number,
     format_size,
-    format_table,
     format_timespan,
     parse_length,
     parse_size,
     Spinner,
     Timer,
 )
+from humanfriendly.tables import OUTPUT_FORMATS, write_table
 from humanfriendly.terminal import usage
 
 
 def main():
     """Command line interface for the ``humanfriendly`` program."""
     try:
-        options, arguments = getopt.getopt(sys.argv[1:], 'cd:hn:s:t:', [
+        options, arguments = getopt.getopt(sys.argv[1:], 'cd:hn:o:s:t:', [
             'delimiter=', 'format-length=', 'format-number=', 'format-size=',
-            'format-table', 'format-timespan=', 'parse-length=',
-            'parse-size=', 'run-command', 'help',
+            'format-table', 'format-timespan=', 'output-format=',
+            'parse-length=', 'parse-size=', 'run-command', 'help',
         ])
     except getopt.GetoptError as e:
         sys.stderr.write("Error: %s\n" % e)
         sys.exit(1)
     actions = []
     delimiter = None
+    output_format = 'pretty'
     should_format_table = False
     for option, value in options:
         if option in ('-d', '--delimiter'):
             delimiter = value
+        elif option in ('-o', '--output-format'):
+            if value not in OUTPUT_FORMATS:
+                sys.stderr.write("Error: Unsupported output format! (expected one of %s but got %r)\n"
+                                 % (', '.join(OUTPUT_FORMATS), value))
+                sys.exit(1)
+            output_format = value
         elif option == '--parse-size':
             actions.append(functools.partial(print_parsed_size, value))
         elif option == '--parse-length':
@@ -125,7 +138,7 @@ def main():
             usage(__doc__)
             return
     if should_format_table:
-        actions.append(functools.partial(print_formatted_table, delimiter))
+        actions.append(functools.partial(print_formatted_table, delimiter, output_format))
     if not actions:
         usage(__doc__)
         return
@@ -165,13 +178,13 @@ def print_formatted_size(value):
     print(format_size(int(value)))
 
 
-def print_formatted_table(delimiter):
+def print_formatted_table(delimiter, output_format='pretty'):
     """Read tabular data from standard input and print a table."""
     data = []
     for line in sys.stdin:
         line = line.rstrip()
         data.append(line.split(delimiter))
-    print(format_table(data))
+    write_table(sys.stdout, data, output_format=output_format)
 
 
 def print_formatted_timespan(value):
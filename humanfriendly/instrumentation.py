@@ -0,0 +1,221 @@
+# Human friendly input/output in Python.
+#
+# Author: Peter Odding <peter@peterodding.com>
+# Last Change: October 18, 2026
+# URL: https://humanfriendly.readthedocs.org
+
+"""
+The :mod:`~humanfriendly.instrumentation` module counts calls to the public
+functions of the `humanfriendly` package and measures the time spent in them.
+This makes it easy to find out which functions dominate the runtime of a
+program without having to run it under a profiler.
+
+Instrumentation is disabled by default and can be enabled in two ways:
+
+- By setting the environment variable ``$HUMANFRIENDLY_INSTRUMENTATION`` to
+  one of the strings '1', 'yes', 'true' or 'on' before the `humanfriendly`
+  package is imported. In this case a report is printed to the standard error
+  stream when the Python interpreter exits.
+
+- By calling :func:`enable()` (and later :func:`disable()`) from Python code.
+  Because :func:`enable()` has to rebind the instrumented functions, code that
+  imported functions with ``from humanfriendly import ...`` *before* calling
+  :func:`enable()` will keep calling the original (uninstrumented) functions.
+
+When instrumentation is disabled the public functions are the original
+functions (there's no wrapper in between) so there's no overhead at all. The
+timings reported are inclusive, so when :func:`.format_size()` calls
+:func:`.round_number()` the time spent in :func:`.round_number()` is included
+in the time reported for :func:`.format_size()`.
+
+Here's an example:
+
+>>> import humanfriendly
+>>> from humanfriendly import instrumentation
+>>> instrumentation.enable()
+>>> print(humanfriendly.format_size(1024 ** 3))
+1 GB
+>>> print(instrumentation.format_report())
+----------------------------------------------------------------------------
+| Function                        | Calls | Total time (ms) | Average (ms) |
+----------------------------------------------------------------------------
+| humanfriendly.format_size       |     1 |           0.087 |        0.087 |
+| humanfriendly.text.round_number |     1 |           0.068 |        0.068 |
+----------------------------------------------------------------------------
+"""
+
+# Standard library modules.
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+import types
+
+ENVIRONMENT_VARIABLE = 'HUMANFRIENDLY_INSTRUMENTATION'
+"""The name of the environment variable that enables instrumentation (a string)."""
+
+# Use the most precise clock available (time.perf_counter() isn't available
+# on Python 2 so we fall back to time.time() there).
+clock = getattr(time, 'perf_counter', time.time)
+
+# Mapping of original functions to their instrumented wrappers and vice versa.
+wrappers = {}
+originals = {}
+
+# Mapping of qualified function names to lists with two values: The number of
+# calls and the total time spent in the function (in seconds).
+statistics = {}
+
+# Lock used to update the statistics from multiple threads.
+statistics_lock = threading.Lock()
+
+# Instrumentation is enabled at import time based on the environment variable.
+enabled = os.environ.get(ENVIRONMENT_VARIABLE, '').strip().lower() in ('1', 'yes', 'true', 'on')
+
+
+def instrumented(function):
+    """
+    Decorator to register a function for instrumentation.
+
+    :param function: The function to instrument (a callable).
+    :returns: The instrumented wrapper when instrumentation is enabled,
+              otherwise the original function (so that disabled
+              instrumentation has no overhead).
+    """
+    name = '%s.%s' % (function.__module__, function.__name__)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kw):
+        start_time = clock()
+        try:
+            return function(*args, **kw)
+        finally:
+            record_call(name, clock() - start_time)
+
+    wrappers[function] = wrapper
+    originals[wrapper] = function
+    return wrapper if enabled else function
+
+
+def record_call(name, elapsed_time):
+    """
+    Update the statistics of an instrumented function.
+
+    :param name: The qualified name of the function (a string).
+    :param elapsed_time: The time spent in the function (a float, in seconds).
+    """
+    with statistics_lock:
+        counters = statistics.get(name)
+        if counters is None:
+            statistics[name] = [1, elapsed_time]
+        else:
+            counters[0] += 1
+            counters[1] += elapsed_time
+
+
+def enable():
+    """
+    Enable instrumentation of the public functions of the `humanfriendly` package.
+
+    The public functions are replaced with their instrumented wrappers in the
+    namespaces of all loaded ``humanfriendly`` modules.
+    """
+    global enabled
+    enabled = True
+    rebind_functions(wrappers)
+
+
+def disable():
+    """
+    Disable instrumentation (the collected statistics are preserved).
+
+    The instrumented wrappers are replaced with the original functions in the
+    namespaces of all loaded ``humanfriendly`` modules.
+    """
+    global enabled
+    enabled = False
+    rebind_functions(originals)
+
+
+def is_enabled():
+    """
+    Check whether instrumentation is enabled.
+
+    :returns: :data:`True` if instrumentation is enabled, :data:`False`
+              otherwise.
+    """
+    return enabled
+
+
+def reset():
+    """Forget the statistics collected so far."""
+    with statistics_lock:
+        statistics.clear()
+
+
+def rebind_functions(mapping):
+    """
+    Rebind functions in the namespaces of the loaded ``humanfriendly`` modules.
+
+    :param mapping: A dictionary that maps the functions to replace to their
+                    replacements.
+    """
+    for module_name, module in list(sys.modules.items()):
+        if module is not None and (module_name == 'humanfriendly' or module_name.startswith('humanfriendly.')):
+            namespace = vars(module)
+            for name, value in list(namespace.items()):
+                if isinstance(value, types.FunctionType) and value in mapping:
+                    namespace[name] = mapping[value]
+
+
+def get_statistics():
+    """
+    Get the statistics collected so far.
+
+    :returns: A list of tuples with three values each: The qualified name of
+              the function (a string), the number of calls (an integer) and
+              the total time spent in the function (a float, in seconds). The
+              list is sorted by total time (the most expensive function
+              comes first).
+    """
+    with statistics_lock:
+        results = [(name, calls, total_time) for name, (calls, total_time) in statistics.items()]
+    return sorted(results, key=lambda item: (-item[2], item[0]))
+
+
+def format_report():
+    """
+    Format the statistics collected so far as a table.
+
+    :returns: The rendered table (a string) created using
+              :func:`.format_pretty_table()`.
+    """
+    # Imported here to avoid circular imports (the modules that define the
+    # instrumented functions depend on this module).
+    from humanfriendly.tables import format_pretty_table
+    column_names = ['Function', 'Calls', 'Total time (ms)', 'Average (ms)']
+    data = []
+    for name, calls, total_time in get_statistics():
+        data.append([name, str(calls),
+                     '%.3f' % (total_time * 1000),
+                     '%.3f' % (total_time * 1000 / calls)])
+    return format_pretty_table(data, column_names)
+
+
+def print_report(stream=None):
+    """
+    Print the report created by :func:`format_report()` (if any calls were recorded).
+
+    :param stream: The stream to write the report to (a file object, defaults
+                   to :data:`sys.stderr`).
+    """
+    if statistics:
+        if stream is None:
+            stream = sys.stderr
+        stream.write(format_report() + '\n')
+
+
+if enabled:
+    atexit.register(print_report)
@@ -1,17 +1,25 @@
 # Human friendly input/output in Python.
 #
 # Author: Peter Odding <peter@peterodding.com>
-# Last Change: June 3, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 """
 Some generic notes about the table formatting functions in this module:
 
-- These functions were not written with performance in mind (*at all*) because
-  they're intended to format tabular data to be presented on a terminal. If
-  someone were to run into a performance problem using these functions, they'd
-  be printing so much tabular data to the terminal that a human wouldn't be
-  able to digest the tabular data anyway, so the point is moot :-).
+- These functions are intended to format tabular data to be presented on a
+  terminal, but they're also used to export large tables (to files and
+  pipes), so they're designed to scale: The input is converted to a column
+  model (see :func:`normalize_table()`) so that string conversion, width
+  calculation and the detection of numeric columns are done one column at a
+  time, the ``write_*_table()`` functions stream the rendered lines in
+  batches instead of building one big string, very large tables can be
+  converted in chunks by worker processes (see the `workers` parameter) and
+  :func:`view_table()` only formats the rows that are visible.
+
+- These functions accept rows (an iterable of iterables) as well as columnar
+  data: Dictionaries that map column names to columns (for example lists,
+  :class:`array.array` objects or NumPy arrays) and NumPy structured arrays.
 
 - These functions ignore ANSI escape sequences (at least the ones generated by
   the :mod:`~humanfriendly.terminal` module) in the calculation of columns
@@ -22,26 +30,68 @@ Some generic notes about the table formatting functions in this module:
 """
 
 # Standard library modules.
+import array
 import collections
+import functools
+import heapq
+import itertools
+import json
+import numbers
+import pickle
 import re
+import sys
+import textwrap
+import time
+
+# The concurrent.futures module is only available on Python 2 when the
+# `futures' package is installed, so it's optional.
+try:
+    import concurrent.futures
+    HAVE_CONCURRENT_FUTURES = True
+except ImportError:
+    HAVE_CONCURRENT_FUTURES = False
 
 # Modules included in our package.
+from humanfriendly.instrumentation import instrumented
 from humanfriendly.terminal import (
+    ANSI_ALTERNATE_SCREEN,
+    ANSI_CSI,
+    ANSI_CURSOR_HOME,
+    ANSI_ERASE_DOWN,
+    ANSI_ERASE_LINE,
+    ANSI_HIDE_CURSOR,
+    ANSI_NORMAL_SCREEN,
+    ANSI_SGR,
+    ANSI_SHOW_CURSOR,
     ansi_strip,
     ansi_width,
     ansi_wrap,
+    cbreak_mode,
     connected_to_terminal,
     find_terminal_size,
+    HAVE_IOCTL,
     HIGHLIGHT_COLOR,
+    read_key,
 )
+from humanfriendly.text import is_finite, is_numpy_object
 
 # Compatibility with Python 2 and 3.
 try:
     # Python 2.
     unicode_type = unicode
+    basestring_type = basestring
+    from itertools import izip as zip, izip_longest as zip_longest
 except NameError:
     # Python 3.
     unicode_type = str
+    basestring_type = str
+    from itertools import zip_longest
+try:
+    # Python 3.3 and later.
+    from collections.abc import Mapping
+except ImportError:
+    # Python 2.
+    from collections import Mapping
 
 # Compiled regular expression pattern to recognize table columns containing
 # numeric data (integer and/or floating point numbers). Used to right-align the
@@ -55,62 +105,209 @@ except NameError:
 # fall under the DWIM umbrella :-).
 NUMERIC_DATA_PATTERN = re.compile(r'^\d+(\.\d+)?$')
 
+# Type codes of :class:`array.array` objects containing signed and unsigned
+# integers (these columns are known to be numeric without matching
+# NUMERIC_DATA_PATTERN against every value).
+SIGNED_TYPECODES = 'bhilq'
+UNSIGNED_TYPECODES = 'BHILQ'
+
+WRITE_BUFFER_SIZE = 1000
+"""The number of lines that the ``write_*_table()`` functions write at once (an integer)."""
 
-def format_smart_table(data, column_names):
+TRUNCATION_MARKER = u'\u2026'
+"""The string used to mark values truncated by :func:`fit_value()` (a horizontal ellipsis)."""
+
+# Compiled regular expression pattern to split a value into the ANSI escape
+# sequences that precede it, the text and the ANSI escape sequences that
+# follow it (used to preserve styling when values are truncated or wrapped).
+STYLED_TEXT_PATTERN = re.compile(r'^((?:%s[0-9;]*%s)*)(.*?)((?:%s[0-9;]*%s)*)$' % (
+    (re.escape(ANSI_CSI), re.escape(ANSI_SGR)) * 2), re.DOTALL)
+
+PARALLEL_CHUNK_SIZE = 50000
+"""The number of rows per chunk when the ``workers`` parameter is used (an integer)."""
+
+# The parse_size() function and InvalidSize exception used by sort_key()
+# (imported on first use, see sort_key()).
+size_parser = None
+
+
+@instrumented
+def format_smart_table(data, column_names=None, workers=None, output_format=None, max_width=None, overflow='truncate',
+                       sort_by=None, reverse=False, limit=None, group_by=None):
     """
     Render tabular data using the most appropriate representation.
 
     :param data: An iterable (e.g. a :func:`tuple` or :class:`list`)
                  containing the rows of the table, where each row is an
-                 iterable containing the columns of the table (strings).
+                 iterable containing the columns of the table (strings), or
+                 columnar data (see :func:`normalize_table()`).
     :param column_names: An iterable of column names (strings).
+    :param workers: The number of worker processes used to convert and
+                    measure the values of very large tables (an integer,
+                    optional, see :func:`normalize_table()`).
+    :param output_format: The output format to use (one of the keys of
+                          :data:`OUTPUT_FORMATS`, optional). When this isn't
+                          given :func:`select_output_format()` is used.
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
     :returns: The rendered table (a string).
 
     If you want an easy way to render tabular data on a terminal in a human
     friendly format then this function is for you! It works as follows:
 
-    - If the input data doesn't contain any line breaks the function
-      :func:`format_pretty_table()` is used to render a pretty table. If the
-      resulting table fits in the terminal without wrapping the rendered pretty
-      table is returned.
+    - If the input data doesn't contain any line breaks and a pretty table
+      would fit in the terminal without wrapping then the function
+      :func:`format_pretty_table()` is used to render a pretty table. Column
+      width limits (see `max_width`) are taken into account and when
+      `overflow` is 'wrap' line breaks are allowed.
 
     - If the input data does contain line breaks or if a pretty table would
       wrap (given the width of the terminal) then the function
       :func:`format_robust_table()` is used to render a more robust table that
       can deal with data containing line breaks and long text.
+
+    The decision is made by :func:`select_output_format()` based on the column
+    widths, so only the chosen representation is rendered. Programs that
+    refresh a table with data of the same shape can call
+    :func:`select_output_format()` once and pass the result as the
+    `output_format` argument.
     """
-    # Normalize the input in case we fall back from a pretty table to a robust
-    # table (in which case we'll definitely iterate the input more than once).
-    data = [normalize_columns(r) for r in data]
-    column_names = normalize_columns(column_names)
-    # Make sure the input data doesn't contain any line breaks (because pretty
-    # tables break horribly when a column's text contains a line break :-).
-    if not any(any('\n' in c for c in r) for r in data):
-        # Render a pretty table.
-        pretty_table = format_pretty_table(data, column_names)
-        # Check if the pretty table fits in the terminal.
-        table_width = max(map(ansi_width, pretty_table.splitlines()))
-        num_rows, num_columns = find_terminal_size()
-        if table_width <= num_columns:
-            # The pretty table fits in the terminal without wrapping!
-            return pretty_table
-    # Fall back to a robust table when a pretty table won't work.
-    return format_robust_table(data, column_names)
-
-
-def format_pretty_table(data, column_names=None, horizontal_bar='-', vertical_bar='|'):
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    if output_format is None:
+        output_format = select_output_format(table, max_width=max_width, overflow=overflow)
+    if output_format == 'pretty':
+        lines = render_pretty_table(table, max_width=max_width, overflow=overflow)
+    else:
+        lines = render_table(table, output_format)
+    return u'\n'.join(lines)
+
+
+@instrumented
+def select_output_format(data, column_names=None, terminal_width=None, max_width=None, overflow='truncate'):
+    """
+    Decide whether tabular data should be rendered as a pretty or robust table.
+
+    :param data: Refer to :func:`format_smart_table()`.
+    :param column_names: Refer to :func:`format_smart_table()`.
+    :param terminal_width: The available width (an integer, defaults to the
+                           width of the terminal).
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :returns: The string 'pretty' if a pretty table fits within
+              `terminal_width` and the data doesn't contain line breaks
+              (unless `overflow` is 'wrap'), the string 'robust' otherwise.
+
+    The width of the pretty table is calculated from the column widths (see
+    :func:`pretty_table_width()`), nothing is rendered.
+    """
+    table = normalize_table(data, column_names)
+    # Pretty tables break horribly when a column's text contains a line break
+    # (unless the values are wrapped) :-).
+    if overflow == 'wrap' or not any(table.line_breaks):
+        if terminal_width is None:
+            num_rows, terminal_width = find_terminal_size()
+        if pretty_table_width(table, max_width, overflow) <= terminal_width:
+            return 'pretty'
+    return 'robust'
+
+
+def pretty_table_width(table, max_width=None, overflow='truncate'):
+    """
+    Calculate the width of a pretty table without rendering it.
+
+    :param table: A :class:`TableData` object.
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :returns: The width of the table (an integer).
+    """
+    widths = pretty_column_widths(table, max_width, overflow)
+    return sum(widths) + len(widths) * 3 + 1
+
+
+def pretty_column_widths(table, max_width=None, overflow='truncate'):
+    """
+    Calculate the column widths of a pretty table.
+
+    :param table: A :class:`TableData` object.
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :returns: A list of integers (the widths of the values and column names,
+              ignoring ANSI escape sequences, limited to `max_width`).
+    """
+    widths = table.widths + [0] * (table.num_columns - len(table.columns))
+    if overflow == 'wrap':
+        # Values with line breaks are split into multiple lines.
+        for column_index, line_breaks in enumerate(table.line_breaks):
+            if line_breaks:
+                widths[column_index] = max(ansi_width(line) for value in table.columns[column_index]
+                                           for line in value.splitlines() or [u''])
+    for column_index, name in enumerate(table.column_names or ()):
+        widths[column_index] = max(widths[column_index], ansi_width(name))
+    if max_width is not None:
+        for column_index, limit in enumerate(normalize_max_width(table, max_width)):
+            if limit is not None:
+                widths[column_index] = min(widths[column_index], max(1, limit))
+    return widths
+
+
+def normalize_max_width(table, max_width):
+    """
+    Get the maximum width of each column of a table.
+
+    :param table: A :class:`TableData` object.
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :returns: A list with an integer or :data:`None` for each column.
+    """
+    if isinstance(max_width, Mapping):
+        names = [ansi_strip(n) for n in table.column_names or ()]
+        names += [None] * (table.num_columns - len(names))
+        return [max_width.get(n, max_width.get(i)) for i, n in enumerate(names)]
+    elif isinstance(max_width, (list, tuple)):
+        return list(max_width[:table.num_columns]) + [None] * (table.num_columns - len(max_width))
+    else:
+        return [max_width] * table.num_columns
+
+
+@instrumented
+def format_pretty_table(data, column_names=None, horizontal_bar='-', vertical_bar='|', workers=None,
+                        max_width=None, overflow='truncate', sort_by=None, reverse=False, limit=None, group_by=None):
     """
     Render a table using characters like dashes and vertical bars to emulate borders.
 
     :param data: An iterable (e.g. a :func:`tuple` or :class:`list`)
                  containing the rows of the table, where each row is an
-                 iterable containing the columns of the table (strings).
+                 iterable containing the columns of the table (strings), or
+                 columnar data (see :func:`normalize_table()`).
     :param column_names: An iterable of column names (strings).
     :param horizontal_bar: The character used to represent a horizontal bar (a
                            string).
     :param vertical_bar: The character used to represent a vertical bar (a
                          string).
+    :param workers: The number of worker processes used to convert and
+                    measure the values of very large tables (an integer,
+                    optional, see :func:`normalize_table()`).
+    :param max_width: The maximum width of the columns (optional). This can be
+                      an integer (applies to all columns), a list with an
+                      integer or :data:`None` for each column or a
+                      dictionary that maps column names or indexes to
+                      integers.
+    :param overflow: What to do with values that are wider than their column:
+                     The string 'truncate' (the default) truncates them and
+                     the string 'wrap' wraps them over multiple lines (see
+                     :func:`fit_value()`). When values are wrapped line breaks
+                     in values are supported as well.
+    :param sort_by: The column(s) to sort the rows by (refer to
+                    :func:`select_rows()`).
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: The maximum number of rows to render (refer to
+                  :func:`select_rows()`).
+    :param group_by: Refer to :func:`select_rows()`.
     :returns: The rendered table (a string).
+    :raises: :exc:`~exceptions.ValueError` when `overflow` isn't supported.
 
     Here's an example:
 
@@ -149,53 +346,117 @@ def format_pretty_table(data, column_names=None, horizontal_bar='-', vertical_ba
 
       .. image:: images/pretty-table.png
     """
-    # Normalize the input because we'll have to iterate it more than once.
-    data = [normalize_columns(r) for r in data]
-    if column_names is not None:
-        column_names = normalize_columns(column_names)
-        if column_names:
-            if connected_to_terminal():
-                column_names = [highlight_column_name(n) for n in column_names]
-            data.insert(0, column_names)
-    # Calculate the maximum width of each column.
-    widths = collections.defaultdict(int)
-    numeric_data = collections.defaultdict(list)
-    for row_index, row in enumerate(data):
-        for column_index, column in enumerate(row):
-            widths[column_index] = max(widths[column_index], ansi_width(column))
-            if not (column_names and row_index == 0):
-                numeric_data[column_index].append(bool(NUMERIC_DATA_PATTERN.match(ansi_strip(column))))
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    return u'\n'.join(render_pretty_table(table, horizontal_bar, vertical_bar, max_width, overflow))
+
+
+@instrumented
+def write_pretty_table(stream, data, column_names=None, horizontal_bar='-', vertical_bar='|', workers=None,
+                       max_width=None, overflow='truncate', sort_by=None, reverse=False, limit=None, group_by=None):
+    """
+    Render a table like :func:`format_pretty_table()` directly to a stream.
+
+    :param stream: The stream to write the table to (a file like object).
+    :param data: Refer to :func:`format_pretty_table()`.
+    :param column_names: Refer to :func:`format_pretty_table()`.
+    :param horizontal_bar: Refer to :func:`format_pretty_table()`.
+    :param vertical_bar: Refer to :func:`format_pretty_table()`.
+    :param workers: Refer to :func:`format_pretty_table()`.
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
+
+    The lines of the table are written in batches of :data:`WRITE_BUFFER_SIZE`
+    lines as soon as they've been rendered, so the complete table is never
+    held in memory as a single string (the last line is terminated by a line
+    break as well).
+    """
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    write_lines(stream, render_pretty_table(table, horizontal_bar, vertical_bar, max_width, overflow))
+
+
+def render_pretty_table(table, horizontal_bar='-', vertical_bar='|', max_width=None, overflow='truncate'):
+    """
+    Render the lines of a pretty table (see :func:`format_pretty_table()`).
+
+    :param table: A :class:`TableData` object.
+    :param horizontal_bar: The character used to represent a horizontal bar (a
+                           string).
+    :param vertical_bar: The character used to represent a vertical bar (a
+                         string).
+    :param max_width: Refer to :func:`format_pretty_table()`.
+    :param overflow: Refer to :func:`format_pretty_table()`.
+    :returns: A generator of strings (the lines of the table).
+    """
+    if overflow not in ('truncate', 'wrap'):
+        raise ValueError("Unsupported overflow mode! (expected 'truncate' or 'wrap' but got %r)" % overflow)
+    column_names = table.column_names
+    # Get the maximum width and the alignment of each column.
+    natural_widths = pretty_column_widths(table, overflow=overflow)
+    widths = pretty_column_widths(table, max_width, overflow)
+    numeric = table.numeric + [True] * (len(widths) - len(table.columns))
+    if column_names:
+        column_names = [fit_value(n, w, 'truncate')[0] for n, w in zip(column_names, widths)]
+        if connected_to_terminal():
+            column_names = [highlight_column_name(n) for n in column_names]
     # Create a horizontal bar of dashes as a delimiter.
-    line_delimiter = horizontal_bar * (sum(widths.values()) + len(widths) * 3 + 1)
-    # Start the table with a vertical bar.
-    lines = [line_delimiter]
+    line_delimiter = horizontal_bar * (sum(widths) + len(widths) * 3 + 1)
+    # The columns are separated by vertical bars.
+    separator = u' %s ' % vertical_bar
+    # Start the table with a horizontal bar.
+    yield line_delimiter
+    if column_names:
+        cells = [justify(n, w, a, True) for n, w, a in zip(column_names, widths, numeric)]
+        yield u'%s %s %s' % (vertical_bar, separator.join(cells), vertical_bar)
+        yield line_delimiter
     # Format the rows and columns.
-    for row_index, row in enumerate(data):
-        line = [vertical_bar]
-        for column_index, column in enumerate(row):
-            padding = ' ' * (widths[column_index] - ansi_width(column))
-            if all(numeric_data[column_index]):
-                line.append(' ' + padding + column + ' ')
-            else:
-                line.append(' ' + column + padding + ' ')
-            line.append(vertical_bar)
-        lines.append(u''.join(line))
-        if column_names and row_index == 0:
-            lines.append(line_delimiter)
-    # End the table with a vertical bar.
-    lines.append(line_delimiter)
-    # Join the lines, returning a single string.
-    return u'\n'.join(lines)
+    justifiers = [create_justifier(w, n, a) for w, n, a in zip(widths, numeric, table.has_ansi)]
+    # Find the columns whose values may need to be truncated or wrapped.
+    line_breaks = table.line_breaks if overflow == 'wrap' else [False] * len(table.columns)
+    fitted_columns = [i for i, (w, n, b) in enumerate(zip(widths, natural_widths, line_breaks)) if w < n or b]
+    for row in table.rows():
+        cells = [j(c) for j, c in zip(justifiers, row)]
+        if fitted_columns:
+            # Columns with values that don't fit may need multiple lines.
+            extra_lines = []
+            for index in fitted_columns:
+                lines = fit_value(row[index], widths[index], overflow)
+                cells[index] = justify(lines[0], widths[index], numeric[index], True)
+                for line_number, line in enumerate(lines[1:]):
+                    if line_number >= len(extra_lines):
+                        extra_lines.append([u' ' * w for w in widths])
+                    extra_lines[line_number][index] = justify(line, widths[index], numeric[index], True)
+            yield u'%s %s %s' % (vertical_bar, separator.join(cells), vertical_bar)
+            for cells in extra_lines:
+                yield u'%s %s %s' % (vertical_bar, separator.join(cells), vertical_bar)
+        else:
+            yield u'%s %s %s' % (vertical_bar, separator.join(cells), vertical_bar)
+    # End the table with a horizontal bar.
+    yield line_delimiter
 
 
-def format_robust_table(data, column_names):
+@instrumented
+def format_robust_table(data, column_names=None, workers=None, sort_by=None, reverse=False, limit=None, group_by=None):
     """
     Render tabular data with one column per line (allowing columns with line breaks).
 
     :param data: An iterable (e.g. a :func:`tuple` or :class:`list`)
                  containing the rows of the table, where each row is an
-                 iterable containing the columns of the table (strings).
-    :param column_names: An iterable of column names (strings).
+                 iterable containing the columns of the table (strings), or
+                 columnar data (see :func:`normalize_table()`).
+    :param column_names: An iterable of column names (strings, optional).
+                         Values of columns without a name are rendered
+                         without a ``name:`` prefix.
+    :param workers: The number of worker processes used to convert and
+                    measure the values of very large tables (an integer,
+                    optional, see :func:`normalize_table()`).
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
     :returns: The rendered table (a string).
 
     Here's an example:
@@ -235,41 +496,1627 @@ def format_robust_table(data, column_names):
     The column names are highlighted in bold font and color so they stand out a
     bit more (see :data:`.HIGHLIGHT_COLOR`).
     """
-    blocks = []
-    column_names = ["%s:" % n for n in normalize_columns(column_names)]
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    return u'\n'.join(render_robust_table(table))
+
+
+@instrumented
+def write_robust_table(stream, data, column_names=None, workers=None, sort_by=None, reverse=False, limit=None,
+                       group_by=None):
+    """
+    Render a table like :func:`format_robust_table()` directly to a stream.
+
+    :param stream: The stream to write the table to (a file like object).
+    :param data: Refer to :func:`format_robust_table()`.
+    :param column_names: Refer to :func:`format_robust_table()`.
+    :param workers: Refer to :func:`format_robust_table()`.
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
+
+    Refer to :func:`write_pretty_table()` for details about buffering.
+    """
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    write_lines(stream, render_robust_table(table))
+
+
+def render_robust_table(table):
+    """
+    Render the lines of a robust table (see :func:`format_robust_table()`).
+
+    :param table: A :class:`TableData` object.
+    :returns: A generator of strings (the lines of the table).
+    """
+    column_names = ["%s:" % n for n in table.column_names or ()]
     if connected_to_terminal():
         column_names = [highlight_column_name(n) for n in column_names]
+    # Values of columns without a name are rendered without a prefix.
+    column_names += [u''] * (len(table.columns) - len(column_names))
+    # The width of the row delimiter is calculated from the column model
+    # before the first line is rendered (so that lines can be streamed).
+    num_rows, num_columns = find_terminal_size()
+    longest_line = 0
+    for name, column in zip(column_names, table.columns):
+        name_width = ansi_width(name) + 1 if name else 0
+        for text in column:
+            if '\n' not in text.strip():
+                longest_line = max(longest_line, name_width + ansi_width(text.strip()))
+            else:
+                longest_line = max([longest_line, name_width] + [ansi_width(line) for line in text.rstrip().splitlines()])
+    delimiter = '-' * min(longest_line, num_columns)
     # Convert each row into one or more `name: value' lines (one per column)
-    # and group each `row of lines' into a block (i.e. rows become blocks).
-    for row in data:
-        lines = []
-        for column_index, column_text in enumerate(normalize_columns(row)):
+    # and group each `row of lines' into a block (i.e. rows become blocks)
+    # separated by delimiters.
+    yield delimiter
+    for row in table.rows():
+        for column_index, column_text in enumerate(row):
             stripped_column = column_text.strip()
             if '\n' not in stripped_column:
                 # Columns without line breaks are formatted inline.
-                lines.append("%s %s" % (column_names[column_index], stripped_column))
+                if column_names[column_index]:
+                    yield "%s %s" % (column_names[column_index], stripped_column)
+                else:
+                    yield stripped_column
             else:
                 # Columns with line breaks could very well contain indented
                 # lines, so we'll put the column name on a separate line. This
                 # way any indentation remains intact, and it's easier to
                 # copy/paste the text.
-                lines.append(column_names[column_index])
-                lines.extend(column_text.rstrip().splitlines())
-        blocks.append(lines)
-    # Calculate the width of the row delimiter.
-    num_rows, num_columns = find_terminal_size()
-    longest_line = max(max(map(ansi_width, lines)) for lines in blocks)
-    delimiter = u"\n%s\n" % ('-' * min(longest_line, num_columns))
-    # Force a delimiter at the start and end of the table.
-    blocks.insert(0, "")
-    blocks.append("")
-    # Embed the row delimiter between every two blocks.
-    return delimiter.join(u"\n".join(b) for b in blocks).strip()
+                if column_names[column_index]:
+                    yield column_names[column_index]
+                for line in column_text.rstrip().splitlines():
+                    yield line
+        yield delimiter
+
+
+def write_lines(stream, lines, buffer_size=None):
+    """
+    Write lines of text to a stream in batches.
+
+    :param stream: The stream to write to (a file like object).
+    :param lines: An iterable of strings (without line breaks).
+    :param buffer_size: The number of lines per batch (an integer, defaults
+                        to :data:`WRITE_BUFFER_SIZE`).
+    """
+    buffer_size = buffer_size or WRITE_BUFFER_SIZE
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= buffer_size:
+            buffer.append(u'')
+            stream.write(u'\n'.join(buffer))
+            buffer = []
+    if buffer:
+        buffer.append(u'')
+        stream.write(u'\n'.join(buffer))
+
+
+@instrumented
+def format_markdown_table(data, column_names=None, workers=None, sort_by=None, reverse=False, limit=None,
+                          group_by=None):
+    """
+    Render a table using the Markdown syntax (as supported by GitHub).
+
+    :param data: Refer to :func:`format_pretty_table()`.
+    :param column_names: Refer to :func:`format_pretty_table()`.
+    :param workers: Refer to :func:`format_pretty_table()`.
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
+    :returns: The rendered table (a string).
+
+    Here's an example:
+
+    >>> from humanfriendly.tables import format_markdown_table
+    >>> column_names = ['Version', 'Uploaded on', 'Downloads']
+    >>> humanfriendly_releases = [
+    ... ['1.23', '2015-05-25', '218'],
+    ... ['1.23.1', '2015-05-26', '1354'],
+    ... ]
+    >>> print(format_markdown_table(humanfriendly_releases, column_names))
+    | Version | Uploaded on | Downloads |
+    | ------- | ----------- | --------: |
+    | 1.23    | 2015-05-25  |       218 |
+    | 1.23.1  | 2015-05-26  |      1354 |
+    """
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    return u'\n'.join(render_markdown_table(table))
+
+
+@instrumented
+def write_table(stream, data, column_names=None, output_format='pretty', workers=None, sort_by=None, reverse=False,
+                limit=None, group_by=None):
+    """
+    Render a table in one of the supported output formats directly to a stream.
+
+    :param stream: The stream to write the table to (a file like object).
+    :param data: Refer to :func:`format_pretty_table()`.
+    :param column_names: Refer to :func:`format_pretty_table()`.
+    :param output_format: One of the keys of :data:`OUTPUT_FORMATS` (a
+                          string, defaults to 'pretty').
+    :param workers: Refer to :func:`format_pretty_table()`.
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
+    :raises: :exc:`~exceptions.ValueError` when the output format isn't
+             supported.
+
+    All output formats are rendered from the same column model, so you can
+    call :func:`normalize_table()` once and pass the resulting
+    :class:`TableData` object to this function for each output format you
+    need (the values are converted to strings and measured only once).
+    Refer to :func:`write_pretty_table()` for details about buffering.
+    """
+    table = normalize_table(data, column_names, workers, sort_by, reverse, limit, group_by)
+    write_lines(stream, render_table(table, output_format))
+
+
+def render_table(table, output_format='pretty'):
+    """
+    Render the lines of a table in one of the supported output formats.
+
+    :param table: A :class:`TableData` object.
+    :param output_format: One of the keys of :data:`OUTPUT_FORMATS` (a string).
+    :returns: A generator of strings (the lines of the table).
+    :raises: :exc:`~exceptions.ValueError` when the output format isn't
+             supported.
+    """
+    renderer = OUTPUT_FORMATS.get(output_format)
+    if renderer is None:
+        msg = "Unsupported output format! (expected one of %s but got %r)"
+        raise ValueError(msg % (', '.join(sorted(OUTPUT_FORMATS)), output_format))
+    return renderer(table)
+
+
+def render_markdown_table(table):
+    """
+    Render the lines of a Markdown table (see :func:`format_markdown_table()`).
+
+    :param table: A :class:`TableData` object.
+    :returns: A generator of strings (the lines of the table).
+
+    ANSI escape sequences are stripped, vertical bars are escaped and line
+    breaks are replaced by ``<br>`` tags.
+    """
+    column_names = [escape_markdown(n) for n in table.column_names or ()]
+    column_names += [u''] * (table.num_columns - len(column_names))
+    # Escaping changes the width of values, so the values are escaped (one
+    # column at a time) before the widths of the columns are calculated.
+    columns = [[escape_markdown(v) for v in c] for c in table.columns]
+    padding = [0] * (table.num_columns - len(columns))
+    widths = [max(3, w, len(n)) for w, n in zip([max(map(len, c)) if c else 0 for c in columns] + padding, column_names)]
+    numeric = table.numeric + [False] * len(padding)
+    yield u'| %s |' % u' | '.join(justify(n, w, a, False) for n, w, a in zip(column_names, widths, numeric))
+    yield u'| %s |' % u' | '.join(('-' * (w - 1) + ':') if a else ('-' * w) for w, a in zip(widths, numeric))
+    for row in zip(*columns):
+        yield u'| %s |' % u' | '.join(justify(c, w, a, False) for c, w, a in zip(row, widths, numeric))
+
+
+def render_csv_table(table, delimiter=','):
+    """
+    Render the lines of a table in the CSV format (:rfc:`4180`).
+
+    :param table: A :class:`TableData` object.
+    :param delimiter: The field delimiter (a string, defaults to a comma).
+    :returns: A generator of strings (the lines of the table, values that
+              contain line breaks span multiple lines).
+
+    ANSI escape sequences are stripped. The column names (if any) are
+    rendered as the first line.
+    """
+    if table.column_names:
+        yield delimiter.join(quote_csv(ansi_strip(n), delimiter) for n in table.column_names)
+    for row in iter_plain_rows(table):
+        yield delimiter.join(quote_csv(c, delimiter) for c in row)
+
+
+def render_tsv_table(table):
+    """
+    Render the lines of a table in the TSV (tab separated values) format.
+
+    :param table: A :class:`TableData` object.
+    :returns: A generator of strings (the lines of the table).
+
+    ANSI escape sequences are stripped. Tabs, line breaks and backslashes in
+    values are escaped as ``\\t``, ``\\n``, ``\\r`` and ``\\\\`` so that
+    every row is exactly one line. The column names (if any) are rendered as
+    the first line.
+    """
+    if table.column_names:
+        yield u'\t'.join(escape_tsv(ansi_strip(n)) for n in table.column_names)
+    for row in iter_plain_rows(table):
+        yield u'\t'.join(escape_tsv(c) for c in row)
+
+
+def render_jsonl_table(table):
+    """
+    Render the lines of a table in the `JSON Lines`_ format.
+
+    :param table: A :class:`TableData` object.
+    :returns: A generator of strings (one JSON document per row).
+
+    When the table has column names each row is rendered as a JSON object
+    (with the keys in the order of the columns), otherwise each row is
+    rendered as a JSON array. Integers, finite floating point numbers,
+    booleans and :data:`None` are rendered using their native JSON types,
+    other values are rendered as strings (without ANSI escape sequences).
+
+    .. _JSON Lines: http://jsonlines.org/
+    """
+    columns = [[ansi_strip(v) for v in c] if a else c for c, a in zip(table.columns, table.has_ansi)]
+    for index, values in enumerate(table.values):
+        if values is not None:
+            # Missing values (in columns shorter than other columns) are
+            # rendered as null.
+            columns[index] = [json_value(v, t) for v, t in zip_longest(values, columns[index])]
+    if table.column_names:
+        keys = [ansi_strip(n) for n in table.column_names]
+        for row in zip(*columns):
+            yield json.dumps(collections.OrderedDict(zip(keys, row)))
+    else:
+        for row in zip(*columns):
+            yield json.dumps(list(row))
+
+
+def json_value(value, text):
+    """
+    Prepare a value for :func:`render_jsonl_table()`.
+
+    :param value: The original value.
+    :param text: The value converted to a string.
+    :returns: The value if it can be represented using a native JSON type,
+              the string otherwise.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    elif isinstance(value, numbers.Integral):
+        return int(value)
+    elif isinstance(value, numbers.Real) and is_finite(value):
+        return float(value)
+    return text
+
+
+def iter_plain_rows(table):
+    """
+    Iterate over the rows of a table without ANSI escape sequences.
+
+    :param table: A :class:`TableData` object.
+    :returns: A generator of tuples of strings.
+    """
+    if not any(table.has_ansi):
+        return table.rows()
+    return zip(*[[ansi_strip(v) for v in c] if a else c for c, a in zip(table.columns, table.has_ansi)])
+
+
+def quote_csv(value, delimiter=','):
+    """Quote a value for use in a CSV file (see :func:`render_csv_table()`)."""
+    if delimiter in value or '"' in value or '\n' in value or '\r' in value:
+        return u'"%s"' % value.replace('"', '""')
+    return value
+
+
+def escape_tsv(value):
+    """Escape a value for use in a TSV file (see :func:`render_tsv_table()`)."""
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        value = value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return value
+
+
+def escape_markdown(text):
+    """Escape a value for use in a Markdown table cell (see :func:`render_markdown_table()`)."""
+    text = ansi_strip(text)
+    if '|' in text or '\n' in text:
+        text = text.replace('|', '\\|').replace('\r\n', '<br>').replace('\n', '<br>')
+    return text
+
+
+@instrumented
+def select_rows(data, column_names=None, sort_by=None, reverse=False, limit=None, group_by=None):
+    """
+    Sort, group and/or limit the rows of a table before rendering it.
+
+    :param data: An iterable of rows (each row is an iterable of values) or a
+                 dictionary that maps column names to columns. The rows are
+                 consumed one at a time, so this can be a generator.
+    :param column_names: An iterable of column names (strings, required when
+                         `sort_by` or `group_by` refer to columns by name).
+    :param sort_by: The column(s) to sort by: A column name or index, a list of
+                    column names and/or indexes or :data:`None` (the default)
+                    to preserve the order of the rows. Values are compared
+                    using :func:`sort_key()` so numbers and data sizes are
+                    sorted by their numeric value.
+    :param reverse: :data:`True` to sort in descending order (a boolean).
+    :param limit: The maximum number of rows to select (an integer, per group
+                  when `group_by` is given) or :data:`None`.
+    :param group_by: A column name or index (optional). When given the rows
+                     are grouped by the values in the column (groups are
+                     ordered by :func:`sort_key()`) and `sort_by` and `limit`
+                     apply to each group separately.
+    :returns: A list of rows (suitable for :func:`format_pretty_table()` and
+              friends).
+    :raises: :exc:`~exceptions.ValueError` when a column name isn't known.
+
+    When `limit` is given only the selected rows are kept in memory (using
+    :func:`heapq.nsmallest()` and :func:`heapq.nlargest()`) which makes it
+    cheap to select the top N rows of a huge data set:
+
+    >>> from humanfriendly.tables import format_pretty_table, select_rows
+    >>> column_names = ['Filename', 'Size']
+    >>> rows = [['a.txt', '4 KB'], ['b.iso', '4.7 GB'], ['c.jpg', '512 KB']]
+    >>> print(format_pretty_table(select_rows(rows, column_names, sort_by='Size', reverse=True, limit=2), column_names))
+    ---------------------
+    | Filename | Size   |
+    ---------------------
+    | b.iso    | 4.7 GB |
+    | c.jpg    | 512 KB |
+    ---------------------
+
+    The table formatting functions (for example :func:`format_pretty_table()`)
+    accept the same `sort_by`, `reverse`, `limit` and `group_by` options and
+    delegate to this function, so the example above can also be written as
+    ``format_pretty_table(rows, column_names, sort_by='Size', reverse=True,
+    limit=2)``.
+    """
+    if isinstance(data, Mapping):
+        if column_names is None:
+            column_names = list(data.keys())
+        rows = zip(*[data[name] for name in column_names])
+    else:
+        rows = iter(data)
+    column_names = [ansi_strip(n) for n in normalize_columns(column_names or ())]
+    key = None
+    if sort_by is not None:
+        sort_columns = sort_by if isinstance(sort_by, (list, tuple)) else [sort_by]
+        sort_indexes = [find_column_index(column_names, c) for c in sort_columns]
+
+        def key(row):
+            return tuple(sort_key(row[i]) for i in sort_indexes)
+    if group_by is None:
+        return select_group(rows, key, reverse, limit)
+    group_index = find_column_index(column_names, group_by)
+    groups = collections.OrderedDict()
+    for row in rows:
+        group_key = sort_key(row[group_index])
+        buffer = groups.get(group_key)
+        if buffer is None:
+            buffer = groups[group_key] = []
+        buffer.append(row)
+        # Prune the buffer when it grows too large, so that memory usage is
+        # bounded by the limit (selection is stable so this is safe).
+        if limit is not None and len(buffer) >= max(limit * 2, 1024):
+            buffer[:] = select_group(buffer, key, reverse, limit)
+    selected_rows = []
+    for group_key in sorted(groups):
+        selected_rows.extend(select_group(groups[group_key], key, reverse, limit))
+    return selected_rows
+
+
+def select_group(rows, key=None, reverse=False, limit=None):
+    """
+    Sort and/or limit a group of rows (see :func:`select_rows()`).
+
+    :param rows: An iterable of rows.
+    :param key: A sort key function (a callable) or :data:`None`.
+    :param reverse: :data:`True` to sort in descending order.
+    :param limit: The maximum number of rows (an integer) or :data:`None`.
+    :returns: A list of rows.
+    """
+    if key is None:
+        return list(rows if limit is None else itertools.islice(rows, limit))
+    elif limit is None:
+        return sorted(rows, key=key, reverse=reverse)
+    elif reverse:
+        return heapq.nlargest(limit, rows, key=key)
+    else:
+        return heapq.nsmallest(limit, rows, key=key)
+
+
+def sort_key(value):
+    """
+    Get a key to sort table values by their numeric value where possible.
+
+    :param value: The value to get the key for (any type).
+    :returns: A tuple with two values. For numbers, values matching
+              :data:`NUMERIC_DATA_PATTERN` (optionally with a leading minus
+              sign) and data sizes accepted by :func:`.parse_size()` the
+              first value is 0 and the second value is the number. For other
+              values the first value is 1 and the second value is the text
+              (without ANSI escape sequences). This makes it possible to
+              compare any two keys.
+    """
+    global size_parser
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        return 0, value
+    text = ansi_strip(unicode_type(value)).strip()
+    if NUMERIC_DATA_PATTERN.match(text[1:] if text.startswith('-') else text):
+        return 0, float(text)
+    if text[:1].isdigit():
+        if size_parser is None:
+            # Imported on first use to avoid circular imports (the
+            # humanfriendly package imports this module).
+            from humanfriendly import InvalidSize, parse_size
+            size_parser = parse_size, InvalidSize
+        parse_size, InvalidSize = size_parser
+        try:
+            return 0, parse_size(text)
+        except InvalidSize:
+            pass
+    return 1, text
+
+
+def find_column_index(column_names, column):
+    """
+    Find the index of a column.
+
+    :param column_names: A list of column names (strings).
+    :param column: A column name (a string) or index (an integer).
+    :returns: The index of the column (an integer).
+    :raises: :exc:`~exceptions.ValueError` when the column name isn't known.
+    """
+    if isinstance(column, numbers.Integral):
+        return column
+    try:
+        return column_names.index(column)
+    except ValueError:
+        msg = "Unknown column! (expected one of %s but got %r)"
+        raise ValueError(msg % (', '.join(map(repr, column_names)), column))
+
+
+@instrumented
+def view_table(rows, column_names=None, **options):
+    """
+    Show a (very large) table in an interactive, scrollable viewer.
+
+    :param rows: The rows of the table (refer to :class:`TableViewer`).
+    :param column_names: An iterable of column names (strings).
+    :param options: Any keyword arguments are passed on to :class:`TableViewer`.
+
+    When standard output isn't connected to a terminal the table is written to
+    standard output instead (without loading all rows into memory).
+    """
+    TableViewer(rows, column_names, **options).run()
+
+
+class TableViewer(object):
+
+    """
+    Interactive, scrollable viewer for (very) large tables.
+
+    Unlike :func:`.show_pager()`, which needs the complete text up front, the
+    viewer only formats the rows that are visible on the screen. The column
+    widths are calculated once (or given by the caller) so scrolling through
+    millions of rows doesn't require formatting (or even loading) all of them.
+
+    The following keys are supported:
+
+    ===================================  ===========================
+    Key(s)                               Action
+    ===================================  ===========================
+    ``j``, ``Down``, ``Enter``           Scroll down one row
+    ``k``, ``Up``                        Scroll up one row
+    ``Space``, ``f``, ``Page Down``      Scroll down one page
+    ``b``, ``Page Up``                   Scroll up one page
+    ``g``, ``Home``                      Go to the first row
+    ``G``, ``End``                       Go to the last row
+    ``/``                                Search (case insensitive)
+    ``n``                                Search for the next match
+    ``q``, ``Escape``                    Quit the viewer
+    ===================================  ===========================
+    """
+
+    def __init__(self, rows, column_names=None, widths=None, numeric=None, sample_size=1000, stream=None):
+        """
+        Initialize a :class:`TableViewer` object.
+
+        :param rows: The rows of the table, one of the following:
+
+                     - A sequence that supports random access (an object
+                       with :func:`len()` support and indexing, for example
+                       a :class:`list` or a NumPy structured array). Only the
+                       visible rows are accessed.
+                     - Any other iterable. Rows are pulled from the iterable
+                       as they're needed (to show them or to search them) and
+                       are kept in memory after that (so that you can scroll
+                       back up).
+        :param column_names: An iterable of column names (strings).
+        :param widths: The widths of the columns (a list of integers). When
+                       this isn't given the widths are calculated from the
+                       first `sample_size` rows and the column names (and
+                       columns grow when wider values scroll into view).
+                       Values that don't fit in their column are clipped.
+        :param numeric: A list of booleans that indicates which columns should
+                        be right-aligned. When this isn't given the columns
+                        that contain only numeric data in the first
+                        `sample_size` rows are right-aligned.
+        :param sample_size: The number of rows used to calculate the column
+                            widths and alignment (an integer).
+        :param stream: The stream connected to the terminal (a file object,
+                       defaults to :data:`sys.stdout`).
+        """
+        if hasattr(rows, '__len__') and hasattr(rows, '__getitem__'):
+            self.source = rows
+            self.iterator = None
+        else:
+            self.source = []
+            self.iterator = iter(rows)
+        self.column_names = normalize_columns(column_names) if column_names else None
+        self.stream = stream or sys.stdout
+        self.top = 0
+        self.query = None
+        self.last_query = None
+        self.message = None
+        self.lines, self.columns = find_terminal_size()
+        self.auto_widths = widths is None
+        if widths is None or numeric is None:
+            sample = normalize_table([self.get_row(i) for i in range(self.fetch(sample_size))], self.column_names)
+            if widths is None:
+                widths = sample.widths
+                for index, name in enumerate(self.column_names or ()):
+                    if index < len(widths):
+                        widths[index] = max(widths[index], ansi_width(name))
+                    else:
+                        widths.append(ansi_width(name))
+            if numeric is None:
+                numeric = sample.numeric
+        self.widths = list(widths)
+        self.numeric = list(numeric) + [False] * (len(self.widths) - len(numeric))
+
+    def fetch(self, count):
+        """
+        Make sure the first rows of the table are available.
+
+        :param count: The number of rows required (an integer).
+        :returns: The number of available rows (an integer, less than `count`
+                  when the table contains fewer rows).
+        """
+        if self.iterator is not None:
+            while len(self.source) < count:
+                try:
+                    self.source.append(next(self.iterator))
+                except StopIteration:
+                    self.iterator = None
+                    break
+        return min(count, len(self.source))
+
+    @property
+    def num_rows(self):
+        """The number of rows known so far (an integer)."""
+        return len(self.source)
+
+    @property
+    def page_size(self):
+        """The number of rows that fit on the screen (an integer)."""
+        chrome = 5 if self.column_names else 3
+        return max(1, self.lines - chrome)
+
+    def get_row(self, index):
+        """
+        Get a row of the table converted to strings.
+
+        :param index: The index of the row (an integer).
+        :returns: A list of strings (line breaks are replaced by spaces).
+        """
+        return normalize_cells(self.source[index])
+
+    def format_row(self, cells):
+        """
+        Format a row of the table as a single line.
+
+        :param cells: A list of strings.
+        :returns: The formatted line (a string).
+        """
+        formatted = []
+        for index, width in enumerate(self.widths):
+            text = cells[index] if index < len(cells) else u''
+            if ansi_width(text) > width:
+                text = ansi_strip(text)[:width]
+            formatted.append(justify(text, width, self.numeric[index], True))
+        return u'| %s |' % u' | '.join(formatted)
+
+    def render(self):
+        """
+        Render the visible part of the table.
+
+        :returns: A list of strings (the lines of the screen, the last line
+                  is the status line).
+        """
+        end = self.fetch(self.top + self.page_size)
+        rows = [self.get_row(index) for index in range(self.top, end)]
+        if self.auto_widths:
+            for row in rows:
+                for index, text in enumerate(row[:len(self.widths)]):
+                    self.widths[index] = max(self.widths[index], ansi_width(text))
+        delimiter = '-' * (sum(self.widths) + len(self.widths) * 3 + 1)
+        lines = [delimiter]
+        if self.column_names:
+            names = self.column_names
+            if connected_to_terminal(self.stream):
+                names = [highlight_column_name(n) for n in names]
+            lines.append(self.format_row(names))
+            lines.append(delimiter)
+        lines.extend(self.format_row(row) for row in rows)
+        lines.append(delimiter)
+        lines.append(self.render_status(end))
+        # Clip the lines to the width of the terminal.
+        return [line if ansi_width(line) <= self.columns else ansi_strip(line)[:self.columns] for line in lines]
+
+    def render_status(self, end):
+        """
+        Render the status line.
+
+        :param end: The index after the last visible row (an integer).
+        :returns: The status line (a string).
+        """
+        if self.query is not None:
+            return u'/' + self.query
+        total = u'%i' % self.num_rows if self.iterator is None else u'%i+' % self.num_rows
+        status = u'Rows %i-%i of %s' % (min(self.top + 1, end), end, total)
+        if self.message:
+            status += u' (%s)' % self.message
+        return status
+
+    def scroll(self, delta):
+        """
+        Scroll up or down.
+
+        :param delta: The number of rows to scroll (an integer, negative to
+                      scroll up).
+        """
+        last_top = max(0, self.fetch(self.top + delta + self.page_size) - self.page_size)
+        self.top = max(0, min(self.top + delta, last_top))
+
+    def search(self, query, start=None):
+        """
+        Scroll to the next row that contains the given text.
+
+        :param query: The text to search for (a string, the search is case
+                      insensitive).
+        :param start: The index of the row to start searching (an integer,
+                      defaults to the row after the top row).
+        :returns: :data:`True` if a match was found, :data:`False` otherwise.
+
+        Rows are pulled from the source (if it's an iterator) until a match is
+        found or the source is exhausted.
+        """
+        needle = query.lower()
+        index = self.top + 1 if start is None else start
+        while self.fetch(index + 1) > index:
+            if any(needle in ansi_strip(cell).lower() for cell in self.get_row(index)):
+                self.top = index
+                return True
+            index += 1
+        return False
+
+    def handle_key(self, key):
+        """
+        Handle a key press.
+
+        :param key: The characters generated by the key press (a string).
+        :returns: :data:`False` if the viewer should quit, :data:`True`
+                  otherwise.
+        """
+        self.message = None
+        if self.query is not None:
+            # Keys are appended to the search query until Enter is pressed.
+            if key in ('\r', '\n'):
+                query, self.query = self.query, None
+                if query:
+                    self.last_query = query
+                    if not self.search(query, self.top):
+                        self.message = u'Pattern not found'
+            elif key == '\x1b':
+                self.query = None
+            elif key in ('\x7f', '\x08'):
+                self.query = self.query[:-1]
+            elif not key.startswith('\x1b'):
+                self.query += key
+        elif key in ('q', 'Q', '\x1b', ''):
+            return False
+        elif key in ('j', '\r', '\n', '\x1b[B', '\x1bOB'):
+            self.scroll(1)
+        elif key in ('k', '\x1b[A', '\x1bOA'):
+            self.scroll(-1)
+        elif key in (' ', 'f', '\x1b[6~'):
+            self.scroll(self.page_size)
+        elif key in ('b', '\x1b[5~'):
+            self.scroll(-self.page_size)
+        elif key in ('g', '\x1b[H', '\x1b[1~', '\x1bOH'):
+            self.top = 0
+        elif key in ('G', '\x1b[F', '\x1b[4~', '\x1bOF'):
+            # Pull all remaining rows from the source.
+            self.fetch(float('inf'))
+            self.scroll(self.num_rows)
+        elif key == '/':
+            self.query = u''
+        elif key == 'n' and self.last_query:
+            if not self.search(self.last_query):
+                self.message = u'Pattern not found'
+        return True
+
+    def draw(self):
+        """Redraw the screen."""
+        self.lines, self.columns = find_terminal_size()
+        lines = self.render()
+        self.stream.write(ANSI_CURSOR_HOME + u''.join(line + ANSI_ERASE_LINE + u'\n' for line in lines[:-1]))
+        self.stream.write(lines[-1] + ANSI_ERASE_LINE + ANSI_ERASE_DOWN)
+        self.stream.flush()
+
+    def run(self):
+        """
+        Show the viewer until the user quits.
+
+        When :data:`sys.stdin` or the stream isn't connected to a terminal (or
+        the terminal can't be put in cbreak mode because the :mod:`termios`
+        module isn't available) all rows are written to the stream instead.
+        """
+        if not (HAVE_IOCTL and connected_to_terminal(self.stream) and connected_to_terminal(sys.stdin)):
+            write_lines(self.stream, self.render_all())
+            return
+        self.stream.write(ANSI_ALTERNATE_SCREEN + ANSI_HIDE_CURSOR)
+        try:
+            with cbreak_mode(sys.stdin):
+                while True:
+                    self.draw()
+                    if not self.handle_key(read_key(sys.stdin)):
+                        break
+        finally:
+            self.stream.write(ANSI_SHOW_CURSOR + ANSI_NORMAL_SCREEN)
+            self.stream.flush()
+
+    def render_all(self):
+        """
+        Render all rows of the table (used when the output isn't a terminal).
+
+        :returns: A generator of strings (the lines of the table).
+        """
+        delimiter = '-' * (sum(self.widths) + len(self.widths) * 3 + 1)
+        yield delimiter
+        if self.column_names:
+            yield self.format_row(self.column_names)
+            yield delimiter
+        for index in range(self.num_rows):
+            yield self.format_row(self.get_row(index))
+        if self.iterator is not None:
+            # Don't keep rows in memory that won't be shown again.
+            for row in self.iterator:
+                yield self.format_row(normalize_cells(row))
+            self.iterator = None
+        yield delimiter
+
+
+class LiveTable(object):
+
+    """
+    Pretty table that's updated in place on the terminal (e.g. a dashboard).
+
+    Instead of rewriting the whole table every time the data changes the
+    previous frame (the rendered lines) is kept and only the characters that
+    changed are rewritten, using ANSI escape sequences to move the text cursor
+    to them. This reduces the amount of data sent to the terminal (which
+    matters for example over slow SSH connections). Here's an example:
+
+    >>> from humanfriendly.tables import LiveTable
+    >>> with LiveTable(['Host', 'Load']) as live:
+    ...     while True:
+    ...         live.update(poll_metrics())
+    ...         time.sleep(1)
+
+    Just like :class:`~humanfriendly.Spinner` the updates are throttled to
+    at most one redraw every :data:`~humanfriendly.minimum_spinner_interval`
+    seconds. The data of updates that are skipped isn't lost, it's drawn by
+    the next redraw (the data is only rendered when it's drawn).
+
+    The table is drawn below the text cursor, which should be at the start of
+    a line. Tables that are wider or taller than the terminal can't be updated
+    in place reliably.
+    """
+
+    def __init__(self, column_names=None, stream=None, interactive=None, hide_cursor=True,
+                 horizontal_bar='-', vertical_bar='|', max_width=None, overflow='truncate'):
+        """
+        Initialize a :class:`LiveTable` object.
+
+        :param column_names: An iterable of column names (strings or
+                             :class:`Column` objects).
+        :param stream: The output stream to show the table on (a file object,
+                       defaults to :data:`sys.stdout`).
+        :param interactive: If this is :data:`False` every redraw writes the
+                            complete table to the stream (without ANSI escape
+                            sequences to move the text cursor). It defaults to
+                            the return value of :func:`.connected_to_terminal()`.
+        :param hide_cursor: If :data:`True` (the default) the text cursor is
+                            hidden as long as the table is active.
+        :param horizontal_bar: Refer to :func:`format_pretty_table()`.
+        :param vertical_bar: Refer to :func:`format_pretty_table()`.
+        :param max_width: Refer to :func:`format_pretty_table()`.
+        :param overflow: Refer to :func:`format_pretty_table()`.
+        """
+        self.column_names = column_names
+        self.stream = stream or sys.stdout
+        self.interactive = connected_to_terminal(self.stream) if interactive is None else interactive
+        self.hide_cursor = hide_cursor
+        self.horizontal_bar = horizontal_bar
+        self.vertical_bar = vertical_bar
+        self.max_width = max_width
+        self.overflow = overflow
+        self.frame = None
+        self.pending = None
+        self.last_update = 0
+        if self.interactive and self.hide_cursor:
+            self.stream.write(ANSI_HIDE_CURSOR)
+
+    def update(self, data, force=False):
+        """
+        Update the data shown in the table.
+
+        :param data: The rows or columns of the table (refer to
+                     :func:`format_pretty_table()`).
+        :param force: :data:`True` to redraw the table even if the previous
+                      redraw was less than
+                      :data:`~humanfriendly.minimum_spinner_interval` seconds
+                      ago, :data:`False` (the default) otherwise.
+        :returns: :data:`True` if the table was redrawn, :data:`False` if the
+                  redraw was postponed.
+        """
+        # Imported here to avoid circular imports.
+        from humanfriendly import minimum_spinner_interval
+        self.pending = data
+        if force or time.time() - self.last_update >= minimum_spinner_interval:
+            return self.refresh()
+        return False
+
+    def refresh(self):
+        """
+        Draw the data of the most recent update (if it hasn't been drawn yet).
+
+        :returns: :data:`True` if the table was redrawn, :data:`False` otherwise.
+        """
+        if self.pending is None:
+            return False
+        lines = self.render(self.pending)
+        self.pending = None
+        self.last_update = time.time()
+        self.draw(lines)
+        return True
+
+    def render(self, data):
+        """
+        Render a frame.
+
+        :param data: The rows or columns of the table.
+        :returns: A list of strings (the lines of the table).
+        """
+        table = normalize_table(data, self.column_names)
+        lines = render_pretty_table(table, self.horizontal_bar, self.vertical_bar, self.max_width, self.overflow)
+        return [part for line in lines for part in line.split(u'\n')]
+
+    def draw(self, lines):
+        """
+        Draw a frame by updating the lines that differ from the previous frame.
+
+        :param lines: A list of strings (the lines of the table).
+
+        After drawing a frame the text cursor is on the line below the table.
+        """
+        if not self.interactive:
+            write_lines(self.stream, lines)
+        elif self.frame is None:
+            self.stream.write(u''.join(line + u'\n' for line in lines))
+        else:
+            output = []
+            position = len(self.frame)
+            for index, (old, new) in enumerate(zip(self.frame, lines)):
+                if old != new:
+                    output.append(self.move_cursor(position, index))
+                    output.append(self.update_line(old, new))
+                    position = index
+            output.append(self.move_cursor(position, min(len(self.frame), len(lines))))
+            if len(lines) > len(self.frame):
+                output.append(u'\r' + u''.join(line + ANSI_ERASE_LINE + u'\n' for line in lines[len(self.frame):]))
+            elif len(lines) < len(self.frame):
+                output.append(u'\r' + ANSI_ERASE_DOWN)
+            else:
+                output.append(u'\r')
+            self.stream.write(u''.join(output))
+        self.frame = lines
+        self.stream.flush()
+
+    def move_cursor(self, source, target):
+        """
+        Generate the ANSI escape sequence to move the text cursor between lines.
+
+        :param source: The line the text cursor is on (an integer).
+        :param target: The line to move the text cursor to (an integer).
+        :returns: An ANSI escape sequence (a string, empty when the text cursor
+                  doesn't need to move).
+        """
+        if target < source:
+            return u'%s%iA' % (ANSI_CSI, source - target)
+        elif target > source:
+            return u'%s%iB' % (ANSI_CSI, target - source)
+        return u''
+
+    def update_line(self, old, new):
+        """
+        Generate the text that changes a line of the previous frame into a line of the new frame.
+
+        :param old: The line of the previous frame (a string).
+        :param new: The line of the new frame (a string).
+        :returns: The text to write while the text cursor is on the line (a
+                  string that moves the text cursor to the first changed
+                  character and rewrites the changed characters).
+
+        Lines that contain ANSI escape sequences are rewritten completely.
+        """
+        if ANSI_CSI in old or ANSI_CSI in new:
+            return u'\r' + new + ANSI_ERASE_LINE
+        length = min(len(old), len(new))
+        prefix = 0
+        while prefix < length and old[prefix] == new[prefix]:
+            prefix += 1
+        if len(old) != len(new):
+            # The rest of the line has moved, so it's rewritten.
+            return u'%s%iG%s%s' % (ANSI_CSI, prefix + 1, new[prefix:], ANSI_ERASE_LINE)
+        end = len(new)
+        while end > prefix and old[end - 1] == new[end - 1]:
+            end -= 1
+        return u'%s%iG%s' % (ANSI_CSI, prefix + 1, new[prefix:end])
+
+    def close(self):
+        """Draw the data of the most recent update and restore the text cursor."""
+        self.refresh()
+        if self.interactive and self.hide_cursor:
+            self.stream.write(ANSI_SHOW_CURSOR)
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type=None, exc_value=None, traceback=None):
+        self.close()
+
+
+def normalize_table(data, column_names=None, workers=None, sort_by=None, reverse=False, limit=None, group_by=None):
+    """
+    Convert tabular data to the column model shared by the table renderers.
+
+    :param data: The tabular data, one of the following:
+
+                 - An iterable (e.g. a :func:`tuple` or :class:`list`)
+                   containing the rows of the table, where each row is an
+                   iterable containing the columns of the table.
+                 - A dictionary that maps column names to columns (any
+                   iterables, for example lists, :class:`array.array`
+                   objects or NumPy arrays).
+                 - A NumPy structured array (whose fields are the columns).
+                 - A :class:`TableData` object (which is returned as is).
+    :param column_names: An iterable of column names (strings). For
+                         dictionaries and structured arrays the column names
+                         select (and order) the columns to include, when they
+                         aren't given all columns are included.
+    :param workers: The number of worker processes used to convert and measure
+                    the values (an integer, defaults to :data:`None` which
+                    means no worker processes are used).
+    :param sort_by: Refer to :func:`select_rows()`.
+    :param reverse: Refer to :func:`select_rows()`.
+    :param limit: Refer to :func:`select_rows()`.
+    :param group_by: Refer to :func:`select_rows()`.
+    :returns: A :class:`TableData` object.
+    :raises: :exc:`~exceptions.ValueError` when `workers` is greater than
+             one and a :class:`Column` has a formatter that can't be
+             pickled.
+
+    The values of each column are converted to strings in one go (typed
+    columns like :class:`array.array` objects and NumPy arrays are converted
+    using their ``tolist()`` method first). Columns shorter than the longest
+    column are padded with empty strings.
+
+    When `workers` is greater than one and the table contains more than
+    :data:`PARALLEL_CHUNK_SIZE` rows, the rows are split into chunks that are
+    converted and measured in a :class:`concurrent.futures.ProcessPoolExecutor`
+    after which the column statistics of the chunks are merged. This only pays
+    off for very large tables (the values have to be sent to the worker
+    processes and back). On Python 2 the :mod:`concurrent.futures` module
+    requires the `futures` package, without it `workers` is ignored.
+
+    When `sort_by`, `limit` and/or `group_by` are given the rows are selected
+    using :func:`select_rows()` before they're converted, so that only the
+    selected rows are converted (and kept in memory).
+    """
+    if sort_by is not None or limit is not None or group_by is not None:
+        if isinstance(data, TableData):
+            if column_names is None:
+                column_names = data.column_names
+            data = data.rows()
+        elif getattr(getattr(data, 'dtype', None), 'names', None):
+            data = collections.OrderedDict((name, data[name].tolist()) for name in data.dtype.names)
+        if isinstance(data, Mapping) and column_names is None:
+            column_names = list(data.keys())
+        names = None
+        if column_names is not None:
+            column_names = list(column_names)
+            names = [c.name if isinstance(c, Column) else c for c in column_names]
+        data = select_rows(data, names, sort_by, reverse, limit, group_by)
+    if isinstance(data, TableData):
+        if column_names is None:
+            return data
+        return TableData(data.columns, normalize_columns(column_names), data.known_numeric, data.values)
+    columns = rows = specs = None
+    if column_names is not None:
+        # Separate column specifications from column names.
+        column_names = list(column_names)
+        if any(isinstance(c, Column) for c in column_names):
+            specs = [c if isinstance(c, Column) else None for c in column_names]
+            column_names = [c.name if isinstance(c, Column) else c for c in column_names]
+    if isinstance(data, Mapping):
+        if column_names is None:
+            column_names = list(data.keys())
+        columns = [data[name] for name in column_names]
+    elif getattr(getattr(data, 'dtype', None), 'names', None):
+        if column_names is None:
+            column_names = data.dtype.names
+        columns = [data[name] for name in column_names]
+    else:
+        rows = data
+    if column_names is not None:
+        column_names = normalize_columns(column_names)
+    if workers and workers > 1:
+        # Formatters are validated even when worker processes won't be used
+        # (because the table is small or concurrent.futures isn't available)
+        # so that the same call doesn't fail later on with more data.
+        for spec in specs or ():
+            if spec is not None and callable(spec.formatter) and not is_picklable(spec.formatter):
+                msg = "The formatter of column %r can't be sent to worker processes because it can't be pickled!"
+                raise ValueError(msg % spec.name)
+        if HAVE_CONCURRENT_FUTURES:
+            chunks = split_table(columns, rows, specs)
+            if len(chunks) > 1:
+                return merge_chunks(chunks, column_names, workers)
+    table = create_table(columns, rows, specs)
+    table.column_names = column_names
+    return table
+
+
+def create_table(columns=None, rows=None, specs=None):
+    """
+    Create a :class:`TableData` object from columns or rows (see :func:`normalize_table()`).
+
+    :param columns: A list of columns (iterables of values) or :data:`None`.
+    :param rows: An iterable of rows (used when `columns` is :data:`None`).
+    :param specs: A list with a :class:`Column` object or :data:`None` for
+                  each column (optional).
+    :returns: A :class:`TableData` object (without column names).
+    """
+    if columns is None:
+        # Transpose the rows so that the values can be converted one column
+        # at a time (this also pads rows that are shorter than other rows).
+        columns = list(zip_longest(*rows, fillvalue=u''))
+    known_numeric = [guess_numeric_column(c) for c in columns]
+    specs = list(specs or ())
+    specs += [None] * (len(columns) - len(specs))
+    for index, spec in enumerate(specs[:len(columns)]):
+        if spec is not None:
+            if spec.formatter is not None:
+                columns[index] = spec.format_values(columns[index])
+                # The type of the raw values says nothing about the
+                # formatted values.
+                known_numeric[index] = None
+            if spec.right_aligned is not None:
+                known_numeric[index] = spec.right_aligned
+    columns = [column_values(c) for c in columns]
+    # The original values are only kept for columns that contain values
+    # other than strings (see render_jsonl_table()).
+    values = [None if all(isinstance(v, basestring_type) for v in c) else c for c in columns]
+    columns = [normalize_column(c) for c in columns]
+    # Make sure all columns have the same number of rows.
+    num_rows = max([len(c) for c in columns] or [0])
+    for column in columns:
+        if len(column) < num_rows:
+            column.extend([u''] * (num_rows - len(column)))
+    return TableData(columns, None, known_numeric, values)
+
+
+def split_table(columns=None, rows=None, specs=None):
+    """
+    Split a table into chunks of :data:`PARALLEL_CHUNK_SIZE` rows.
+
+    :param columns: A list of columns (sliceable sequences) or :data:`None`.
+    :param rows: An iterable of rows (used when `columns` is :data:`None`).
+    :param specs: A list of :class:`Column` objects and/or :data:`None` values.
+    :returns: A list of ``(columns, rows, specs)`` tuples that can be passed
+              to :func:`create_table()`.
+    """
+    size = PARALLEL_CHUNK_SIZE
+    if columns is None:
+        if not isinstance(rows, (list, tuple)):
+            rows = list(rows)
+        return [(None, rows[i:i + size], specs) for i in range(0, len(rows), size)]
+    num_rows = max([len(c) for c in columns] or [0])
+    return [([c[i:i + size] for c in columns], None, specs) for i in range(0, num_rows, size)]
+
+
+def measure_chunk(chunk):
+    """
+    Convert a chunk of a table to strings and calculate its column statistics.
+
+    :param chunk: A ``(columns, rows, specs)`` tuple created by :func:`split_table()`.
+    :returns: A tuple with five lists: The columns (lists of strings), the
+              widths of the columns, whether the columns contain ANSI escape
+              sequences, whether the columns are numeric and the original
+              values of the columns (see :attr:`TableData.values`).
+
+    This function is called in worker processes by :func:`merge_chunks()`.
+    """
+    table = create_table(*chunk)
+    return table.columns, table.widths, table.has_ansi, table.numeric, table.values
+
+
+def merge_chunks(chunks, column_names, workers):
+    """
+    Convert and measure the chunks of a table in a process pool and merge the results.
+
+    :param chunks: The list created by :func:`split_table()`.
+    :param column_names: A list of column names (strings) or :data:`None`.
+    :param workers: The number of worker processes (an integer).
+    :returns: A :class:`TableData` object.
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(measure_chunk, chunks))
+    num_columns = max(len(r[0]) for r in results)
+    columns = [[] for i in range(num_columns)]
+    values = [[] for i in range(num_columns)]
+    widths = [0] * num_columns
+    has_ansi = [False] * num_columns
+    numeric = [True] * num_columns
+    for chunk_columns, chunk_widths, chunk_has_ansi, chunk_numeric, chunk_values in results:
+        num_rows = len(chunk_columns[0]) if chunk_columns else 0
+        for index in range(num_columns):
+            if index < len(chunk_columns):
+                columns[index].extend(chunk_columns[index])
+                widths[index] = max(widths[index], chunk_widths[index])
+                has_ansi[index] = has_ansi[index] or chunk_has_ansi[index]
+                numeric[index] = numeric[index] and chunk_numeric[index]
+                # Chunks without original values contain only strings.
+                values[index].extend(chunk_columns[index] if chunk_values[index] is None else chunk_values[index])
+            elif num_rows:
+                # Pad columns missing from this chunk (like zip_longest()).
+                columns[index].extend([u''] * num_rows)
+                values[index].extend([u''] * num_rows)
+                numeric[index] = False
+    # Only keep the original values of columns that contain values other than
+    # strings (consistent with create_table()).
+    values = [None if all(r[4][i] is None for r in results if i < len(r[4])) else v for i, v in enumerate(values)]
+    table = TableData(columns, column_names, numeric, values)
+    table.cached_widths = widths
+    table.cached_has_ansi = has_ansi
+    table.cached_numeric = numeric
+    return table
+
+
+def is_picklable(value):
+    """
+    Check whether a value can be sent to worker processes.
+
+    :param value: The value to check.
+    :returns: :data:`True` if the value can be pickled, :data:`False` otherwise.
+    """
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
+
+
+def normalize_column(values):
+    """
+    Convert the values of a column to strings.
+
+    :param values: An iterable of values (e.g. a :class:`list`,
+                   :class:`array.array` object or NumPy array).
+    :returns: A list of strings.
+    """
+    return [unicode_type(v) for v in column_values(values)]
+
+
+def column_values(values):
+    """
+    Get the values of a column as a list.
+
+    :param values: An iterable of values (e.g. a :class:`list`,
+                   :class:`array.array` object or NumPy array).
+    :returns: A list of values (typed columns are converted using their
+              ``tolist()`` method).
+    """
+    if isinstance(values, array.array) or is_numpy_object(values):
+        return values.tolist()
+    return values if isinstance(values, list) else list(values)
+
+
+def guess_numeric_column(values):
+    """
+    Check whether a column of integers is numeric based on its type.
+
+    :param values: An iterable of values.
+    :returns: :data:`True` or :data:`False` for :class:`array.array` objects
+              and NumPy arrays containing integers, :data:`None` otherwise
+              (meaning :data:`NUMERIC_DATA_PATTERN` needs to be used).
+
+    Negative integers aren't matched by :data:`NUMERIC_DATA_PATTERN` so a
+    column of signed integers is only numeric when its minimum isn't negative.
+    """
+    if isinstance(values, array.array):
+        if values.typecode in UNSIGNED_TYPECODES:
+            return True
+        elif values.typecode in SIGNED_TYPECODES:
+            return not values or min(values) >= 0
+    elif is_numpy_object(values) and getattr(values, 'ndim', 0) == 1:
+        if values.dtype.kind == 'u':
+            return True
+        elif values.dtype.kind == 'i':
+            return not len(values) or bool(values.min() >= 0)
+    return None
+
+
+class Column(object):
+
+    """
+    Specification of a table column (its name, formatter and alignment).
+
+    :class:`Column` objects can be used in place of column names to tell the
+    table functions how to format and align the values of a column:
+
+    >>> from humanfriendly.tables import Column, format_pretty_table
+    >>> column_names = ['Filename', Column('Size', formatter='size')]
+    >>> print(format_pretty_table([['a.txt', 4096], ['b.iso', 1024 ** 3 * 4.7]], column_names))
+    ---------------------
+    | Filename |   Size |
+    ---------------------
+    | a.txt    |   4 KB |
+    | b.iso    | 4.7 GB |
+    ---------------------
+
+    The formatter is applied to the whole column at once (each distinct value
+    is formatted once) and the alignment is known up front, so there's no need
+    to match :data:`NUMERIC_DATA_PATTERN` against the formatted values.
+    """
+
+    def __init__(self, name, formatter=None, align=None):
+        """
+        Initialize a :class:`Column` object.
+
+        :param name: The name of the column (a string).
+        :param formatter: One of the names in :data:`FORMATTERS` (a string), a
+                          callable that takes a value and returns a string or
+                          :data:`None` (the default) to convert values to
+                          strings as usual. Empty values (:data:`None` and
+                          empty strings) aren't passed to the formatter.
+        :param align: The string 'left' or 'right' or :data:`None` (the
+                      default). When this is :data:`None` columns that use a
+                      named formatter are right-aligned and other columns
+                      are right-aligned when all of their (formatted) values
+                      are numeric.
+        :raises: :exc:`~exceptions.ValueError` when the formatter or
+                 alignment isn't supported.
+
+        When a table is converted by worker processes (see the `workers`
+        parameter of :func:`normalize_table()`) callable formatters are sent
+        to the worker processes, so they need to be picklable (for example
+        functions defined at module level, not lambdas).
+        """
+        if isinstance(formatter, basestring_type) and formatter not in FORMATTERS:
+            msg = "Unsupported formatter! (expected one of %s but got %r)"
+            raise ValueError(msg % (', '.join(sorted(FORMATTERS)), formatter))
+        if align not in (None, 'left', 'right'):
+            raise ValueError("Unsupported alignment! (expected 'left' or 'right' but got %r)" % align)
+        self.name = name
+        self.formatter = formatter
+        self.align = align
+
+    @property
+    def right_aligned(self):
+        """:data:`True` if the column is right-aligned, :data:`False` if it's left-aligned, :data:`None` if unknown."""
+        if self.align is not None:
+            return self.align == 'right'
+        elif isinstance(self.formatter, basestring_type):
+            return True
+        return None
+
+    def format_values(self, values):
+        """
+        Apply the formatter to the values of a column.
+
+        :param values: An iterable of values.
+        :returns: A list of strings.
+        """
+        if isinstance(values, array.array) or is_numpy_object(values):
+            values = values.tolist()
+        values = list(values)
+        if isinstance(self.formatter, basestring_type):
+            formatter = FORMATTERS[self.formatter]
+        else:
+            formatter = functools.partial(map_values, self.formatter)
+        try:
+            # Format each distinct (non-empty) value once. The type is part of
+            # the key because values like 1, 1.0 and True compare equal while
+            # a formatter may format them differently.
+            keys = [(type(v), v) for v in values]
+            distinct_keys = [k for k in collections.OrderedDict.fromkeys(keys) if not is_empty_value(k[1])]
+        except TypeError:
+            # Unhashable values are formatted one by one.
+            indexes = [i for i, v in enumerate(values) if not is_empty_value(v)]
+            formatted_values = [u''] * len(values)
+            for index, text in zip(indexes, formatter([values[i] for i in indexes])):
+                formatted_values[index] = text
+            return formatted_values
+        mapping = dict(zip(distinct_keys, formatter([k[1] for k in distinct_keys])))
+        return [u'' if is_empty_value(k[1]) else mapping[k] for k in keys]
+
+
+def map_values(function, values):
+    """Apply a function to each value (used to batch the formatters of :class:`Column` objects)."""
+    return [function(v) for v in values]
+
+
+def is_empty_value(value):
+    """Check whether a value is :data:`None` or an empty string (these aren't passed to formatters)."""
+    return value is None or (isinstance(value, basestring_type) and not value)
+
+
+def format_size_values(values):
+    """Format values using :func:`.format_size()` (the ``size`` formatter of :class:`Column`)."""
+    from humanfriendly import disk_size_registry
+    return disk_size_registry['jedec'].format_many(values)
+
+
+def format_length_values(values):
+    """Format values using :func:`.format_length()` (the ``length`` formatter of :class:`Column`)."""
+    from humanfriendly import length_quantity
+    return length_quantity.format_many(values)
+
+
+def format_number_values(values):
+    """Format values using :func:`.format_number()` (the ``number`` formatter of :class:`Column`)."""
+    from humanfriendly import format_number
+    return [format_number(v) for v in values]
+
+
+def format_timespan_values(values):
+    """Format values using :func:`.format_timespans()` (the ``timespan`` formatter of :class:`Column`)."""
+    from humanfriendly import format_timespans
+    return format_timespans(values)
+
+
+def format_age_values(values):
+    """Format values using :func:`.format_ages()` (the ``age`` formatter of :class:`Column`)."""
+    from humanfriendly import format_ages
+    return format_ages(values)
+
+
+def format_rate_values(values):
+    """Format values using :func:`.format_rates()` (the ``rate`` formatter of :class:`Column`)."""
+    from humanfriendly import format_rates
+    return format_rates(values)
+
+
+class TableData(object):
+
+    """
+    Tabular data stored column by column.
+
+    This is the column model shared by the table renderers in this module: The
+    values are converted to strings one column at a time (see
+    :func:`normalize_table()`) and the width and alignment of each column are
+    calculated from the column as a whole (without building a list of rows).
+    """
+
+    def __init__(self, columns, column_names=None, known_numeric=None, values=None):
+        """
+        Initialize a :class:`TableData` object.
+
+        :param columns: A list of columns, where each column is a list of
+                        strings (all columns should have the same length).
+        :param column_names: A list of column names (strings) or :data:`None`.
+        :param known_numeric: A list with one value per column: :data:`True`
+                              or :data:`False` if it's already known whether
+                              the column is numeric, :data:`None` if it
+                              needs to be checked (optional).
+        :param values: A list with one value per column: A list with the
+                       original values of the column or :data:`None` if the
+                       column contains only strings (optional).
+        """
+        self.columns = columns
+        self.column_names = column_names
+        self.known_numeric = known_numeric or [None] * len(columns)
+        self.values = values or [None] * len(columns)
+        self.num_rows = len(columns[0]) if columns else 0
+        self.cached_has_ansi = None
+        self.cached_line_breaks = None
+        self.cached_widths = None
+        self.cached_numeric = None
+
+    @property
+    def num_columns(self):
+        """The number of columns (an integer, including column names without values)."""
+        return max(len(self.columns), len(self.column_names or ()))
+
+    @property
+    def widths(self):
+        """The width of the widest value in each column (a list of integers, ignoring column names)."""
+        if self.cached_widths is None:
+            self.cached_widths = [max(map(ansi_width if a else len, c)) if c else 0
+                                  for c, a in zip(self.columns, self.has_ansi)]
+        return list(self.cached_widths)
+
+    @property
+    def has_ansi(self):
+        """Whether each column contains ANSI escape sequences (a list of booleans)."""
+        if self.cached_has_ansi is None:
+            self.cached_has_ansi = [any(ANSI_CSI in v for v in c) for c in self.columns]
+        return list(self.cached_has_ansi)
+
+    @property
+    def line_breaks(self):
+        """Whether each column contains line breaks (a list of booleans)."""
+        if self.cached_line_breaks is None:
+            self.cached_line_breaks = [any('\n' in v for v in c) for c in self.columns]
+        return list(self.cached_line_breaks)
+
+    @property
+    def numeric(self):
+        """Whether each column contains only numeric data (a list of booleans, ignoring column names)."""
+        if self.cached_numeric is None:
+            self.cached_numeric = [is_numeric_column(c) if n is None else n
+                                   for c, n in zip(self.columns, self.known_numeric)]
+        return list(self.cached_numeric)
+
+    def rows(self):
+        """
+        Iterate over the rows of the table.
+
+        :returns: A generator of tuples of strings.
+        """
+        return zip(*self.columns)
+
+
+def is_numeric_column(values):
+    """
+    Check whether all values in a column contain numeric data.
+
+    :param values: A list of strings.
+    :returns: :data:`True` if all values match :data:`NUMERIC_DATA_PATTERN`
+              (ignoring ANSI escape sequences), :data:`False` otherwise.
+    """
+    match = NUMERIC_DATA_PATTERN.match
+    return all(match(v) or match(ansi_strip(v)) for v in values)
+
+
+def create_justifier(width, numeric, has_ansi):
+    """
+    Create a function that pads the values of a column to the width of the column.
+
+    :param width: The width of the column (an integer).
+    :param numeric: :data:`True` to right-align the values, :data:`False` to
+                    left-align them.
+    :param has_ansi: :data:`True` if the column contains ANSI escape
+                     sequences, :data:`False` otherwise.
+    :returns: A callable that takes a string and returns a string.
+    """
+    if has_ansi:
+        return lambda text: justify(text, width, numeric, True)
+    elif numeric:
+        return lambda text: text.rjust(width)
+    else:
+        return lambda text: text.ljust(width)
+
+
+def justify(text, width, numeric, has_ansi):
+    """
+    Pad a string to the given width.
+
+    :param text: The string to pad.
+    :param width: The width to pad to (an integer).
+    :param numeric: :data:`True` to right-align the text, :data:`False` to
+                    left-align it.
+    :param has_ansi: :data:`True` if the text may contain ANSI escape sequences
+                     (which are ignored in the calculation of its width).
+    :returns: The padded string.
+    """
+    padding = ' ' * (width - (ansi_width(text) if has_ansi else len(text)))
+    return padding + text if numeric else text + padding
+
+
+def fit_value(text, width, overflow='truncate'):
+    """
+    Make a value fit in a column by truncating or wrapping it.
+
+    :param text: The value (a string).
+    :param width: The width of the column (an integer).
+    :param overflow: The string 'truncate' to truncate values that are too
+                     wide (ending them with :data:`TRUNCATION_MARKER`) or the
+                     string 'wrap' to wrap them over multiple lines (using
+                     :func:`textwrap.wrap()`).
+    :returns: A list of strings (one for 'truncate', one or more for 'wrap').
+
+    ANSI escape sequences are ignored in the calculation of widths. When the
+    value is styled as a whole (e.g. using :func:`.ansi_wrap()`) the style is
+    applied to each resulting line, otherwise ANSI escape sequences are
+    stripped from values that need to be truncated or wrapped.
+    """
+    if overflow == 'wrap':
+        if ansi_width(text) <= width and '\n' not in text:
+            return [text]
+        prefix, plain, suffix = split_style(text)
+        lines = []
+        for paragraph in plain.splitlines() or [u'']:
+            lines.extend(textwrap.wrap(paragraph, width) or [u''])
+    else:
+        if ansi_width(text) <= width:
+            return [text]
+        prefix, plain, suffix = split_style(text)
+        marker = TRUNCATION_MARKER if width > len(TRUNCATION_MARKER) else u''
+        lines = [plain[:width - len(marker)] + marker]
+    return [prefix + line + suffix for line in lines] if prefix else lines
+
+
+def split_style(text):
+    """
+    Split the ANSI escape sequences surrounding a value from the value.
+
+    :param text: The value (a string).
+    :returns: A tuple of three strings: The ANSI escape sequences preceding
+              the text, the text without ANSI escape sequences and the ANSI
+              escape sequences following the text (when the text contains
+              ANSI escape sequences in other places they are stripped and the
+              first and last strings are empty).
+    """
+    if ANSI_CSI not in text:
+        return u'', text, u''
+    match = STYLED_TEXT_PATTERN.match(text)
+    if match and ANSI_CSI not in match.group(2):
+        return match.groups()
+    return u'', ansi_strip(text), u''
+
+
+def normalize_cells(row):
+    """Convert the values of a row to strings that don't contain line breaks."""
+    return [unicode_type(v).replace('\n', ' ') for v in row]
 
 
 def normalize_columns(row):
-    return [unicode_type(c) for c in row]
+    return [unicode_type(c.name if isinstance(c, Column) else c) for c in row]
 
 
 def highlight_column_name(name):
     return ansi_wrap(name, bold=True, color=HIGHLIGHT_COLOR)
+
+
+OUTPUT_FORMATS = collections.OrderedDict([
+    ('pretty', render_pretty_table),
+    ('robust', render_robust_table),
+    ('markdown', render_markdown_table),
+    ('csv', render_csv_table),
+    ('tsv', render_tsv_table),
+    ('jsonl', render_jsonl_table),
+])
+"""
+A dictionary that maps the names of the output formats supported by
+:func:`write_table()` to functions that take a :class:`TableData` object and
+generate the lines of the table.
+"""
+
+FORMATTERS = collections.OrderedDict([
+    ('size', format_size_values),
+    ('length', format_length_values),
+    ('number', format_number_values),
+    ('timespan', format_timespan_values),
+    ('age', format_age_values),
+    ('rate', format_rate_values),
+])
+"""
+A dictionary that maps the names of the formatters supported by
+:class:`Column` to functions that take a list of values and return a list of
+strings.
+"""
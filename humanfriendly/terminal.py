@@ -1,7 +1,7 @@
 # Human friendly input/output in Python.
 #
 # Author: Peter Odding <peter@peterodding.com>
-# Last Change: June 27, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 """
@@ -15,6 +15,8 @@ escape sequences work.
 """
 
 # Standard library modules.
+import contextlib
+import errno
 import os
 import re
 import subprocess
@@ -27,6 +29,7 @@ try:
     import fcntl
     import termios
     import struct
+    import tty
     HAVE_IOCTL = True
 except ImportError:
     HAVE_IOCTL = False
@@ -34,6 +37,7 @@ except ImportError:
 # Modules included in our package. We import find_meta_variables() here to
 # preserve backwards compatibility with older versions of humanfriendly where
 # that function was defined in this module.
+from humanfriendly.instrumentation import instrumented
 from humanfriendly.usage import find_meta_variables, format_usage  # NOQA
 
 ANSI_CSI = '\x1b['
@@ -48,6 +52,24 @@ ANSI_ERASE_LINE = '%sK' % ANSI_CSI
 ANSI_RESET = '%s0%s' % (ANSI_CSI, ANSI_SGR)
 """The ANSI escape sequence to reset styling (a string)."""
 
+ANSI_ERASE_DOWN = '%sJ' % ANSI_CSI
+"""The ANSI escape sequence to erase the screen below the cursor (a string)."""
+
+ANSI_CURSOR_HOME = '%sH' % ANSI_CSI
+"""The ANSI escape sequence to move the cursor to the top left of the screen (a string)."""
+
+ANSI_HIDE_CURSOR = '%s?25l' % ANSI_CSI
+"""The ANSI escape sequence to hide the text cursor (a string)."""
+
+ANSI_SHOW_CURSOR = '%s?25h' % ANSI_CSI
+"""The ANSI escape sequence to show the text cursor (a string)."""
+
+ANSI_ALTERNATE_SCREEN = '%s?1049h' % ANSI_CSI
+"""The ANSI escape sequence to switch to the alternate screen buffer (a string)."""
+
+ANSI_NORMAL_SCREEN = '%s?1049l' % ANSI_CSI
+"""The ANSI escape sequence to switch back to the normal screen buffer (a string)."""
+
 ANSI_COLOR_CODES = dict(black=0, red=1, green=2, yellow=3, blue=4, magenta=5, cyan=6, white=7)
 """
 A dictionary with (name, number) pairs of `portable color codes`_. Used by
@@ -71,6 +93,7 @@ message of the ``humanfriendly`` program). If the environment variable
 """
 
 
+@instrumented
 def ansi_strip(text):
     """
     Strip ANSI escape sequences from the given string.
@@ -83,6 +106,7 @@ def ansi_strip(text):
     return re.sub(pattern, '', text)
 
 
+@instrumented
 def ansi_style(color=None, bold=False, faint=False, underline=False, inverse=False, strike_through=False):
     """
     Generate ANSI escape sequences for the given color and/or style(s).
@@ -126,6 +150,7 @@ def ansi_style(color=None, bold=False, faint=False, underline=False, inverse=Fal
         return ''
 
 
+@instrumented
 def ansi_width(text):
     """
     Calculate the effective width of the given text (ignoring ANSI escape sequences).
@@ -140,6 +165,7 @@ def ansi_width(text):
     return len(ansi_strip(text))
 
 
+@instrumented
 def ansi_wrap(text, **kw):
     """
     Wrap text in ANSI escape sequences for the given color and/or style(s).
@@ -183,6 +209,7 @@ def connected_to_terminal(stream=None):
         return False
 
 
+@instrumented
 def find_terminal_size():
     """
     Determine the number of lines and columns visible in the terminal.
@@ -270,6 +297,51 @@ def find_terminal_size_using_stty():
     return tuple(map(int, tokens))
 
 
+@contextlib.contextmanager
+def cbreak_mode(stream=None):
+    """
+    Context manager that puts a terminal in "cbreak" mode.
+
+    :param stream: The stream connected to the terminal (a :class:`file`
+                   object, defaults to :data:`sys.stdin`).
+
+    In cbreak mode keys are available to :func:`read_key()` as soon as they're
+    pressed (there's no line buffering) and typed characters aren't echoed.
+    The original terminal settings are restored when the context ends.
+    """
+    if not HAVE_IOCTL:
+        raise NotImplementedError("It looks like the `termios' module is not available!")
+    if stream is None:
+        stream = sys.stdin
+    fd = stream.fileno()
+    saved_settings = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved_settings)
+
+
+def read_key(stream=None):
+    """
+    Read a single key press from a terminal (see :func:`cbreak_mode()`).
+
+    :param stream: The stream connected to the terminal (a :class:`file`
+                   object, defaults to :data:`sys.stdin`).
+    :returns: The characters generated by the key press (a string). Special
+              keys like the arrow keys generate ANSI escape sequences, for
+              example the up arrow generates ``'\\x1b[A'``. An empty string
+              is returned at end of file.
+    """
+    if stream is None:
+        stream = sys.stdin
+    # We read directly from the file descriptor because buffered reads could
+    # block until more input is available.
+    key = os.read(stream.fileno(), 32)
+    return key.decode('UTF-8', 'replace')
+
+
+@instrumented
 def usage(usage_text):
     """
     Print a human friendly usage message to the terminal.
@@ -281,13 +353,16 @@ def usage(usage_text):
     1. If :data:`sys.stdout` is connected to a terminal (see
        :func:`connected_to_terminal()`) then the usage message is formatted
        using :func:`.format_usage()`.
-    2. The usage message is shown using a pager (see :func:`show_pager()`).
+    2. The usage message is shown using a pager (see :func:`pager_stream()`).
     """
     if connected_to_terminal(sys.stdout):
         usage_text = format_usage(usage_text)
-    show_pager(usage_text)
+    with pager_stream(ANSI_CSI in usage_text) as stream:
+        for line in usage_text.splitlines():
+            stream.write(line + '\n')
 
 
+@instrumented
 def show_pager(formatted_text):
     """
     Print a large text to the terminal using a pager.
@@ -304,13 +379,119 @@ def show_pager(formatted_text):
     If the given text contains ANSI escape sequences the command ``less
     --RAW-CONTROL-CHARS`` is used, otherwise ``$PAGER`` is used (if ``$PAGER``
     isn't set the command ``less`` is used).
+
+    To show text that is generated incrementally (for example a large table)
+    use :func:`pager_stream()` instead.
     """
-    if connected_to_terminal(sys.stdout):
-        if ANSI_CSI in formatted_text:
-            pager_command = ['less', '--RAW-CONTROL-CHARS']
-        else:
-            pager_command = [os.environ.get('PAGER', 'less')]
-        pager = subprocess.Popen(pager_command, stdin=subprocess.PIPE)
-        pager.communicate(input=formatted_text)
+    with pager_stream(ANSI_CSI in formatted_text) as stream:
+        stream.write(formatted_text + '\n')
+
+
+@contextlib.contextmanager
+def pager_stream(ansi_sequences=True):
+    """
+    Context manager that yields a stream connected to a pager.
+
+    :param ansi_sequences: :data:`True` (the default) if the text may contain
+                           ANSI escape sequences, in which case the command
+                           ``less --RAW-CONTROL-CHARS`` is used. When this is
+                           :data:`False` ``$PAGER`` is used (if ``$PAGER``
+                           isn't set the command ``less`` is used).
+    :returns: A :class:`PagerStream` object or :data:`sys.stdout` (when
+              :data:`sys.stdout` isn't connected to a terminal).
+
+    The text written to the stream is fed to the pager as it's written, so the
+    user can start reading before all output has been generated. When the
+    user quits the pager before all text has been written the next write
+    raises :exc:`PagerClosed`. The context manager swallows this exception,
+    so it interrupts the code that generates the text (which avoids wasting
+    time on formatting output that nobody will see):
+
+    >>> from humanfriendly.tables import write_pretty_table
+    >>> from humanfriendly.terminal import pager_stream
+    >>> with pager_stream() as stream:
+    ...     write_pretty_table(stream, ([i, i ** 2] for i in range(10 ** 6)))
+    """
+    if not connected_to_terminal(sys.stdout):
+        yield sys.stdout
+        return
+    if ansi_sequences:
+        pager_command = ['less', '--RAW-CONTROL-CHARS']
     else:
-        print(formatted_text)
+        pager_command = [os.environ.get('PAGER', 'less')]
+    pager = subprocess.Popen(pager_command, stdin=subprocess.PIPE)
+    stream = PagerStream(pager.stdin, getattr(sys.stdout, 'encoding', None))
+    try:
+        yield stream
+        stream.close()
+    except PagerClosed:
+        pass
+    finally:
+        stream.close(ignore_errors=True)
+        pager.wait()
+
+
+class PagerClosed(Exception):
+
+    """Raised by :class:`PagerStream` when the pager has exited (e.g. because the user quit the pager)."""
+
+
+class PagerStream(object):
+
+    """Writable stream connected to a pager (see :func:`pager_stream()`)."""
+
+    def __init__(self, pipe, encoding=None):
+        """
+        Initialize a :class:`PagerStream` object.
+
+        :param pipe: The standard input stream of the pager (a binary file
+                     object).
+        :param encoding: The name of the text encoding used to encode strings
+                         (defaults to UTF-8).
+        """
+        self.pipe = pipe
+        self.encoding = encoding or 'UTF-8'
+
+    def write(self, text):
+        """
+        Write text to the pager.
+
+        :param text: The text to write (a string).
+        :raises: :exc:`PagerClosed` when the pager has exited.
+        """
+        if not isinstance(text, bytes):
+            text = text.encode(self.encoding, 'replace')
+        self.call(self.pipe.write, text)
+
+    def flush(self):
+        """Flush any buffered text to the pager."""
+        self.call(self.pipe.flush)
+
+    def close(self, ignore_errors=False):
+        """
+        Close the standard input stream of the pager.
+
+        :param ignore_errors: :data:`True` to ignore :exc:`PagerClosed`.
+        """
+        if not self.pipe.closed:
+            try:
+                self.call(self.pipe.close)
+            except PagerClosed:
+                if not ignore_errors:
+                    raise
+
+    def isatty(self):
+        """Text written to the pager is shown on a terminal (so this returns :data:`True`)."""
+        return True
+
+    def call(self, function, *args):
+        """Call a method of the pipe, translating broken pipe errors to :exc:`PagerClosed`."""
+        try:
+            return function(*args)
+        except (IOError, OSError) as e:
+            if e.errno == errno.EPIPE:
+                raise PagerClosed()
+            raise
+        except ValueError:
+            # Writing to a closed pipe.
+            raise PagerClosed()
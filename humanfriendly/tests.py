@@ -3,13 +3,16 @@
 # Tests for the 'humanfriendly' module.
 #
 # Author: Peter Odding <peter.odding@paylogic.eu>
-# Last Change: July 19, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 # Standard library modules.
+import array
 import math
 import os
 import random
+import re
+import subprocess
 import sys
 import time
 import unittest
@@ -19,20 +22,37 @@ import humanfriendly
 import humanfriendly.cli
 from humanfriendly import compact, dedent
 from humanfriendly.tables import (
+    Column,
+    LiveTable,
+    format_markdown_table,
     format_pretty_table,
     format_robust_table,
     format_smart_table,
+    normalize_table,
+    select_output_format,
+    select_rows,
+    sort_key,
+    TableViewer,
+    write_lines,
+    write_pretty_table,
+    write_robust_table,
+    write_table,
 )
 from humanfriendly.terminal import (
     ANSI_CSI,
+    ANSI_HIDE_CURSOR,
     ANSI_RESET,
     ANSI_SGR,
+    ANSI_SHOW_CURSOR,
     ansi_strip,
     ansi_style,
     ansi_width,
     ansi_wrap,
     connected_to_terminal,
     find_terminal_size,
+    pager_stream,
+    PagerClosed,
+    PagerStream,
 )
 from humanfriendly.usage import (
     find_meta_variables,
@@ -74,6 +94,15 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual('2 words', humanfriendly.pluralize(2, 'word'))
         self.assertEqual('1 box', humanfriendly.pluralize(1, 'box', 'boxes'))
         self.assertEqual('2 boxes', humanfriendly.pluralize(2, 'box', 'boxes'))
+        self.assertEqual('1.5 word', humanfriendly.pluralize(1.5, 'word'))
+        self.assertEqual('0.5 words', humanfriendly.pluralize('0.5', 'word'))
+        self.assertEqual(['0 boxes', '1 box', '2 boxes'], humanfriendly.pluralize_many([0, 1, 2], 'box', 'boxes'))
+        # Test that pluralize_decimal() agrees with pluralize().
+        for value in (0, 0.5, 1, 1.004, 1.5, 1.999, 2, 10, 19.5, -1, 123.456):
+            for keep_width in (False, True):
+                text = humanfriendly.round_number(value, keep_width=keep_width)
+                self.assertEqual(humanfriendly.pluralize(text, 'word'),
+                                 humanfriendly.pluralize_decimal(text, 'word', 'words'))
 
     def test_boolean_coercion(self):
         for value in [True, 'TRUE', 'True', 'true', 'on', 'yes', '1']:
@@ -104,6 +133,74 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual('1 year', humanfriendly.format_timespan(year))
         self.assertEqual('2 years', humanfriendly.format_timespan(year * 2))
         self.assertEqual('1 year, 2 weeks and 3 days', humanfriendly.format_timespan(year + week * 2 + day * 3 + hour * 12))
+        # Test sub-second units.
+        self.assertEqual('0.1 seconds', humanfriendly.format_timespan(0.1))
+        self.assertEqual('50 milliseconds', humanfriendly.format_timespan(0.05))
+        self.assertEqual('4.2 milliseconds', humanfriendly.format_timespan(0.0042))
+        self.assertEqual('12.5 microseconds', humanfriendly.format_timespan(0.0000125))
+        self.assertEqual('123 nanoseconds', humanfriendly.format_timespan(0.000000123))
+        # Values are rounded before the unit is selected.
+        self.assertEqual('1 millisecond', humanfriendly.format_timespan(0.000999999))
+        self.assertEqual('1 microsecond', humanfriendly.format_timespan(0.000000999999))
+        # Test detailed formatting.
+        self.assertEqual('300 milliseconds', humanfriendly.format_timespan(0.3, detailed=True))
+        self.assertEqual('1 second and 500 milliseconds', humanfriendly.format_timespan(1.5, detailed=True))
+        self.assertEqual('1 minute, 1 second and 500 milliseconds', humanfriendly.format_timespan(61.5, detailed=True))
+        self.assertEqual('1 minute and 1 second', humanfriendly.format_timespan(61.5, detailed=True, max_units=2))
+        self.assertEqual('0 seconds', humanfriendly.format_timespan(0, detailed=True))
+        # Test the maximum number of units.
+        self.assertEqual('1 year', humanfriendly.format_timespan(year + week * 2 + day * 3, max_units=1))
+
+    def test_format_timespans(self):
+        values = [0, 0.5, 1, 42, 59.999, 60, 90, 3600 * 25 + 0.9, 60 * 60 * 24 * 7 * 53 + 7322.5]
+        values.extend(random.random() * 10 ** random.randint(0, 9) for i in range(1000))
+        self.assertEqual([humanfriendly.format_timespan(v) for v in values],
+                         humanfriendly.format_timespans(values))
+        values = [v for v in values if v >= 60]
+        self.assertEqual([humanfriendly.timespan_quantity.format_compound(v, max_units=2, precision=1) for v in values],
+                         humanfriendly.format_timespans(values, max_units=2))
+        self.assertEqual(['1 minute'], humanfriendly.format_timespans(iter([60])))
+        self.assertEqual([], humanfriendly.format_timespans([]))
+        # Test the array.array based implementation of decompose_values().
+        dividers = [3600, 60, 1]
+        saved_numpy = sys.modules.get('numpy')
+        try:
+            sys.modules['numpy'] = None
+            expected = humanfriendly.decompose_values(values, dividers)
+        finally:
+            if saved_numpy is None:
+                del sys.modules['numpy']
+            else:
+                sys.modules['numpy'] = saved_numpy
+        self.assertEqual([[0.0, 1.0, 25.0], [1.0, 0.0, 0.0], [30.0, 30.0, 0.0]],
+                         [list(c[:3]) for c in humanfriendly.decompose_values([90.0, 3630.0, 90000.9], dividers)])
+        # Test the NumPy based implementation (when NumPy is installed).
+        try:
+            import numpy
+        except ImportError:
+            return
+        self.assertEqual([list(c) for c in expected], humanfriendly.decompose_values(values, dividers))
+        self.assertEqual(humanfriendly.format_timespans(values), humanfriendly.format_timespans(numpy.array(values)))
+
+    def test_format_age(self):
+        import datetime
+        now = time.time()
+        self.assertEqual('1 minute and 30 seconds', humanfriendly.format_age(now - 90, now=now))
+        self.assertEqual('1 minute', humanfriendly.format_age(now - 90, now=now, granularity=60))
+        self.assertEqual('1 day', humanfriendly.format_age(datetime.datetime(2013, 6, 16, 2, 47, 42),
+                                                           now=datetime.datetime(2013, 6, 17, 2, 47, 42)))
+        self.assertTrue(humanfriendly.format_age(now - 60 * 60 * 2).startswith('2 hours'))
+        self.assertEqual('5 minutes ago', humanfriendly.format_relative_time(now - 300, now=now))
+        self.assertEqual('in 2 hours', humanfriendly.format_relative_time(now + 7200, now=now))
+        # Test the batch interfaces.
+        self.assertEqual(['5 seconds', '1 minute'], humanfriendly.format_ages([now - 5, now - 60], now=now))
+        self.assertEqual(['5 seconds ago', 'in 1 minute'], humanfriendly.format_relative_times([now - 5, now + 60], now=now))
+        # Test that identical buckets share a cached string object.
+        ages = humanfriendly.format_ages([now - 61, now - 119], now=now, granularity=60)
+        self.assertEqual(['1 minute', '1 minute'], ages)
+        self.assertTrue(ages[0] is ages[1])
+        self.assertEqual(['in 1 minute', '1 minute ago'],
+                         humanfriendly.format_relative_times([now + 61, now - 61], now=now, granularity=60))
 
     def test_parse_timespan(self):
         self.assertEqual(0, humanfriendly.parse_timespan('0'))
@@ -114,11 +211,66 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual(60*60*24*4, humanfriendly.parse_timespan('4d'))
         self.assertEqual(60*60*24*7*5, humanfriendly.parse_timespan('5 w'))
         self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1z')
+        # Test sub-second units.
+        self.assertEqual(0.25, humanfriendly.parse_timespan('250ms'))
+        self.assertEqual(5e-06, humanfriendly.parse_timespan(u'5 \u00b5s'))
+        self.assertEqual(5e-06, humanfriendly.parse_timespan('5 microseconds'))
+        self.assertEqual(1e-08, humanfriendly.parse_timespan('10ns'))
+        self.assertEqual(0.005, humanfriendly.parse_timespan('5 msecs'))
+        # Sub-second units are only matched by their exact names.
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '5 nights')
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '5 used')
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '5 n')
+        # Out of range numbers are rejected.
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1e400s')
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1e308 weeks')
+        self.assertEqual(60*5, humanfriendly.parse_timespan('5 mss'))
+        # Test compound expressions.
+        self.assertEqual(60*60*1.5, humanfriendly.parse_timespan('1h30m'))
+        self.assertEqual(60*60*24*2 + 60*60*4, humanfriendly.parse_timespan('2d4h'))
+        self.assertEqual(60*60 + 60*30 + 15, humanfriendly.parse_timespan('1h 30m 15s'))
+        self.assertEqual(60*60 + 60*30 + 15, humanfriendly.parse_timespan('1 hour, 30 minutes and 15 seconds'))
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1h 30')
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1h or 30m')
+        # Test the bounded cache.
+        humanfriendly.timespan_cache.clear()
+        self.assertEqual(90, humanfriendly.parse_timespan('1m30s', cached=True))
+        self.assertEqual(90, humanfriendly.timespan_cache['1m30s'])
+        self.assertEqual(90, humanfriendly.parse_timespan('1m30s', cached=True))
+        self.assertRaises(humanfriendly.InvalidTimespan, humanfriendly.parse_timespan, '1z', cached=True)
 
     def test_parse_date(self):
         self.assertEqual((2013, 6, 17, 0, 0, 0), humanfriendly.parse_date('2013-06-17'))
         self.assertEqual((2013, 6, 17, 2, 47, 42), humanfriendly.parse_date('2013-06-17 02:47:42'))
         self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_date, '2013-06-XY')
+        # Test partial dates and times.
+        self.assertEqual((2013, 6, 1, 0, 0, 0), humanfriendly.parse_date('2013-06'))
+        self.assertEqual((2013, 6, 17, 2, 47, 0), humanfriendly.parse_date('2013-06-17 02:47'))
+        # Test ISO 8601 dates and times.
+        self.assertEqual((2013, 6, 17, 2, 47, 42), humanfriendly.parse_date('2013-06-17T02:47:42'))
+        self.assertEqual((2013, 6, 17, 2, 47, 42), humanfriendly.parse_date('20130617T024742Z'))
+        self.assertEqual((2013, 6, 17, 0, 47, 42, 500000),
+                         humanfriendly.parse_date('2013-06-17T02:47:42.5+02:00', microseconds=True))
+        self.assertEqual((2013, 6, 17, 4, 17, 42, 123456),
+                         humanfriendly.parse_date('2013-06-17T02:47:42,1234567-0130', microseconds=True))
+        self.assertEqual((2013, 6, 17, 0, 0, 0), humanfriendly.parse_date('2013-168'))
+        self.assertEqual((2013, 6, 17, 0, 0, 0), humanfriendly.parse_date('2013-W25-1'))
+        self.assertEqual((2007, 12, 31, 0, 0, 0), humanfriendly.parse_date('2008-W01-1'))
+        self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_date, '2013-13-01T00:00+01:00')
+        self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_date, '2013-06-17 02:47:42 extra')
+        self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_date, None)
+        # Dates and times that don't exist are rejected by both code paths.
+        for datestring in ('2013-13-45 99:99:99', '2013-02-30 12:00:00', '2013-06-17 24:00:00',
+                           '2013-06-17 02:61:00', '2013-13-45T10:00', '2013-02-30'):
+            self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_date, datestring)
+        self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_dates, ['2013-06-17 02:47:42', '2013-06-17 02:47:99'])
+        # Test the batch interface.
+        datestrings = ['2013-06-17 02:47:42', '2013-06-17 02:47:42', '2013-06-18 02:47:42',
+                       '2013-06-17T02:47:42', '2013-06-17', '2013-06-17T02:47:42Z', '2013-06-17T02:47:42+01:00']
+        self.assertEqual([humanfriendly.parse_date(d) for d in datestrings], humanfriendly.parse_dates(datestrings))
+        self.assertEqual([humanfriendly.parse_date(d, microseconds=True) for d in datestrings],
+                         humanfriendly.parse_dates(datestrings, microseconds=True))
+        self.assertRaises(humanfriendly.InvalidDate, humanfriendly.parse_dates, ['2013-06-17', 'yesterday'])
 
     def test_format_size(self):
         self.assertEqual('0 bytes', humanfriendly.format_size(0))
@@ -129,9 +281,23 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual('1 GB', humanfriendly.format_size(1024 ** 3))
         self.assertEqual('1 TB', humanfriendly.format_size(1024 ** 4))
         self.assertEqual('1 PB', humanfriendly.format_size(1024 ** 5))
+        # Test the IEC (binary) units.
+        self.assertEqual('1 byte', humanfriendly.format_size(1, binary=True))
+        self.assertEqual('1 KiB', humanfriendly.format_size(1024 ** 1, binary=True))
+        self.assertEqual('1.5 MiB', humanfriendly.format_size(1024 ** 2 * 1.5, binary=True))
+        self.assertEqual('1 EiB', humanfriendly.format_size(1024 ** 6, binary=True))
+        # Test the SI (decimal) units.
+        self.assertEqual('42 bytes', humanfriendly.format_size(42, binary=False))
+        self.assertEqual('1 kB', humanfriendly.format_size(1000 ** 1, binary=False))
+        self.assertEqual('1.02 kB', humanfriendly.format_size(1024 ** 1, binary=False))
+        self.assertEqual('1 TB', humanfriendly.format_size(1000 ** 4, binary=False))
 
     def test_parse_size(self):
         self.assertEqual(0, humanfriendly.parse_size('0B'))
+        # Out of range numbers are rejected (quickly).
+        self.assertRaises(humanfriendly.InvalidSize, humanfriendly.parse_size, '1e3000000 KB')
+        self.assertRaises(humanfriendly.InvalidSize, humanfriendly.parse_size, '1e-3000000 KB')
+        self.assertRaises(humanfriendly.InvalidSize, humanfriendly.parse_size, '1e400')
         self.assertEqual(42, humanfriendly.parse_size('42'))
         self.assertEqual(42, humanfriendly.parse_size('42B'))
         self.assertEqual(1024, humanfriendly.parse_size('1k'))
@@ -141,6 +307,33 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual(1024 ** 3 * 1.5, humanfriendly.parse_size('1.5 GB'))
         self.assertRaises(humanfriendly.InvalidSize, humanfriendly.parse_size, '1z')
         self.assertRaises(humanfriendly.InvalidSize, humanfriendly.parse_size, 'a')
+        # Test exact arithmetic for large values.
+        self.assertEqual(123456 * 1024 ** 5 // 1000, humanfriendly.parse_size('123.456 PB'))
+        self.assertEqual(27 * 1024 ** 5 // 10, humanfriendly.parse_size('2.7 PB'))
+        # Test exponent notation.
+        self.assertEqual(10 ** 12, humanfriendly.parse_size('1e12'))
+        self.assertEqual(1500 * 1024, humanfriendly.parse_size('1.5e3 KB'))
+        self.assertEqual(1, humanfriendly.parse_size('1e-3 KB'))
+        # Test the IEC and SI units.
+        self.assertEqual(1024, humanfriendly.parse_size('1 KiB'))
+        self.assertEqual(1024 ** 2 * 5, humanfriendly.parse_size('5 mebibytes'))
+        self.assertEqual(1024, humanfriendly.parse_size('1 KB', binary=True))
+        self.assertEqual(1000, humanfriendly.parse_size('1 KB', binary=False))
+        self.assertEqual(1000, humanfriendly.parse_size('1 kilobyte', binary=False))
+        self.assertEqual(1024, humanfriendly.parse_size('1 KiB', binary=False))
+        self.assertEqual(1000 ** 6, humanfriendly.parse_size('1 EB', binary=False))
+
+    def test_parse_size_round_trip(self):
+        for i in range(1000):
+            divider = 1024 ** random.randint(0, 5)
+            # Sizes that are formatted without rounding survive a round trip
+            # through format_size() and parse_size() without any changes.
+            num_bytes = random.randint(0, 100000) * divider // 100
+            self.assertEqual(num_bytes, humanfriendly.parse_size(humanfriendly.format_size(num_bytes)))
+            # Other sizes are rounded to two decimal places.
+            num_bytes = random.randint(0, 1000 * divider)
+            parsed_bytes = humanfriendly.parse_size(humanfriendly.format_size(num_bytes))
+            assert abs(parsed_bytes - num_bytes) <= (num_bytes * 0.005) + 1
 
     def test_format_length(self):
         self.assertEqual('0 metres', humanfriendly.format_length(0))
@@ -154,6 +347,8 @@ class HumanFriendlyTestCase(unittest.TestCase):
 
     def test_parse_length(self):
         self.assertEqual(0, humanfriendly.parse_length('0m'))
+        self.assertRaises(humanfriendly.InvalidLength, humanfriendly.parse_length, '1e400 km')
+        self.assertRaises(humanfriendly.InvalidLength, humanfriendly.parse_length, '1e307 km')
         self.assertEqual(42, humanfriendly.parse_length('42'))
         self.assertEqual(42, humanfriendly.parse_length('42m'))
         self.assertEqual(1000, humanfriendly.parse_length('1km'))
@@ -164,6 +359,55 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertRaises(humanfriendly.InvalidLength, humanfriendly.parse_length, '1z')
         self.assertRaises(humanfriendly.InvalidLength, humanfriendly.parse_length, 'a')
 
+    def test_quantities(self):
+        # Test the batch interfaces.
+        self.assertEqual(['1 KB', '1.5 MB'], humanfriendly.disk_size_registry['jedec'].format_many([1024, 1024 ** 2 * 1.5]))
+        self.assertEqual([1000, 0.05], humanfriendly.length_quantity.parse_many(['1 km', '5cm']))
+        # Test compound formatting.
+        self.assertEqual('1 km and 500 metres', humanfriendly.length_quantity.format_compound(1500))
+        # Test the additional quantities.
+        self.assertEqual('2.4 GHz', humanfriendly.frequency_quantity.format(2.4 * 1000 ** 3))
+        self.assertEqual(5000, humanfriendly.frequency_quantity.parse('5 kilohertz'))
+        self.assertEqual('25 kIOPS', humanfriendly.iops_quantity.format(25000))
+        self.assertRaises(ValueError, humanfriendly.iops_quantity.parse, '5 furlongs')
+        # Test matching of abbreviated unit names using the prefix trie.
+        from humanfriendly.units import add_prefix, match_prefix
+        trie = {}
+        for prefix in ('m', 'mm', 'km'):
+            add_prefix(trie, prefix, prefix)
+        self.assertEqual('m', match_prefix(trie, 'metres'))
+        self.assertEqual('mm', match_prefix(trie, 'mm'))
+        self.assertEqual('km', match_prefix(trie, 'kms'))
+        self.assertEqual(None, match_prefix(trie, 'z'))
+
+    def test_format_rate(self):
+        self.assertEqual('1.5 MB/s', humanfriendly.format_rate(1024 ** 2 * 15, duration=10))
+        self.assertEqual('12 Mbit/s', humanfriendly.format_rate(1000 ** 2 * 15, duration=10, bits=True))
+        self.assertEqual('60 KB/min', humanfriendly.format_rate(1024, interval='minute'))
+        self.assertEqual('3.6 MB/h', humanfriendly.format_rate(1000, interval='h', binary=False))
+        self.assertEqual('1 KiB/s', humanfriendly.format_rate(1024, binary=True))
+        self.assertRaises(ValueError, humanfriendly.format_rate, 1024, interval='fortnight')
+        # Test that a timer can be used as the duration.
+        timer = humanfriendly.Timer(start_time=time.time() - 2)
+        self.assertTrue(humanfriendly.format_rate(1024 * 10, timer).endswith('KB/s'))
+        # Test the batch interface.
+        self.assertEqual(['256 bytes/s', '512 KB/s', '1.5 GB/s'],
+                         humanfriendly.format_rates([512, 1024 ** 2, 1024 ** 3 * 3], duration=2))
+        self.assertEqual(['10 bytes/s', '20 bytes/s'], humanfriendly.format_rates([10, 80], [1, 4]))
+
+    def test_parse_rate(self):
+        self.assertRaises(humanfriendly.InvalidRate, humanfriendly.parse_rate, '1e400 MB/s')
+        self.assertRaises(humanfriendly.InvalidRate, humanfriendly.parse_rate, '1e400')
+        self.assertEqual(5 * 1024 ** 2, humanfriendly.parse_rate('5 MB/s'))
+        self.assertEqual(5 * 1024 ** 2, humanfriendly.parse_rate('5 MBps'))
+        self.assertEqual(5 * 1000 ** 2, humanfriendly.parse_rate('5 MB/s', binary=False))
+        self.assertEqual(12500000, humanfriendly.parse_rate('100 Mbps'))
+        self.assertEqual(12500000, humanfriendly.parse_rate('100 Mbit/s'))
+        self.assertEqual(1024, humanfriendly.parse_rate('60 KB/min'))
+        self.assertEqual(42, humanfriendly.parse_rate('42'))
+        self.assertRaises(humanfriendly.InvalidRate, humanfriendly.parse_rate, '5 MB/fortnight')
+        self.assertRaises(humanfriendly.InvalidRate, humanfriendly.parse_rate, 'fast')
+
     def test_format_number(self):
         self.assertEqual('1', humanfriendly.format_number(1))
         self.assertEqual('1.5', humanfriendly.format_number(1.5))
@@ -179,6 +423,36 @@ class HumanFriendlyTestCase(unittest.TestCase):
         self.assertEqual('1', humanfriendly.round_number(1.0))
         self.assertEqual('1.00', humanfriendly.round_number(1, keep_width=True))
         self.assertEqual('3.14', humanfriendly.round_number(3.141592653589793))
+        self.assertEqual('100', humanfriendly.round_number(100))
+        self.assertEqual('0', humanfriendly.round_number(0.001))
+        self.assertEqual('-2.5', humanfriendly.round_number(-2.5))
+        self.assertEqual('inf', humanfriendly.round_number(float('inf')))
+        self.assertEqual(['1', '2.5', '3.14'], humanfriendly.round_numbers([1, 2.5, 3.141592653589793]))
+        self.assertEqual(['1.00', '2.50'], humanfriendly.round_numbers([1, 2.5], keep_width=True))
+
+    def test_numeric_types(self):
+        import decimal
+        import fractions
+        # Decimal and Fraction values are formatted using exact arithmetic.
+        self.assertEqual('12345678901234567890.12', humanfriendly.round_number(decimal.Decimal('12345678901234567890.125')))
+        self.assertEqual('0.13', humanfriendly.round_number(fractions.Fraction(1, 8) + fractions.Fraction(1, 1000)))
+        self.assertEqual('0.12', humanfriendly.round_number(fractions.Fraction(1, 8)))
+        self.assertEqual('1.5 KB', humanfriendly.format_size(decimal.Decimal('1536')))
+        self.assertEqual('1.5 PB', humanfriendly.format_size(fractions.Fraction(3, 2) * 1024 ** 5))
+        self.assertEqual('1.5 mm', humanfriendly.format_length(decimal.Decimal('0.0015')))
+        # Integers that can't be represented exactly as floats.
+        self.assertEqual('12345678901234567890', humanfriendly.round_number(12345678901234567890))
+        self.assertEqual('1000000000000.01 EB', humanfriendly.format_size(10 ** 30 + 6 * 10 ** 15, binary=False))
+        try:
+            import numpy
+        except ImportError:
+            return
+        self.assertEqual('5 GB', humanfriendly.format_size(numpy.int64(1024 ** 3 * 5)))
+        self.assertEqual('1.5 KB', humanfriendly.format_size(numpy.float32(1536)))
+        self.assertEqual('2 KB', humanfriendly.format_size(numpy.array(2048)))
+        self.assertEqual('4.2 milliseconds', humanfriendly.format_timespan(numpy.float64(0.0042)))
+        self.assertEqual(['1.5', '2.25'], humanfriendly.round_numbers(numpy.array([1.5, 2.25])))
+        self.assertEqual(['1 KB', '2 KB'], humanfriendly.disk_size_registry['jedec'].format_many(numpy.array([1024, 2048])))
 
     def test_format_path(self):
         friendly_path = os.path.join('~', '.vimrc')
@@ -228,6 +502,211 @@ class HumanFriendlyTestCase(unittest.TestCase):
             | Row two      |               300 |
             ------------------------------------
         """).strip()
+        # A table without rows.
+        assert ansi_strip(format_pretty_table([], ['x', 'y'])) == dedent("""
+            ---------
+            | x | y |
+            ---------
+            ---------
+        """).strip()
+        # A table with rows that are shorter than the column names.
+        assert ansi_strip(format_pretty_table([['a']], ['x', 'y'])) == dedent("""
+            ---------
+            | x | y |
+            ---------
+            | a |
+            ---------
+        """).strip()
+        assert ansi_strip(format_smart_table([['a']], ['x', 'y'])) == ansi_strip(format_pretty_table([['a']], ['x', 'y']))
+
+    def test_columnar_tables(self):
+        expected = dedent("""
+            -------------------------------
+            | Version | Downloads | Delta |
+            -------------------------------
+            | 1.23    |       218 | 5     |
+            | 1.24.1  |      1354 | -3    |
+            -------------------------------
+        """).strip()
+        # A dictionary of columns (including an array of unsigned integers).
+        data = dict(Version=['1.23', '1.24.1'], Downloads=array.array('L', [218, 1354]), Delta=[5, -3])
+        column_names = ['Version', 'Downloads', 'Delta']
+        assert ansi_strip(format_pretty_table(data, column_names)) == expected
+        # The same data as rows.
+        rows = [['1.23', 218, 5], ['1.24.1', 1354, -3]]
+        assert ansi_strip(format_pretty_table(rows, column_names)) == expected
+        # Signed integers are only right-aligned when none are negative.
+        table = normalize_table(dict(a=array.array('i', [1, -1]), b=array.array('i', [1, 2])))
+        assert table.numeric == [False, True]
+        assert table.column_names == ['a', 'b']
+        # Columns of different lengths are padded.
+        table = normalize_table(dict(a=['1', '2'], b=['x']), ['a', 'b'])
+        assert list(table.rows()) == [('1', 'x'), ('2', '')]
+        # Robust tables accept columnar data as well.
+        assert ansi_strip(format_robust_table(dict(a=[1, 2], b=['x', 'y']), ['b', 'a'])) == dedent("""
+            ----
+            b: x
+            a: 1
+            ----
+            b: y
+            a: 2
+            ----
+        """).strip()
+        try:
+            import numpy
+        except ImportError:
+            return
+        records = numpy.array([('1.23', 218, 5), ('1.24.1', 1354, -3)],
+                              dtype=[('Version', 'U8'), ('Downloads', 'u4'), ('Delta', 'i4')])
+        assert ansi_strip(format_pretty_table(records)) == expected
+        assert ansi_strip(format_smart_table(records)) == expected
+        table = normalize_table(dict(x=numpy.arange(3), y=numpy.array([0.5, 1.0, 2.5])))
+        assert table.columns == [['0', '1', '2'], ['0.5', '1.0', '2.5']]
+        assert table.numeric == [True, True]
+
+    def test_column_width_limits(self):
+        column_names = ['Name', 'Description']
+        data = [['one', 'A short description'], ['two', ansi_wrap('Styled text', color='red')]]
+        assert ansi_strip(format_pretty_table(data, column_names, max_width=10)) == dedent(u"""
+            ---------------------
+            | Name | Descripti\u2026 |
+            ---------------------
+            | one  | A short d\u2026 |
+            | two  | Styled te\u2026 |
+            ---------------------
+        """).strip()
+        # The style of truncated values is preserved.
+        assert ansi_wrap(u'Styled te\u2026', color='red') in format_pretty_table(data, column_names, max_width=10)
+        # Values can be wrapped over multiple lines (including line breaks).
+        data = [['one', 'A short description'], ['two', 'Line\nbreak']]
+        table = format_pretty_table(data, column_names, max_width={'Description': 7}, overflow='wrap')
+        assert ansi_strip(table) == dedent(u"""
+            ------------------
+            | Name | Descri\u2026 |
+            ------------------
+            | one  | A short |
+            |      | descrip |
+            |      | tion    |
+            | two  | Line    |
+            |      | break   |
+            ------------------
+        """).strip()
+        assert select_output_format(data, column_names, terminal_width=80) == 'robust'
+        assert select_output_format(data, column_names, terminal_width=80, overflow='wrap') == 'pretty'
+        self.assertRaises(ValueError, format_pretty_table, data, overflow='scroll')
+
+    def test_select_rows(self):
+        column_names = ['Name', 'Size', 'Type']
+        rows = [['a', '4 KB', 'text'], ['b', '1.5 GB', 'image'], ['c', '10', 'text'],
+                ['d', '512 KB', 'image'], ['e', 5000, 'text']]
+        # Sorting is numeric aware (including data sizes).
+        assert [r[0] for r in select_rows(rows, column_names, sort_by='Size')] == ['c', 'a', 'e', 'd', 'b']
+        # Top N selection works on iterators.
+        assert [r[0] for r in select_rows(iter(rows), column_names, sort_by=1, reverse=True, limit=2)] == ['b', 'd']
+        assert [r[0] for r in select_rows(rows, limit=2)] == ['a', 'b']
+        # Grouping applies the sorting and limit to each group.
+        selection = select_rows(rows, column_names, sort_by='Size', reverse=True, limit=1, group_by='Type')
+        assert [r[0] for r in selection] == ['b', 'e']
+        # Columnar data is supported as well.
+        columns = dict(Name=['x', 'y'], Size=[2, 1])
+        assert select_rows(columns, sort_by='Size') == [('y', 1), ('x', 2)]
+        self.assertRaises(ValueError, select_rows, rows, column_names, sort_by='Unknown')
+        # The table functions delegate to select_rows().
+        expected = format_pretty_table(select_rows(rows, column_names, sort_by='Size', reverse=True, limit=2), column_names)
+        assert format_pretty_table(rows, column_names, sort_by='Size', reverse=True, limit=2) == expected
+        assert format_pretty_table(normalize_table(rows, column_names), sort_by='Size', reverse=True, limit=2) == expected
+        assert normalize_table(columns, [Column('Size', formatter='size')], limit=1).columns == [['2 bytes']]
+        # Keys of numbers and text can be compared.
+        assert sorted(['b', '-2', 1, '1 KB', 'a'], key=sort_key) == ['-2', 1, '1 KB', 'a', 'b']
+
+    def test_column_formatters(self):
+        column_names = ['Name', Column('Size', formatter='size'), Column('Code', align='left'), Column('Length', formatter=len)]
+        data = [['a', 4096, 1, 'xx'], ['b', 1024 ** 3 * 4.7, 22, 'xxx'], ['c', None, 333, 'x'], ['d', 4096, 4, [1]]]
+        assert ansi_strip(format_pretty_table(data, column_names)) == dedent("""
+            ---------------------------------
+            | Name |   Size | Code | Length |
+            ---------------------------------
+            | a    |   4 KB | 1    |      2 |
+            | b    | 4.7 GB | 22   |      3 |
+            | c    |        | 333  |      1 |
+            | d    |   4 KB | 4    |      1 |
+            ---------------------------------
+        """).strip()
+        # Each distinct value is formatted once.
+        calls = []
+        column = Column('Value', formatter=lambda v: calls.append(v) or str(v))
+        table = normalize_table(dict(Value=[1, 2, 1, 1, 2]), [column])
+        assert table.columns == [['1', '2', '1', '1', '2']]
+        assert calls == [1, 2]
+        assert table.numeric == [True]
+        # Values that compare equal but have different types are formatted separately.
+        table = normalize_table([[1], [1.0], [True], [1]], [Column('Value', formatter=repr)])
+        assert table.columns == [['1', '1.0', 'True', '1']]
+        # Named formatters work on typed columns.
+        table = normalize_table(dict(Time=array.array('d', [0.5, 90])), [Column('Time', formatter='timespan')])
+        assert table.columns == [['0.5 seconds', '1 minute and 30 seconds']]
+        # Alignment is decided from the formatted values.
+        column = Column('Level', formatter=lambda v: 'level %i' % v)
+        assert normalize_table(dict(Level=array.array('i', [1, 2])), [column]).numeric == [False]
+        assert normalize_table(dict(Level=array.array('i', [1, 2])), [Column('Level', formatter=str)]).numeric == [True]
+        # Formatters that can't be pickled can't be sent to worker processes
+        # (this is checked even when concurrent.futures isn't available).
+        import humanfriendly.tables
+        saved_have_concurrent_futures = humanfriendly.tables.HAVE_CONCURRENT_FUTURES
+        try:
+            for available in (True, False):
+                humanfriendly.tables.HAVE_CONCURRENT_FUTURES = available
+                self.assertRaises(ValueError, normalize_table, [[1], [2]], [column], workers=2)
+        finally:
+            humanfriendly.tables.HAVE_CONCURRENT_FUTURES = saved_have_concurrent_futures
+        self.assertRaises(ValueError, Column, 'Name', formatter='unknown')
+        self.assertRaises(ValueError, Column, 'Name', align='center')
+
+    def test_live_table(self):
+        stream = StringIO()
+        live = LiveTable(['Host', 'Load'], stream=stream, interactive=True)
+        assert live.update([['alpha', '0.25'], ['beta', '1.50']])
+        # Updates within the minimum interval are postponed.
+        assert not live.update([['alpha', '0.75'], ['beta', '1.50']])
+        assert live.refresh()
+        assert not live.refresh()
+        expected = format_pretty_table([['alpha', '0.75'], ['beta', '1.50']], ['Host', 'Load'])
+        assert emulate_terminal(stream.getvalue()) == ansi_strip(expected).splitlines()
+        # Only the changed characters are written.
+        offset = len(stream.getvalue())
+        live.update([['alpha', '0.80'], ['beta', '1.50']], force=True)
+        assert stream.getvalue()[offset:] == '\x1b[3A\x1b[13G80\x1b[3B\r'
+        # Rows can be added and removed.
+        for data in ([['alpha', '0.80'], ['beta', '1.50'], ['gamma', '12.00']],
+                     [['alpha', '0.80']],
+                     [['alpha', 'n/a']]):
+            live.update(data, force=True)
+            expected = format_pretty_table(data, ['Host', 'Load'])
+            assert emulate_terminal(stream.getvalue()) == ansi_strip(expected).splitlines()
+        live.close()
+        assert stream.getvalue().startswith(ANSI_HIDE_CURSOR)
+        assert stream.getvalue().endswith(ANSI_SHOW_CURSOR)
+        # Without a terminal every redraw writes the complete table.
+        stream = StringIO()
+        with LiveTable(['Host'], stream=stream, interactive=False) as live:
+            live.update([['alpha']])
+            live.update([['beta']])
+        assert stream.getvalue() == format_pretty_table([['alpha']], ['Host']) + '\n' + \
+            format_pretty_table([['beta']], ['Host']) + '\n'
+
+    def test_parallel_tables(self):
+        import humanfriendly.tables
+        saved_chunk_size = humanfriendly.tables.PARALLEL_CHUNK_SIZE
+        try:
+            humanfriendly.tables.PARALLEL_CHUNK_SIZE = 3
+            rows = [[i, 'x' * (i % 5), ansi_wrap('%.1f' % (i / 3.0), bold=True)] for i in range(10)]
+            rows[4].append('extra')
+            expected = format_pretty_table(rows, ['a', 'b', 'c'])
+            assert format_pretty_table(iter(rows), ['a', 'b', 'c'], workers=2) == expected
+            columns = dict(a=array.array('i', range(10)), b=['y'] * 7)
+            assert format_pretty_table(columns, workers=2) == format_pretty_table(columns)
+        finally:
+            humanfriendly.tables.PARALLEL_CHUNK_SIZE = saved_chunk_size
 
     def test_robust_tables(self):
         column_names = ['One', 'Two', 'Three']
@@ -258,6 +737,117 @@ class HumanFriendlyTestCase(unittest.TestCase):
             multi line column!
             ------------------
         """).strip()
+        # Values of columns without a name are rendered without a prefix.
+        assert ansi_strip(format_robust_table([[1, 22], [333, 4]])) == dedent("""
+            ---
+            1
+            22
+            ---
+            333
+            4
+            ---
+        """).strip()
+        assert ansi_strip(format_robust_table([[1, 22]], ['One'])) == dedent("""
+            ------
+            One: 1
+            22
+            ------
+        """).strip()
+
+    def test_write_tables(self):
+        column_names = ['One', 'Two', 'Three']
+        data = [['1', '2', '3'], ['a', 'b', 'Here comes a\nmulti line column!']]
+        stream = StringIO()
+        write_robust_table(stream, data, column_names)
+        assert ansi_strip(stream.getvalue()) == ansi_strip(format_robust_table(data, column_names)) + '\n'
+        data = [['1', '2', '3'], ['a', 'b', 'c']]
+        stream = StringIO()
+        write_pretty_table(stream, data, column_names)
+        assert ansi_strip(stream.getvalue()) == ansi_strip(format_pretty_table(data, column_names)) + '\n'
+        # Make sure batches are written as they fill up.
+        stream = BatchRecorder()
+        write_lines(stream, ['a', 'b', 'c'], buffer_size=2)
+        assert stream.batches == ['a\nb\n', 'c\n']
+
+    def test_output_formats(self):
+        column_names = ['Name', 'Count']
+        data = [['a|b', '1'], [ansi_wrap('c,"d"', bold=True), '22'], ['multi\nline', '3']]
+        assert format_markdown_table(data, column_names) == dedent("""
+            | Name          | Count |
+            | ------------- | ----: |
+            | a\\|b          |     1 |
+            | c,"d"         |    22 |
+            | multi<br>line |     3 |
+        """).strip()
+        table = normalize_table(data, column_names)
+        stream = StringIO()
+        write_table(stream, table, output_format='csv')
+        assert stream.getvalue() == 'Name,Count\na|b,1\n"c,""d""",22\n"multi\nline",3\n'
+        stream = StringIO()
+        write_table(stream, table, output_format='tsv')
+        assert stream.getvalue() == 'Name\tCount\na|b\t1\nc,"d"\t22\nmulti\\nline\t3\n'
+        stream = StringIO()
+        write_table(stream, table, output_format='jsonl')
+        assert stream.getvalue().splitlines()[1] == '{"Name": "c,\\"d\\"", "Count": "22"}'
+        stream = StringIO()
+        write_table(stream, [[1, 2.5, None, True, ansi_wrap('x', bold=True), float('nan'), 1j]], output_format='jsonl')
+        assert stream.getvalue() == '[1, 2.5, null, true, "x", "nan", "1j"]\n'
+        # Columnar data, formatted columns and columns of different lengths.
+        stream = StringIO()
+        data = dict(a=array.array('i', [1, 2]), b=[4096], c=[7, 8])
+        write_table(stream, normalize_table(data, ['a', 'b', Column('c', formatter='size')]), output_format='jsonl')
+        assert stream.getvalue() == '{"a": 1, "b": 4096, "c": "7 bytes"}\n{"a": 2, "b": null, "c": "8 bytes"}\n'
+        self.assertRaises(ValueError, write_table, stream, data, output_format='xml')
+
+    def test_table_viewer(self):
+        # Rows are pulled lazily from iterators.
+        viewer = TableViewer(([i, 'row %i' % i] for i in range(1000)), ['Number', 'Text'], sample_size=10)
+        assert viewer.num_rows == 10
+        viewer.lines = 8
+        lines = viewer.render()
+        assert len(lines) == 8
+        assert ansi_strip(lines[3]) == '|      0 | row 0 |'
+        assert lines[-1] == 'Rows 1-3 of 10+'
+        # Scroll down by a page and back up by a row.
+        viewer.handle_key(' ')
+        viewer.handle_key('\x1b[A')
+        assert viewer.top == 2
+        # Search for a row (columns grow when wider values scroll into view).
+        for key in '/row 500\r':
+            viewer.handle_key(key)
+        assert viewer.top == 500
+        assert viewer.num_rows == 501
+        assert ansi_strip(viewer.render()[3]) == '|    500 | row 500 |'
+        for key in '/nothing\r':
+            viewer.handle_key(key)
+        assert viewer.top == 500
+        assert 'Pattern not found' in viewer.render()[-1]
+        # Jump to the end of the table.
+        viewer.handle_key('G')
+        assert viewer.render()[-1] == 'Rows 998-1000 of 1000'
+        assert viewer.handle_key('q') is False
+        # Random access sources and rendering to a stream that isn't a terminal.
+        stream = StringIO()
+        TableViewer([['a', '1'], ['b', '2']], stream=stream).run()
+        assert stream.getvalue() == dedent("""
+            ---------
+            | a | 1 |
+            | b | 2 |
+            ---------
+        """).lstrip()
+        # Terminals that don't support cbreak mode get the same output.
+        import humanfriendly.tables
+        saved_have_ioctl = humanfriendly.tables.HAVE_IOCTL
+        saved_stdin = sys.stdin
+        try:
+            humanfriendly.tables.HAVE_IOCTL = False
+            sys.stdin = FakeTerminal()
+            terminal = FakeTerminal()
+            TableViewer([['a', '1'], ['b', '2']], stream=terminal).run()
+            assert terminal.getvalue() == stream.getvalue()
+        finally:
+            humanfriendly.tables.HAVE_IOCTL = saved_have_ioctl
+            sys.stdin = saved_stdin
 
     def test_smart_tables(self):
         column_names = ['One', 'Two', 'Three']
@@ -285,6 +875,13 @@ class HumanFriendlyTestCase(unittest.TestCase):
             multi line column!
             ------------------
         """).strip()
+        # The decision is based on the column widths and can be reused.
+        data = [['1', '2', '3'], ['a', 'b', 'c']]
+        assert select_output_format(data, column_names, terminal_width=21) == 'pretty'
+        assert select_output_format(data, column_names, terminal_width=20) == 'robust'
+        assert select_output_format([['Here comes a\nline break']], terminal_width=80) == 'robust'
+        robust_table = format_smart_table(data, column_names, output_format='robust')
+        assert robust_table == format_robust_table(data, column_names)
 
     def test_concatenate(self):
         self.assertEqual(humanfriendly.concatenate([]), '')
@@ -409,6 +1006,11 @@ class HumanFriendlyTestCase(unittest.TestCase):
             | 7 | 8 | 9 |
             -------------
         ''').strip()
+        # Test `humanfriendly --format-table --output-format'.
+        returncode, output = main('--format-table', '--output-format=csv', input='1 2\n3 4')
+        assert output == '1,2\n3,4\n'
+        returncode, output = main('--format-table', '--output-format=xml', input='1 2\n3 4')
+        assert returncode != 0
         # Test `humanfriendly --format-timespan'.
         random_timespan = random.randint(5, 600)
         returncode, output = main('--format-timespan=%i' % random_timespan)
@@ -451,6 +1053,25 @@ class HumanFriendlyTestCase(unittest.TestCase):
         # Make sure ansi_wrap() ends the text by resetting the ANSI styles.
         assert ansi_wrap(text, bold=True).endswith(ANSI_RESET)
 
+    def test_pager_stream(self):
+        # Without a terminal the text is written to standard output.
+        saved_stdout = sys.stdout
+        try:
+            sys.stdout = StringIO()
+            with pager_stream() as stream:
+                stream.write('Hello world!\n')
+            assert sys.stdout.getvalue() == 'Hello world!\n'
+        finally:
+            sys.stdout = saved_stdout
+        # Writing to a pager that has exited raises PagerClosed.
+        pager = subprocess.Popen(['true'], stdin=subprocess.PIPE)
+        pager.wait()
+        stream = PagerStream(pager.stdin)
+        with self.assertRaises(PagerClosed):
+            for i in range(100):
+                stream.write(u'x' * 65536)
+        stream.close(ignore_errors=True)
+
     def test_find_terminal_size(self):
         lines, columns = find_terminal_size()
         # We really can't assert any minimum or maximum values here because it
@@ -555,6 +1176,78 @@ class HumanFriendlyTestCase(unittest.TestCase):
                 Don't change anything.
         """) for token in ('`-n`', '`--dry-run`'))
 
+    def test_caching(self):
+        from humanfriendly import caching
+        caching.clear()
+        # Memoization is disabled by default but can be requested per call.
+        assert not caching.is_enabled()
+        humanfriendly.format_size(4096)
+        self.assertEqual((0, 0), caching.cache_info()['humanfriendly.format_size'][:2])
+        self.assertEqual('4 KB', humanfriendly.format_size(4096, cached=True))
+        self.assertEqual('4 KB', humanfriendly.format_size(4096, cached=True))
+        self.assertEqual((1, 1), caching.cache_info()['humanfriendly.format_size'][:2])
+        # Test the global toggle.
+        caching.enable(maxsize=2)
+        try:
+            self.assertEqual('1 minute', humanfriendly.format_timespan(60))
+            self.assertEqual('1 minute', humanfriendly.format_timespan(60))
+            self.assertEqual('1.5 km', humanfriendly.format_length(1500))
+            self.assertEqual('1,000', humanfriendly.format_number(1000))
+            self.assertEqual('1,000', humanfriendly.format_number(1000, cached=False))
+            # Keyword arguments are part of the cache key.
+            self.assertEqual('1 KiB', humanfriendly.format_size(1024, binary=True))
+            self.assertEqual('1 KB', humanfriendly.format_size(1024))
+        finally:
+            caching.disable()
+        info = caching.cache_info()
+        self.assertEqual(caching.CacheInfo(1, 1, 2, 1), info['humanfriendly.format_timespan'])
+        self.assertEqual(caching.CacheInfo(0, 1, 2, 1), info['humanfriendly.format_number'])
+        # Test the eviction of the least recently used entries.
+        cache = caching.LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertEqual(None, cache.get('b'))
+        self.assertEqual(1, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        self.assertEqual(caching.CacheInfo(3, 1, 2, 2), cache.info())
+        # Shrinking a cache discards the least recently used entries.
+        cache.resize(1)
+        self.assertEqual(caching.CacheInfo(3, 1, 1, 1), cache.info())
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual(3, cache.get('c'))
+        cache.put('d', 4)
+        self.assertEqual(None, cache.get('c'))
+        self.assertEqual(4, cache.get('d'))
+        # Restore the default cache size.
+        caching.enable(maxsize=caching.DEFAULT_CACHE_SIZE)
+        caching.disable()
+
+    def test_instrumentation(self):
+        from humanfriendly import instrumentation
+        original_function = humanfriendly.format_size
+        instrumentation.reset()
+        instrumentation.enable()
+        try:
+            # Make sure the public functions were replaced by wrappers.
+            assert instrumentation.is_enabled()
+            assert humanfriendly.format_size is not original_function
+            humanfriendly.format_size(1024)
+            humanfriendly.format_size(1024 ** 2)
+        finally:
+            instrumentation.disable()
+        # Make sure the original functions were restored.
+        assert not instrumentation.is_enabled()
+        assert humanfriendly.format_size is original_function
+        # Check the collected statistics.
+        calls = dict((name, count) for name, count, total_time in instrumentation.get_statistics())
+        assert calls['humanfriendly.format_size'] == 2
+        assert calls['humanfriendly.text.round_number'] == 2
+        assert 'humanfriendly.format_size' in instrumentation.format_report()
+        instrumentation.reset()
+        assert not instrumentation.get_statistics()
+
     def test_import_module(self):
         import humanfriendly
         assert humanfriendly is import_module('humanfriendly')
@@ -583,6 +1276,55 @@ def main(*args, **kw):
     return returncode, output_buffer.getvalue()
 
 
+class BatchRecorder(object):
+
+    """File like object that records the separate writes to it."""
+
+    def __init__(self):
+        self.batches = []
+
+    def write(self, text):
+        self.batches.append(text)
+
+
+class FakeTerminal(StringIO):
+
+    """In memory stream that pretends to be connected to a terminal."""
+
+    def isatty(self):
+        return True
+
+
+def emulate_terminal(output):
+    """Apply the text and cursor movements in the given output to a list of lines."""
+    lines, row, column = [''], 0, 0
+    for token in re.findall(r'\x1b\[[?0-9;]*[A-Za-z]|[\r\n]|[^\x1b\r\n]+', output):
+        if token == '\n':
+            row, column = row + 1, 0
+            if row == len(lines):
+                lines.append('')
+        elif token == '\r':
+            column = 0
+        elif token.startswith('\x1b['):
+            argument, command = token[2:-1], token[-1]
+            if command == 'A':
+                row -= int(argument)
+            elif command == 'B':
+                row += int(argument)
+            elif command == 'G':
+                column = int(argument) - 1
+            elif command == 'K':
+                lines[row] = lines[row][:column]
+            elif command == 'J':
+                lines[row] = lines[row][:column]
+                del lines[row + 1:]
+        else:
+            line = lines[row].ljust(column)
+            lines[row] = line[:column] + token + line[column + len(token):]
+            column += len(token)
+    return [line for line in lines if line]
+
+
 def normalize_timestamp(value, ndigits=1):
     return '%.2f' % round(float(value), ndigits=ndigits)
 
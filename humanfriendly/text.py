@@ -1,27 +1,53 @@
 # Human friendly input/output in Python.
 #
 # Author: Peter Odding <peter@peterodding.com>
-# Last Change: July 19, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 """
 The :mod:`~humanfriendly.text` module contains simple functions to manipulate text:
 
-- The :func:`concatenate()` and :func:`pluralize()` functions make it easy to
-  generate human friendly output.
+- The :func:`concatenate()`, :func:`pluralize()` and :func:`round_number()`
+  functions make it easy to generate human friendly output.
 
 - The :func:`format()`, :func:`compact()` and :func:`dedent()` functions
   provide a clean and simple to use syntax for composing large text fragments
   with interpolated variables.
 
-- The :func:`tokenize()` function parses simple user input.
+- The :func:`tokenize()` and :func:`coerce_number()` functions parse simple
+  user input.
 """
 
 # Standard library modules.
+import decimal
+import fractions
 import math
+import numbers
 import re
 import textwrap
 
+# Modules included in our package.
+from humanfriendly.instrumentation import instrumented
+
+# Mapping of types to the functions used by coerce_scalar() to convert values
+# of those types to Python numbers (populated on demand).
+scalar_converters = {}
+
+# Compiled regular expression to recognize numbers in decimal notation
+# (digits with an optional decimal fraction and an optional exponent). Used
+# by tokenize() to separate numbers from strings.
+NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)')
+
+MAX_EXPONENT = 400
+"""
+The largest exponent accepted by :func:`coerce_number()` (an integer).
+
+Numbers with larger exponents don't fit in a floating point number anyway
+and the exact conversion of huge exponents would take a long time (which
+matters because the input usually comes from users).
+"""
+
+@instrumented
 def concatenate(items):
     """
     Concatenate a list of items in a human friendly way.
@@ -41,6 +67,7 @@ def concatenate(items):
     else:
         return ''
 
+@instrumented
 def format(text, *args, **kw):
     """
     Format a string using the string formatting operator and/or :func:`str.format()`.
@@ -124,6 +151,7 @@ def format(text, *args, **kw):
         text = text.format(**kw)
     return text
 
+@instrumented
 def compact(text, *args, **kw):
     '''
     Compact whitespace in a string.
@@ -154,6 +182,7 @@ def compact(text, *args, **kw):
     compacted_text = ' '.join(non_whitespace_tokens)
     return format(compacted_text, *args, **kw)
 
+@instrumented
 def dedent(text, *args, **kw):
     """
     Dedent a string (remove common leading whitespace from all lines).
@@ -179,6 +208,7 @@ def dedent(text, *args, **kw):
     trimmed_text = trim_empty_lines(dedented_text)
     return format(trimmed_text, *args, **kw)
 
+@instrumented
 def trim_empty_lines(text):
     """
     Trim leading and trailing empty lines from the given text.
@@ -203,6 +233,7 @@ def is_empty_line(text):
     """
     return len(text) == 0 or text.isspace()
 
+@instrumented
 def split_paragraphs(text):
     """
     Split a string into paragraphs (one or more lines delimited by an empty line).
@@ -217,6 +248,7 @@ def split_paragraphs(text):
             paragraphs.append(chunk)
     return paragraphs
 
+@instrumented
 def join_lines(text):
     """
     Remove "hard wrapping" from the paragraphs in a string.
@@ -232,6 +264,7 @@ def join_lines(text):
     """
     return re.sub(r'(\S)\n(\S)', r'\1 \2', text).strip()
 
+@instrumented
 def pluralize(count, singular, plural=None):
     """
     Combine a count with the singular or plural form of a word.
@@ -248,8 +281,207 @@ def pluralize(count, singular, plural=None):
     """
     if not plural:
         plural = singular + 's'
+    if count.__class__ is int:
+        # Fast path for integer counts.
+        return '%s %s' % (count, singular if count == 1 else plural)
     return '%s %s' % (count, singular if math.floor(float(count)) == 1 else plural)
 
+@instrumented
+def pluralize_many(counts, singular, plural=None):
+    """
+    Combine a sequence of counts with the singular or plural form of a word.
+
+    :param counts: An iterable of counts (numbers).
+    :param singular: The singular form of the word (a string).
+    :param plural: The plural form of the word (a string or ``None``).
+    :returns: A list of strings (refer to :func:`pluralize()`).
+
+    >>> from humanfriendly.text import pluralize_many
+    >>> pluralize_many([0, 1, 1.5, 2], 'file')
+    ['0 files', '1 file', '1.5 file', '2 files']
+    """
+    if not plural:
+        plural = singular + 's'
+    floor = math.floor
+    return ['%s %s' % (count, singular if (count == 1 if count.__class__ is int
+                                           else floor(float(count)) == 1) else plural)
+            for count in counts]
+
+def pluralize_decimal(text, singular, plural):
+    """
+    Combine the output of :func:`round_number()` with the singular or plural form of a word.
+
+    :param text: A number formatted by :func:`round_number()` (a string).
+    :param singular: The singular form of the word (a string).
+    :param plural: The plural form of the word (a string).
+    :returns: The same string as :func:`pluralize()` would return.
+
+    Because the output of :func:`round_number()` is a plain decimal number the
+    singular form can be selected without converting the text back to a
+    number (the number is between one and two if the text is "1" or starts
+    with "1."). This is used in the inner loops of the ``format_*()``
+    functions.
+    """
+    return '%s %s' % (text, singular if text[:2] in ('1', '1.') else plural)
+
+@instrumented
+def round_number(count, keep_width=False):
+    """
+    Helper for :func:`.format_size()` and :func:`.format_timespan()` to
+    round a floating point number to two decimal places in a human friendly
+    format. If no decimal places are required to represent the number, they
+    will be omitted.
+
+    :param count: The number to format.
+    :param keep_width: ``True`` if trailing zeros should not be stripped,
+                       ``False`` if they can be stripped.
+    :returns: The formatted number as a string.
+
+    An example:
+
+    >>> import math
+    >>> from humanfriendly.text import round_number
+    >>> round_number(1)
+    '1'
+    >>> round_number(math.pi)
+    '3.14'
+    >>> round_number(5.001)
+    '5'
+    """
+    number_type = count.__class__
+    if number_type is not float and number_type is not int:
+        count = coerce_scalar(count)
+        number_type = count.__class__
+    if number_type is float:
+        text = '%.2f' % count
+    elif number_type is int:
+        text = '%i.00' % count
+    else:
+        text = format_fixed_point(count)
+    if not keep_width:
+        # The formatted number always contains a decimal point so we can strip
+        # trailing zeros (and then the decimal point) without a regex.
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+def format_fixed_point(number):
+    """
+    Format a number with two decimal places (used by :func:`round_number()`).
+
+    :param number: An :class:`int`, :class:`float`, :class:`decimal.Decimal`,
+                   :class:`fractions.Fraction` or other number.
+    :returns: The formatted number (a string).
+
+    Integers, :class:`~decimal.Decimal` objects and other rational numbers
+    (like :class:`~fractions.Fraction` objects) are rounded using exact
+    arithmetic (rounding half to even, like the ``%.2f`` format does for
+    floating point numbers) so that they don't lose precision:
+
+    >>> from decimal import Decimal
+    >>> from humanfriendly.text import format_fixed_point
+    >>> format_fixed_point(Decimal('12345678901234567890.125'))
+    '12345678901234567890.12'
+    >>> format_fixed_point(12345678901234567890.125)
+    '12345678901234567168.00'
+    """
+    if isinstance(number, float):
+        return '%.2f' % number
+    elif isinstance(number, numbers.Integral):
+        return '%i.00' % number
+    elif isinstance(number, decimal.Decimal):
+        if not number.is_finite():
+            return '%.2f' % float(number)
+        # Make sure the context has enough precision to represent the result.
+        context = decimal.Context(prec=max(decimal.getcontext().prec, number.adjusted() + 3))
+        return '{0:f}'.format(number.quantize(decimal.Decimal('0.01'), rounding=decimal.ROUND_HALF_EVEN, context=context))
+    elif isinstance(number, numbers.Rational):
+        hundredths, remainder = divmod(number.numerator * 100, number.denominator)
+        if remainder * 2 > number.denominator or (remainder * 2 == number.denominator and hundredths % 2):
+            hundredths += 1
+        return '%s%i.%02i' % ('-' if hundredths < 0 else '', abs(hundredths) // 100, abs(hundredths) % 100)
+    else:
+        return '%.2f' % float(number)
+
+
+def coerce_scalar(value):
+    """
+    Convert NumPy scalars and zero dimensional arrays to Python numbers.
+
+    :param value: The value to convert.
+    :returns: The equivalent Python number (for NumPy objects) or the given
+              value (for all other values).
+
+    The conversion function is selected once per type (see
+    :func:`select_scalar_converter()`) and then cached in
+    :data:`scalar_converters`, so converting a NumPy scalar costs a dictionary
+    lookup and a call to :class:`int` or :class:`float`.
+    """
+    converter = scalar_converters.get(value.__class__)
+    if converter is None:
+        converter = select_scalar_converter(value.__class__)
+        scalar_converters[value.__class__] = converter
+    return converter(value)
+
+
+def select_scalar_converter(value_type):
+    """
+    Select the function used by :func:`coerce_scalar()` to convert values of a given type.
+
+    :param value_type: A type.
+    :returns: A callable that takes a value of the given type and returns a
+              number.
+
+    NumPy isn't imported to check the type, so this doesn't require NumPy
+    to be installed (NumPy registers its scalar types with the abstract base
+    classes in the :mod:`numbers` module).
+    """
+    if value_type.__module__ == 'numpy':
+        if issubclass(value_type, numbers.Integral):
+            return int
+        elif issubclass(value_type, numbers.Real):
+            return float
+        elif hasattr(value_type, 'item'):
+            # Zero dimensional arrays (and other NumPy objects).
+            return lambda value: value.item()
+    return lambda value: value
+
+
+def is_numpy_object(value):
+    """
+    Check whether a value is a NumPy scalar or array (without importing NumPy).
+
+    :param value: The value to check.
+    :returns: :data:`True` if the value is a NumPy object with a ``tolist()``
+              method, :data:`False` otherwise.
+    """
+    return value.__class__.__module__ == 'numpy' and hasattr(value, 'tolist')
+
+
+@instrumented
+def round_numbers(counts, keep_width=False):
+    """
+    Round a sequence of numbers using :func:`round_number()`.
+
+    :param counts: An iterable of numbers.
+    :param keep_width: Refer to :func:`round_number()`.
+    :returns: A list of strings.
+
+    >>> from humanfriendly.text import round_numbers
+    >>> round_numbers([1, 2.5, 3.14159])
+    ['1', '2.5', '3.14']
+    """
+    if is_numpy_object(counts):
+        # Convert NumPy arrays to Python numbers in one go.
+        counts = counts.tolist()
+    texts = [('%.2f' % count) if count.__class__ is float else round_number(count, keep_width=True)
+             for count in counts]
+    if not keep_width:
+        texts = [text.rstrip('0').rstrip('.') for text in texts]
+    return texts
+
+
+@instrumented
 def split(text):
     """
     Split a comma-separated list of strings.
@@ -267,18 +499,24 @@ def split(text):
     """
     return [token.strip() for token in text.split(',') if token and not token.isspace()]
 
-def tokenize(text):
+@instrumented
+def tokenize(text, exact=False):
     """
     Tokenize a text into numbers and strings.
 
     :param text: The text to tokenize (a string).
+    :param exact: :data:`True` to convert numbers with a decimal fraction or
+                  exponent without loss of precision (see
+                  :func:`coerce_number()`), :data:`False` (the default) to
+                  convert them to floating point numbers.
     :returns: A list of strings and/or numbers.
 
     This function is used to implement robust tokenization of user input in
     functions like :func:`.parse_size()` and :func:`.parse_timespan()`. It
-    automatically coerces integer and floating point numbers, ignores
-    whitespace and knows how to separate numbers from strings even without
-    whitespace. Some examples to make this more concrete:
+    automatically coerces integer and floating point numbers (including
+    exponent notation), ignores whitespace and knows how to separate numbers
+    from strings even without whitespace. Some examples to make this more
+    concrete:
 
     >>> from humanfriendly.text import tokenize
     >>> tokenize('42')
@@ -289,14 +527,89 @@ def tokenize(text):
     [42.5, 'MB']
     >>> tokenize('42.5 MB')
     [42.5, 'MB']
+    >>> tokenize('1e12 bytes')
+    [1000000000000.0, 'bytes']
+    >>> tokenize('1.1 PB', exact=True)
+    [Fraction(11, 10), 'PB']
+
+    Numbers that can't be converted (for example because their exponent is
+    out of range, see :func:`coerce_number()`) are kept as strings, so the
+    callers reject them like any other unexpected token.
     """
     tokenized_input = []
-    for token in re.split(r'(\d+(?:\.\d+)?)', text):
-        token = token.strip()
-        if re.match(r'\d+\.\d+', token):
-            tokenized_input.append(float(token))
-        elif token.isdigit():
-            tokenized_input.append(int(token))
-        elif token:
-            tokenized_input.append(token)
+    # Because NUMBER_PATTERN contains a capturing group the odd elements
+    # of the list returned by re.split() are the numbers in the text.
+    for index, token in enumerate(NUMBER_PATTERN.split(text)):
+        if index % 2:
+            try:
+                tokenized_input.append(coerce_number(token, exact=exact))
+            except ValueError:
+                tokenized_input.append(token)
+        else:
+            token = token.strip()
+            if token:
+                tokenized_input.append(token)
     return tokenized_input
+
+def coerce_number(text, exact=False):
+    """
+    Convert a number in decimal notation to a Python number.
+
+    :param text: A string matching :data:`NUMBER_PATTERN` (digits with an
+                 optional decimal fraction and an optional exponent).
+    :param exact: :data:`True` to avoid floating point numbers, :data:`False`
+                  (the default) to convert numbers with a decimal fraction or
+                  exponent to floating point numbers.
+    :returns: An :class:`int` if the number doesn't have a decimal fraction or
+              exponent. Otherwise the result depends on `exact`:
+
+              - If `exact` is :data:`False` a :class:`float` is returned.
+              - If `exact` is :data:`True` the decimal mantissa is converted to
+                an integer that is scaled by the exponent using integer
+                arithmetic. If the result is integral an :class:`int` is
+                returned, otherwise a :class:`fractions.Fraction`.
+    :raises: :exc:`~exceptions.ValueError` when the absolute value of the
+             exponent is larger than :data:`MAX_EXPONENT`.
+
+    When a number like ``1.1`` is converted to a floating point number it
+    can't be represented exactly, so multiplying it by a large value (like
+    the number of bytes in a petabyte) can be off by a lot. Exact conversion
+    avoids this:
+
+    >>> from humanfriendly.text import coerce_number
+    >>> int(coerce_number('123.456') * 1024 ** 5)
+    138999098899162992
+    >>> int(coerce_number('123.456', exact=True) * 1024 ** 5)
+    138999098899162988
+    >>> coerce_number('1.5e3', exact=True)
+    1500
+    """
+    mantissa, _, exponent = text.lower().partition('e')
+    if exponent and abs(int(exponent)) > MAX_EXPONENT:
+        raise ValueError("Exponent out of range! (%s)" % text)
+    integer_part, _, decimal_part = mantissa.partition('.')
+    if not (decimal_part or exponent):
+        return int(text)
+    elif not exact:
+        return float(text)
+    numerator = int(integer_part + decimal_part)
+    scale = int(exponent or 0) - len(decimal_part)
+    if scale >= 0:
+        return numerator * 10 ** scale
+    else:
+        return fractions.Fraction(numerator, 10 ** -scale)
+
+
+def is_finite(value):
+    """
+    Check whether a number is finite and fits in a floating point number.
+
+    :param value: A number.
+    :returns: :data:`True` if the number is finite and can be converted to a
+              floating point number, :data:`False` otherwise.
+    """
+    try:
+        return not (math.isinf(value) or math.isnan(value))
+    except OverflowError:
+        # Integers and fractions too large to convert to a float.
+        return False
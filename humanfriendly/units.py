@@ -0,0 +1,517 @@
+# Human friendly input/output in Python.
+#
+# Author: Peter Odding <peter@peterodding.com>
+# Last Change: October 18, 2026
+# URL: https://humanfriendly.readthedocs.org
+
+"""
+The :mod:`~humanfriendly.units` module implements a generic engine to format
+and parse human readable quantities (data sizes, lengths, timespans, data
+rates, frequencies, etc.) based on tables of units (like
+:data:`.disk_size_units`):
+
+- A :class:`UnitSystem` sorts a table of units once and precomputes the
+  thresholds used to select the unit to format a value with (so formatting
+  needs a single :func:`bisect.bisect_right()` call instead of a loop), a hash
+  table with the names of the units and a prefix trie used to match
+  abbreviated unit names (so parsing a unit name doesn't depend on the number
+  of units).
+
+- A :class:`Quantity` is a :class:`UnitSystem` that knows how to format and
+  parse values, either one at a time or in batches. Functions like
+  :func:`.format_size()` and :func:`.parse_length()` are thin wrappers around
+  :class:`Quantity` objects. Adding a new quantity is a matter of defining a
+  table of units and creating a :class:`Quantity` object.
+
+- A :class:`UnitRegistry` holds related unit systems (for example the decimal
+  and binary disk size units) so that callers can select a system by name.
+
+The tables of units are tuples of dictionaries with the following keys:
+
+``prefix``
+  The prefix (first letters) of the unit used to match unit names that aren't
+  in the hash table of unit names (a string). When a name starts with the
+  prefixes of multiple units the longest prefix wins. Units whose prefix is
+  :data:`None` are only matched by their exact names (this is used for units
+  like milliseconds whose abbreviations are the first letters of unrelated
+  words).
+
+``divider``
+  The number of base units in the unit (a number).
+
+``singular`` and ``plural``
+  The labels used to format values (strings).
+
+``name`` (optional)
+  The full name of the unit (e.g. 'kilobyte') which (along with its plural
+  formed by adding an 's') is also accepted while parsing (a string).
+
+``aliases`` (optional)
+  Additional names that are accepted while parsing (a tuple of strings).
+"""
+
+# Standard library modules.
+import bisect
+import decimal
+import fractions
+import numbers
+
+# Modules included in our package.
+from humanfriendly.text import (
+    coerce_scalar, concatenate, is_finite, is_numpy_object, pluralize,
+    pluralize_decimal, round_number, tokenize,
+)
+
+# The largest integer up to which all integers can be represented exactly as
+# floating point numbers (larger integers are formatted using exact arithmetic).
+MAX_EXACT_FLOAT = 2 ** 53
+
+# Compatibility with Python 2 and 3.
+try:
+    # Python 2.
+    string_types = basestring
+except NameError:
+    # Python 3.
+    string_types = str
+
+
+class UnitSystem(object):
+
+    """
+    A compiled table of units.
+
+    Here's an example:
+
+    >>> from humanfriendly import disk_size_units
+    >>> from humanfriendly.units import UnitSystem
+    >>> system = UnitSystem('jedec', disk_size_units)
+    >>> system.find_unit(1024 ** 3 * 5)['singular']
+    'GB'
+    >>> system.lookup('megabytes')['divider']
+    1048576
+    >>> system.lookup('gigs')['divider']
+    1073741824
+    """
+
+    def __init__(self, name, units, extends=None):
+        """
+        Compile a table of units.
+
+        :param name: The name of the unit system (a string).
+        :param units: A sequence of dictionaries (see the module documentation).
+        :param extends: Another :class:`UnitSystem` whose unit names should
+                        also be recognized by :func:`lookup()` (optional). Names
+                        defined by the units of this system take precedence.
+        """
+        self.name = name
+        self.units = tuple(sorted(units, key=lambda unit: unit['divider']))
+        self.thresholds = [unit['divider'] for unit in self.units]
+        # Exact (rational) versions of the dividers, used to format Decimal
+        # and Fraction values without converting them to floats.
+        self.exact_dividers = [exact_divider(d) for d in self.thresholds]
+        # The singular and plural labels of the units are resolved once so
+        # that formatting doesn't have to do it for every value.
+        self.labels = [(unit['singular'], unit.get('plural') or unit['singular'] + 's') for unit in self.units]
+        self.names = dict(extends.names) if extends else {}
+        for unit in self.units:
+            for alias in unit_names(unit):
+                self.names[alias.lower()] = unit
+        # The prefix trie is built in the order of the unit table given by
+        # the caller, so when two units have the same prefix the first wins.
+        self.prefixes = {}
+        for unit in units:
+            if unit['prefix'] is not None:
+                add_prefix(self.prefixes, unit['prefix'].lower(), unit)
+
+    def find_unit(self, value):
+        """
+        Find the unit that should be used to format a value.
+
+        :param value: The value to format (a number).
+        :returns: The largest unit (a dictionary) whose divider isn't larger
+                  than the given value. For values smaller than the smallest
+                  unit the smallest unit is returned.
+        """
+        return self.units[self.find_index(value)]
+
+    def find_index(self, value):
+        """
+        Find the index of the unit that should be used to format a value.
+
+        :param value: The value to format (a number).
+        :returns: The index of the unit returned by :func:`find_unit()` in
+                  :attr:`units` (an integer).
+        """
+        return max(bisect.bisect_right(self.thresholds, value) - 1, 0)
+
+    def lookup(self, name):
+        """
+        Find the unit with the given name.
+
+        :param name: The name of the unit (a string, the comparison is case
+                     insensitive).
+        :returns: The unit (a dictionary) or :data:`None`.
+
+        Names that aren't in the hash table of unit names are matched against
+        the prefixes of the units using the prefix trie.
+        """
+        normalized_name = name.lower()
+        unit = self.names.get(normalized_name)
+        if unit is None:
+            unit = match_prefix(self.prefixes, normalized_name)
+        return unit
+
+    def __repr__(self):
+        """Render a human friendly representation of the unit system."""
+        return '%s(%r, %s)' % (self.__class__.__name__, self.name,
+                               ', '.join(u['singular'] for u in self.units))
+
+
+class Quantity(UnitSystem):
+
+    """
+    A :class:`UnitSystem` that formats and parses values.
+
+    Here's an example based on one of the quantities defined by the
+    :mod:`humanfriendly` module:
+
+    >>> from humanfriendly import frequency_quantity
+    >>> frequency_quantity.format(2400000000)
+    '2.4 GHz'
+    >>> frequency_quantity.parse('2.4 GHz')
+    2400000000.0
+    >>> frequency_quantity.format_many([50, 1500, 2000000])
+    ['50 Hz', '1.5 kHz', '2 MHz']
+    """
+
+    def __init__(self, name, units, extends=None, description=None, exception=ValueError, exact=False):
+        """
+        Compile a table of units into a quantity.
+
+        :param name: The name of the quantity or unit system (a string).
+        :param units: A sequence of dictionaries (see the module documentation).
+        :param extends: Refer to :class:`UnitSystem`.
+        :param description: The name of the quantity used in error messages
+                            (a string, defaults to `name`).
+        :param exception: The exception type raised by :func:`parse()` when
+                          the input can't be parsed (defaults to
+                          :exc:`~exceptions.ValueError`).
+        :param exact: :data:`True` to parse numbers with a decimal fraction or
+                      exponent without loss of precision (see
+                      :func:`~humanfriendly.text.coerce_number()`),
+                      :data:`False` (the default) to parse them as floating
+                      point numbers.
+        """
+        super(Quantity, self).__init__(name, units, extends=extends)
+        self.description = description or name
+        self.exception = exception
+        self.exact = exact
+        # The unit used to format values smaller than the smallest unit (the
+        # unit with a divider of one, if there is such a unit).
+        self.base_unit = self.units[0]
+        for unit in self.units:
+            if unit['divider'] == 1:
+                self.base_unit = unit
+
+    def format(self, value, keep_width=False):
+        """
+        Format a value using the most appropriate unit.
+
+        :param value: The value to format (a number in base units).
+        :param keep_width: ``True`` if trailing zeros should not be stripped,
+                           ``False`` if they can be stripped.
+        :returns: The formatted value (a string).
+        """
+        number_type = value.__class__
+        if number_type is not float and number_type is not int:
+            # Convert NumPy scalars to Python numbers.
+            value = coerce_scalar(value)
+            number_type = value.__class__
+        index = bisect.bisect_right(self.thresholds, value) - 1
+        if index >= 0:
+            if number_type is float or (number_type is int and -MAX_EXACT_FLOAT <= value <= MAX_EXACT_FLOAT):
+                # Fast path for the most common types.
+                singular, plural = self.labels[index]
+                number = round_number(float(value) / self.thresholds[index], keep_width=keep_width)
+                return pluralize_decimal(number, singular, plural)
+            return self.format_in_unit(value, index, keep_width)
+        # Values smaller than the smallest unit are formatted as is.
+        return pluralize(value, self.base_unit['singular'], self.base_unit['plural'])
+
+    def format_in_unit(self, value, index, keep_width=False):
+        """
+        Format a value using a specific unit.
+
+        :param value: The value to format (a number in base units).
+        :param index: The index of the unit in :attr:`units` (an integer).
+        :param keep_width: Refer to :func:`format()`.
+        :returns: The formatted value (a string).
+
+        Floating point numbers and integers that can be represented exactly
+        as floating point numbers take the fast path. Other numbers (like
+        :class:`~decimal.Decimal` and :class:`~fractions.Fraction` objects
+        and large integers) are divided using exact arithmetic.
+        """
+        value = coerce_scalar(value)
+        number_type = value.__class__
+        if number_type is float or (number_type is int and -MAX_EXACT_FLOAT <= value <= MAX_EXACT_FLOAT):
+            quotient = float(value) / self.thresholds[index]
+        else:
+            quotient = exact_quotient(value, self.exact_dividers[index])
+        singular, plural = self.labels[index]
+        return pluralize_decimal(round_number(quotient, keep_width=keep_width), singular, plural)
+
+    def format_many(self, values, keep_width=False):
+        """
+        Format a sequence of values using the most appropriate units.
+
+        :param values: An iterable of numbers (in base units).
+        :param keep_width: Refer to :func:`format()`.
+        :returns: A list of strings.
+        """
+        if is_numpy_object(values):
+            # Convert NumPy arrays to Python numbers in one go.
+            values = values.tolist()
+        format = self.format
+        return [format(value, keep_width) for value in values]
+
+    def format_compound(self, value, max_units=3, precision=None):
+        """
+        Format a value as a combination of multiple units.
+
+        :param value: The value to format (a number in base units).
+        :param max_units: The maximum number of units to combine (an integer).
+        :param precision: The divider of the smallest unit to use (a number,
+                          defaults to :data:`None` which means all units are
+                          used).
+        :returns: The formatted value (a string).
+
+        The value is divided into integer counts of units, starting with the
+        largest unit that fits. Units with a count of zero are omitted. This
+        is how :func:`.format_timespan()` formats timespans of one minute or
+        more.
+        """
+        result = []
+        for divider, (singular, plural) in zip(reversed(self.thresholds), reversed(self.labels)):
+            if precision is not None and divider < precision:
+                break
+            if value >= divider:
+                count = int(value / divider)
+                value %= divider
+                result.append(pluralize(count, singular, plural))
+        if not result:
+            # The value is smaller than the smallest unit.
+            return self.format(value)
+        return concatenate(result[:max_units])
+
+    def parse(self, text):
+        """
+        Parse a human readable value.
+
+        :param text: The text to parse (a string).
+        :returns: The corresponding number of base units (a number).
+        :raises: The :attr:`exception` type given to the constructor when the
+                 input can't be parsed.
+
+        The text is expected to contain a number optionally followed by a
+        unit. When no unit is given the number is assumed to be the number of
+        base units. Values that don't fit in a floating point number are
+        rejected.
+        """
+        tokens = tokenize(text, exact=self.exact)
+        value = None
+        if tokens and isinstance(tokens[0], numbers.Number):
+            # If the input contains only a number, it's assumed to be the number of base units.
+            if len(tokens) == 1:
+                value = tokens[0]
+            # Otherwise we expect to find two tokens: A number and a unit.
+            elif len(tokens) == 2 and isinstance(tokens[1], string_types):
+                unit = self.lookup(tokens[1])
+                if unit:
+                    value = tokens[0] * unit['divider']
+        if value is not None and is_finite(value):
+            return value
+        # We failed to parse the input.
+        msg = "Failed to parse %s! (input %r was tokenized as %r)"
+        raise self.exception(msg % (self.description, text, tokenize(text)))
+
+    def parse_compound(self, text):
+        """
+        Parse a human readable value that combines multiple units.
+
+        :param text: The text to parse (a string).
+        :returns: The corresponding number of base units (a number).
+        :raises: The :attr:`exception` type given to the constructor when the
+                 input can't be parsed.
+
+        The text is expected to contain a number optionally followed by a
+        unit (like :func:`parse()`) or one or more pairs of numbers and units
+        (like ``1h30m`` or ``1 hour, 30 minutes and 15 seconds``). The pairs
+        are summed in a single pass over the tokens. Commas and the word "and"
+        between pairs are ignored. Values that don't fit in a floating point
+        number are rejected.
+        """
+        tokens = tokenize(text, exact=self.exact)
+        if len(tokens) == 1 and isinstance(tokens[0], numbers.Number):
+            # If the input contains only a number, it's assumed to be the number of base units.
+            if is_finite(tokens[0]):
+                return tokens[0]
+        total = 0
+        if tokens and len(tokens) % 2 == 0:
+            for index in range(0, len(tokens), 2):
+                number, unit_name = tokens[index], tokens[index + 1]
+                if not (isinstance(number, numbers.Number) and isinstance(unit_name, string_types)):
+                    break
+                words = unit_name.replace(',', ' ').split()
+                if len(words) > 1 and words[1:] != ['and']:
+                    break
+                unit = self.lookup(words[0]) if words else None
+                if not unit:
+                    break
+                total += number * unit['divider']
+            else:
+                if is_finite(total):
+                    return total
+        # We failed to parse the input.
+        msg = "Failed to parse %s! (input %r was tokenized as %r)"
+        raise self.exception(msg % (self.description, text, tokenize(text)))
+
+    def parse_many(self, texts):
+        """
+        Parse a sequence of human readable values.
+
+        :param texts: An iterable of strings.
+        :returns: A list of numbers (in base units).
+        :raises: Refer to :func:`parse()`.
+        """
+        parse = self.parse
+        return [parse(text) for text in texts]
+
+
+class UnitRegistry(object):
+
+    """
+    A collection of related :class:`UnitSystem` objects, accessible by name.
+
+    >>> from humanfriendly import disk_size_registry
+    >>> disk_size_registry['iec'].find_unit(1024 ** 2)['singular']
+    'MiB'
+    >>> disk_size_registry['si'].format(1000 ** 2)
+    '1 MB'
+    """
+
+    def __init__(self, *systems):
+        """
+        Initialize a unit registry.
+
+        :param systems: Any positional arguments are :class:`UnitSystem`
+                        objects to add to the registry.
+        """
+        self.systems = {}
+        for system in systems:
+            self.add(system)
+
+    def add(self, system):
+        """
+        Add a unit system to the registry.
+
+        :param system: A :class:`UnitSystem` object.
+        """
+        self.systems[system.name] = system
+
+    def __contains__(self, name):
+        """Check whether the registry contains a unit system with the given name."""
+        return name in self.systems
+
+    def __getitem__(self, name):
+        """
+        Get a unit system by name.
+
+        :param name: The name of the unit system (a string).
+        :returns: A :class:`UnitSystem` object.
+        :raises: :exc:`~exceptions.KeyError` when the name is unknown.
+        """
+        return self.systems[name]
+
+
+def exact_divider(divider):
+    """
+    Get the exact value of a divider.
+
+    :param divider: A number.
+    :returns: A :class:`fractions.Fraction` object. Floating point numbers are
+              converted using their shortest decimal representation (so
+              ``1e-09`` becomes exactly one billionth).
+    """
+    if isinstance(divider, float):
+        return fractions.Fraction(repr(divider))
+    return fractions.Fraction(divider)
+
+
+def exact_quotient(value, divider):
+    """
+    Divide a value by a divider without converting it to a floating point number.
+
+    :param value: A number (finite :class:`decimal.Decimal` values and
+                  rational numbers result in a :class:`~fractions.Fraction`,
+                  other numbers are converted to floats).
+    :param divider: A :class:`fractions.Fraction` object.
+    :returns: The quotient (a number).
+    """
+    if isinstance(value, numbers.Rational) or (isinstance(value, decimal.Decimal) and value.is_finite()):
+        return fractions.Fraction(value) / divider
+    else:
+        return float(value) / divider
+
+
+def unit_names(unit):
+    """
+    Get the names that identify a unit.
+
+    :param unit: A unit (a dictionary, see the module documentation).
+    :returns: A list of strings.
+    """
+    names = [unit['singular'], unit['plural']]
+    if unit['prefix'] is not None:
+        names.append(unit['prefix'])
+    if 'name' in unit:
+        names.extend([unit['name'], unit['name'] + 's'])
+    names.extend(unit.get('aliases', ()))
+    return names
+
+
+def add_prefix(trie, prefix, value):
+    """
+    Add a prefix to a prefix trie.
+
+    :param trie: The root node of the trie (a dictionary).
+    :param prefix: The prefix to add (a string).
+    :param value: The value to associate with the prefix. If the prefix was
+                  added before the existing value is preserved.
+
+    Each node in the trie is a dictionary that maps characters to child nodes.
+    The value associated with a node is stored under the key :data:`None`.
+    """
+    node = trie
+    for character in prefix:
+        node = node.setdefault(character, {})
+    node.setdefault(None, value)
+
+
+def match_prefix(trie, text):
+    """
+    Find the longest prefix of a string in a prefix trie.
+
+    :param trie: The root node of the trie (a dictionary, see :func:`add_prefix()`).
+    :param text: The string to match (a string).
+    :returns: The value associated with the longest prefix of the string that
+              was added to the trie or :data:`None` when no prefix matches.
+    """
+    node = trie
+    value = node.get(None)
+    for character in text:
+        node = node.get(character)
+        if node is None:
+            break
+        value = node.get(None, value)
+    return value
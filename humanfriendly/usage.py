@@ -1,7 +1,7 @@
 # Human friendly input/output in Python.
 #
 # Author: Peter Odding <peter@peterodding.com>
-# Last Change: June 28, 2015
+# Last Change: October 18, 2026
 # URL: https://humanfriendly.readthedocs.org
 
 """
@@ -42,6 +42,7 @@ except ImportError:
     from io import StringIO
 
 # Modules included in our package.
+from humanfriendly.instrumentation import instrumented
 from humanfriendly.text import dedent, join_lines, split_paragraphs, trim_empty_lines
 
 # Compiled regular expression used to tokenize usage messages.
@@ -70,6 +71,7 @@ OPTION_PATTERN = re.compile('(^\s+-{1,2}\w.*$)', re.MULTILINE)
 # Initialize a logger for this module.
 logger = logging.getLogger(__name__)
 
+@instrumented
 def format_usage(usage_text):
     """
     Highlight special items in a usage message.
@@ -108,6 +110,7 @@ def format_usage(usage_text):
             formatted_lines.append(USAGE_PATTERN.sub(callback, line))
     return ''.join(formatted_lines)
 
+@instrumented
 def find_meta_variables(usage_text):
     """
     Find the meta variables in the given usage message.
@@ -129,6 +132,7 @@ def find_meta_variables(usage_text):
                 meta_variables.add(value)
     return list(meta_variables)
 
+@instrumented
 def parse_usage(text):
     """
     Parse a usage message by inferring its structure (and making some assumptions :-).
@@ -188,6 +192,7 @@ def parse_usage(text):
     logger.debug("Parsed options: %s", chunks)
     return introduction, chunks
 
+@instrumented
 def render_usage(text):
     """
     Reformat a command line program's usage message to reStructuredText_.